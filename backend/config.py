@@ -0,0 +1,130 @@
+"""
+Environment-driven settings for the Mongo client.
+
+    MONGO_MAX_POOL_SIZE                connections per server (default 100)
+    MONGO_MIN_POOL_SIZE                connections kept open when idle (default 0)
+    MONGO_MAX_IDLE_TIME_MS             close pooled connections idle this long (default 0, never)
+    MONGO_WAIT_QUEUE_TIMEOUT_MS        fail instead of waiting longer for a free connection (default 0, wait)
+    MONGO_SERVER_SELECTION_TIMEOUT_MS  give up finding a usable server after this long (default 5000)
+    MONGO_CONNECT_TIMEOUT_MS           TCP connect timeout (default 5000)
+    MONGO_COMPRESSORS                  wire compressors in preference order, e.g. "zstd,snappy,zlib"
+                                       (default none); worth it only when bandwidth to mongod costs
+                                       more than the CPU on both ends, as across regions. Ones whose
+                                       Python package is missing are skipped
+    MONGO_READ_PREFERENCE              default read preference (default primary)
+    MONGO_READ_PREFERENCES             per-collection overrides, e.g. "notifications=primaryPreferred"
+    MONGO_ANALYTICS_READ_PREFERENCE    report queries (productivity, export), e.g. secondaryPreferred
+                                       (default: the daily_logs read preference)
+    MONGO_MAX_TIME_MS                  maxTimeMS sent with every read (default 5000, 0 disables)
+    MONGO_ANALYTICS_MAX_TIME_MS        maxTimeMS for report queries (default 30000, 0 disables)
+"""
+import importlib.util
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from pymongo.read_preferences import (
+    Nearest,
+    Primary,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred,
+    _ServerMode,
+)
+
+READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+# Compressor name -> package pymongo needs for it (zlib ships with Python)
+COMPRESSOR_PACKAGES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
+
+def read_preference(name: str) -> _ServerMode:
+    try:
+        return READ_PREFERENCES[name]()
+    except KeyError:
+        raise ValueError(f"Unknown read preference {name!r}, expected one of {', '.join(READ_PREFERENCES)}") from None
+
+
+def _parse_mapping(value: str) -> Dict[str, str]:
+    mapping = {}
+    for item in value.split(","):
+        if item.strip():
+            key, _, mode = item.partition("=")
+            mapping[key.strip()] = mode.strip()
+    return mapping
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, str(default)))
+
+
+@dataclass(frozen=True)
+class MongoSettings:
+    max_pool_size: int = 100
+    min_pool_size: int = 0
+    max_idle_time_ms: int = 0
+    wait_queue_timeout_ms: int = 0
+    server_selection_timeout_ms: int = 5000
+    connect_timeout_ms: int = 5000
+    compressors: Tuple[str, ...] = ()
+    read_preference: str = "primary"
+    read_preferences: Dict[str, str] = field(default_factory=dict)
+    analytics_read_preference: Optional[str] = None
+    max_time_ms: int = 5000
+    analytics_max_time_ms: int = 30000
+
+    @classmethod
+    def from_env(cls) -> "MongoSettings":
+        compressors = os.environ.get("MONGO_COMPRESSORS", "")
+        return cls(
+            max_pool_size=_env_int("MONGO_MAX_POOL_SIZE", 100),
+            min_pool_size=_env_int("MONGO_MIN_POOL_SIZE", 0),
+            max_idle_time_ms=_env_int("MONGO_MAX_IDLE_TIME_MS", 0),
+            wait_queue_timeout_ms=_env_int("MONGO_WAIT_QUEUE_TIMEOUT_MS", 0),
+            server_selection_timeout_ms=_env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000),
+            connect_timeout_ms=_env_int("MONGO_CONNECT_TIMEOUT_MS", 5000),
+            compressors=tuple(name.strip() for name in compressors.split(",") if name.strip()),
+            read_preference=os.environ.get("MONGO_READ_PREFERENCE", "primary"),
+            read_preferences=_parse_mapping(os.environ.get("MONGO_READ_PREFERENCES", "")),
+            analytics_read_preference=os.environ.get("MONGO_ANALYTICS_READ_PREFERENCE") or None,
+            max_time_ms=_env_int("MONGO_MAX_TIME_MS", 5000),
+            analytics_max_time_ms=_env_int("MONGO_ANALYTICS_MAX_TIME_MS", 30000),
+        )
+
+    def available_compressors(self) -> Tuple[str, ...]:
+        return tuple(
+            name for name in self.compressors
+            if name in COMPRESSOR_PACKAGES and importlib.util.find_spec(COMPRESSOR_PACKAGES[name])
+        )
+
+    def client_options(self) -> Dict[str, Any]:
+        """Keyword arguments for AsyncIOMotorClient; 0 means "driver default" for the optional timeouts."""
+        options: Dict[str, Any] = {
+            "maxPoolSize": self.max_pool_size,
+            "minPoolSize": self.min_pool_size,
+            "serverSelectionTimeoutMS": self.server_selection_timeout_ms,
+            "connectTimeoutMS": self.connect_timeout_ms,
+            "read_preference": read_preference(self.read_preference),
+        }
+        if self.max_idle_time_ms:
+            options["maxIdleTimeMS"] = self.max_idle_time_ms
+        if self.wait_queue_timeout_ms:
+            options["waitQueueTimeoutMS"] = self.wait_queue_timeout_ms
+        compressors = self.available_compressors()
+        if compressors:
+            options["compressors"] = ",".join(compressors)
+        return options
+
+    def collection_read_preference(self, collection: str) -> _ServerMode:
+        return read_preference(self.read_preferences.get(collection, self.read_preference))
+
+    def analytics_read_preference_for(self, collection: str) -> _ServerMode:
+        if self.analytics_read_preference:
+            return read_preference(self.analytics_read_preference)
+        return self.collection_read_preference(collection)
@@ -0,0 +1,242 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Tuple
+
+from pymongo import monitoring
+
+logger = logging.getLogger("devlog.db")
+
+# Commands issued by the driver itself rather than by a handler
+IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "saslStart", "saslContinue", "endSessions", "buildInfo"}
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+class QueryStats:
+    """Per-request counters. Motor runs commands on executor threads, so updates are locked."""
+
+    __slots__ = ("count", "duration_ms", "docs_returned", "_lock")
+
+    def __init__(self):
+        self.count = 0
+        self.duration_ms = 0.0
+        self.docs_returned = 0
+        self._lock = threading.Lock()
+
+    def record(self, duration_ms: float, docs_returned: int):
+        with self._lock:
+            self.count += 1
+            self.duration_ms += duration_ms
+            self.docs_returned += docs_returned
+
+
+query_stats_var: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def record_operation(duration_ms: float, docs_returned: int = 0):
+    """Attribute a storage operation that bypasses pymongo (in-memory, SQLite) to the current request."""
+    stats = query_stats_var.get()
+    if stats is not None:
+        stats.record(duration_ms, docs_returned)
+
+
+def filter_shape(value: Any) -> Any:
+    """Replace literal values in a query with '?' while keeping field names and operators."""
+    if isinstance(value, dict):
+        return {key: filter_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        # $and/$or hold sub-filters; $in and friends hold literal lists
+        if value and all(isinstance(item, dict) for item in value):
+            return [filter_shape(item) for item in value]
+        return "?"
+    return "?"
+
+
+def _command_filter(command_name: str, command: Dict[str, Any]) -> Any:
+    if command_name in ("find", "count", "distinct"):
+        return command.get("filter", command.get("query"))
+    if command_name == "findAndModify":
+        return command.get("query")
+    if command_name == "aggregate":
+        return [stage for stage in command.get("pipeline", []) if "$match" in stage]
+    if command_name == "update":
+        return [update.get("q") for update in command.get("updates", [])[:1]]
+    if command_name == "delete":
+        return [delete.get("q") for delete in command.get("deletes", [])[:1]]
+    return None
+
+
+def _docs_returned(reply: Dict[str, Any]) -> int:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        batch = cursor.get("firstBatch", cursor.get("nextBatch", []))
+        return len(batch)
+    if isinstance(reply.get("value"), dict):
+        return 1
+    n = reply.get("n")
+    return n if isinstance(n, int) else 0
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """Attributes every Mongo command to the request that issued it and logs slow ones."""
+
+    def __init__(self, slow_query_ms: Optional[float] = None):
+        if slow_query_ms is None:
+            slow_query_ms = float(os.environ.get("SLOW_QUERY_MS", "100"))
+        self.slow_query_ms = slow_query_ms
+        self._pending: Dict[Tuple[Any, int], Tuple[str, str, Any, Optional[str], Optional[QueryStats]]] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        collection = event.command.get(event.command_name)
+        shape = filter_shape(_command_filter(event.command_name, event.command))
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                event.command_name,
+                collection if isinstance(collection, str) else event.database_name,
+                shape,
+                request_id_var.get(),
+                query_stats_var.get(),
+            )
+
+    def _finish(self, event, docs_returned: int, failed: bool = False):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        command_name, collection, shape, request_id, stats = pending
+        duration_ms = event.duration_micros / 1000.0
+        if stats is not None:
+            stats.record(duration_ms, docs_returned)
+        if failed or duration_ms >= self.slow_query_ms:
+            logger.warning(
+                "%s mongo command request_id=%s command=%s collection=%s duration_ms=%.1f docs=%d filter=%s",
+                "Failed" if failed else "Slow",
+                request_id,
+                command_name,
+                collection,
+                duration_ms,
+                docs_returned,
+                shape,
+            )
+
+    def succeeded(self, event):
+        self._finish(event, _docs_returned(event.reply))
+
+    def failed(self, event):
+        self._finish(event, 0, failed=True)
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Tracks open and checked-out connections per server, since pymongo exposes no pool counters."""
+
+    def __init__(self):
+        self._servers: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(address) -> str:
+        return "%s:%s" % address if isinstance(address, tuple) else str(address)
+
+    def _bump(self, address, **deltas):
+        with self._lock:
+            server = self._servers.setdefault(self._key(address), {"open": 0, "checked_out": 0, "created": 0, "checkout_failures": 0})
+            for name, delta in deltas.items():
+                server[name] += delta
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {address: dict(counters) for address, counters in self._servers.items()}
+
+    def pool_created(self, event):
+        self._bump(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._servers.pop(self._key(event.address), None)
+
+    def connection_created(self, event):
+        self._bump(event.address, open=1, created=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._bump(event.address, open=-1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._bump(event.address, checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        self._bump(event.address, checked_out=1)
+
+    def connection_checked_in(self, event):
+        self._bump(event.address, checked_out=-1)
+
+
+class DBQueryMiddleware:
+    """ASGI middleware scoping query stats to a request and exposing them as debug headers."""
+
+    def __init__(self, app, debug_headers: Optional[bool] = None):
+        if debug_headers is None:
+            debug_headers = os.environ.get("DB_DEBUG_HEADERS", "false").lower() in ("1", "true", "yes")
+        self.app = app
+        self.debug_headers = debug_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+                break
+        request_id = request_id or uuid.uuid4().hex
+        stats = QueryStats()
+        request_token = request_id_var.set(request_id)
+        stats_token = query_stats_var.set(stats)
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", request_id.encode("latin-1")))
+                if self.debug_headers:
+                    headers.append((b"x-db-queries", str(stats.count).encode()))
+                    headers.append((b"x-db-time", f"{stats.duration_ms:.2f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000.0
+            if stats.count:
+                logger.debug(
+                    "request_id=%s path=%s db_queries=%d db_time_ms=%.1f docs=%d total_ms=%.1f",
+                    request_id,
+                    scope.get("path"),
+                    stats.count,
+                    stats.duration_ms,
+                    stats.docs_returned,
+                    elapsed_ms,
+                )
+            query_stats_var.reset(stats_token)
+            request_id_var.reset(request_token)
@@ -0,0 +1,94 @@
+"""
+Gunicorn settings for serving the API with several Uvicorn worker processes:
+
+    gunicorn -c gunicorn.conf.py server:app
+
+Every setting can be overridden from the environment (or .env):
+
+    WEB_CONCURRENCY      worker processes (default: CPUs available to the container);
+                         exported to the workers, which divide PROFILE_MAX_PER_MINUTE by it
+    PORT                 listen port (default 8001)
+    KEEPALIVE_SECONDS    idle keep-alive timeout (default 75, above nginx/LB idle timeouts)
+    BACKLOG              listen backlog (default 2048)
+    MAX_REQUESTS         recycle a worker after this many requests, 0 disables (default 10000)
+    MAX_REQUESTS_JITTER  random extra requests so workers don't recycle together (default 10%)
+    GRACEFUL_TIMEOUT     seconds a stopping worker gets to drain in-flight requests (default 30)
+    WORKER_TIMEOUT       seconds before a silent worker is killed and replaced (default 60)
+
+Uvicorn's "auto" loop and HTTP parser pick uvloop and httptools when they are installed.
+
+Workers share nothing: each opens its own Mongo pool (after fork, hence no preload_app),
+password-hash pool and caches. Prometheus metrics are merged across workers through
+METRICS_MULTIPROC_DIR. The in-memory storage backend keeps its data per process, so
+it always runs with a single worker.
+"""
+import importlib.util
+import math
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).parent / '.env')
+
+
+def available_cpus() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    # A container's CPU quota (cgroup v2) is usually below the host's core count
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8001')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.environ.get('WEB_CONCURRENCY', '0')) or available_cpus()
+if os.environ.get('STORAGE_BACKEND', 'mongo') == 'memory':
+    workers = 1
+# Workers inherit this and split per-server budgets by it (see profiling.ProfilingMiddleware)
+os.environ['WEB_CONCURRENCY'] = str(workers)
+
+keepalive = int(os.environ.get('KEEPALIVE_SECONDS', '75'))
+backlog = int(os.environ.get('BACKLOG', '2048'))
+max_requests = int(os.environ.get('MAX_REQUESTS', '10000'))
+max_requests_jitter = int(os.environ.get('MAX_REQUESTS_JITTER', str(max_requests // 10)))
+graceful_timeout = int(os.environ.get('GRACEFUL_TIMEOUT', '30'))
+timeout = int(os.environ.get('WORKER_TIMEOUT', '60'))
+
+# Motor clients and the trace export thread must not be shared across fork
+preload_app = False
+
+# Workers inherit this and write their metric snapshots there (see metrics.MultiProcessCollector)
+METRICS_DIR = os.environ.setdefault('METRICS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'devlog-metrics'))
+
+
+def on_starting(server):
+    # Snapshots from a previous run would be merged into this run's totals
+    shutil.rmtree(METRICS_DIR, ignore_errors=True)
+    os.makedirs(METRICS_DIR, exist_ok=True)
+
+
+def when_ready(server):
+    server.log.info(
+        "Serving with %d workers, loop=%s, http=%s, max_requests=%d",
+        workers,
+        "uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        "httptools" if importlib.util.find_spec("httptools") else "h11",
+        max_requests,
+    )
+
+
+def child_exit(server, worker):
+    from metrics import mark_process_dead
+
+    mark_process_dead(METRICS_DIR, worker.pid)
@@ -0,0 +1,384 @@
+import copy
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from starlette.routing import Match
+
+# Prometheus text exposition format
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+DEFAULT_SIZE_BUCKETS = (100, 500, 1_000, 5_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000)
+
+UNMATCHED_ROUTE = "__unmatched__"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape_label(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{_escape_label(extra[1])}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+
+    def expose(self) -> List[str]:
+        raise NotImplementedError
+
+    def dump(self) -> List[list]:
+        """JSON-serialisable samples, for sharing between worker processes."""
+        return [[list(key), copy.copy(value)] for key, value in dict(self._values).items()]
+
+    def load(self, samples: List[list]):
+        """Add dumped samples to this metric's values."""
+        for key, value in samples:
+            key = tuple(key)
+            current = self._values.get(key)
+            if current is None:
+                self._values[key] = copy.copy(value)
+            elif isinstance(current, list):
+                self._values[key] = [a + b for a, b in zip(current, value)]
+            else:
+                self._values[key] = current + value
+
+    def empty_copy(self) -> "_Metric":
+        clone = copy.copy(self)
+        clone._values = {}
+        return clone
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def expose(self) -> List[str]:
+        lines = self.header()
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def expose(self) -> List[str]:
+        lines = self.header()
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # key -> [per-bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = [0.0] * (len(self.buckets) + 2)
+            self._values[key] = state
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                state[i] += 1
+                break
+        state[-2] += value
+        state[-1] += 1
+
+    def expose(self) -> List[str]:
+        lines = self.header()
+        for key, state in sorted(self._values.items()):
+            cumulative = 0.0
+            for i, bound in enumerate(self.buckets):
+                cumulative += state[i]
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(state[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def metrics(self) -> List[_Metric]:
+        return list(self._metrics.values())
+
+    def generate_latest(self) -> str:
+        return _expose(self.metrics())
+
+
+def _expose(metrics: Iterable[_Metric]) -> str:
+    lines: List[str] = []
+    for metric in metrics:
+        lines.extend(metric.expose())
+    return "\n".join(lines) + "\n"
+
+
+ARCHIVE_FILE = "archive.json"
+
+
+def _read_snapshot(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_snapshot(path: Path, snapshot: Dict[str, Any]):
+    # Write-then-rename so a scraping worker never reads a half-written file
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(snapshot, f)
+    os.replace(tmp_path, path)
+
+
+class MultiProcessCollector:
+    """Shares one registry between worker processes through a snapshot file per worker pid.
+
+    Each worker rewrites its own file every `flush_interval` seconds and right before it
+    answers a scrape, and the scrape merges every file in `directory`. Gauges only count
+    live workers; counters and histograms of exited workers are kept in archive.json (see
+    mark_process_dead) so totals stay monotonic when workers are recycled.
+    """
+
+    def __init__(self, registry: MetricsRegistry, directory: str, flush_interval: float = 5.0):
+        self.registry = registry
+        self.directory = Path(directory)
+        self.flush_interval = flush_interval
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def flush(self):
+        snapshot = {
+            "pid": os.getpid(),
+            "metrics": {
+                metric.name: {"type": metric.type_name, "samples": metric.dump()}
+                for metric in self.registry.metrics()
+            },
+        }
+        _write_snapshot(self.directory / f"{os.getpid()}.json", snapshot)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="devlog-metrics-flush", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def generate_latest(self) -> str:
+        self.flush()
+        merged = {metric.name: metric.empty_copy() for metric in self.registry.metrics()}
+        for path in sorted(self.directory.glob("*.json")):
+            snapshot = _read_snapshot(path)
+            if snapshot is None:
+                continue
+            for name, data in snapshot.get("metrics", {}).items():
+                if name in merged:
+                    merged[name].load(data["samples"])
+        return _expose(merged.values())
+
+
+def mark_process_dead(directory: str, pid: int):
+    """Fold an exited worker's counters and histograms into the archive and drop its gauges.
+
+    Call from the process manager (gunicorn's child_exit hook), never from a worker.
+    """
+    path = Path(directory) / f"{pid}.json"
+    snapshot = _read_snapshot(path)
+    if snapshot is None:
+        return
+    archive_path = Path(directory) / ARCHIVE_FILE
+    archive = _read_snapshot(archive_path) or {"pid": None, "metrics": {}}
+    for name, data in snapshot.get("metrics", {}).items():
+        if data["type"] == "gauge":
+            continue
+        # A throwaway metric does the per-type merging of archived and new samples
+        merged = _Metric(name, "")
+        merged.load(archive["metrics"].get(name, {}).get("samples", []))
+        merged.load(data["samples"])
+        archive["metrics"][name] = {"type": data["type"], "samples": merged.dump()}
+    _write_snapshot(archive_path, archive)
+    path.unlink(missing_ok=True)
+
+
+registry = MetricsRegistry()
+
+# Set by configure_metrics() when several worker processes serve the app
+multiprocess: Optional[MultiProcessCollector] = None
+
+
+def configure_metrics() -> Optional[MultiProcessCollector]:
+    """Share metrics between workers when METRICS_MULTIPROC_DIR is set (gunicorn.conf.py sets it)."""
+    global multiprocess
+    directory = os.environ.get("METRICS_MULTIPROC_DIR")
+    if directory and multiprocess is None:
+        multiprocess = MultiProcessCollector(registry, directory, float(os.environ.get("METRICS_FLUSH_SECONDS", "5")))
+    return multiprocess
+
+
+def generate_latest() -> str:
+    """Prometheus exposition for this process, or for all workers in multi-process mode."""
+    if multiprocess is not None:
+        return multiprocess.generate_latest()
+    return registry.generate_latest()
+
+HTTP_REQUESTS_TOTAL = registry.counter(
+    "http_requests_total",
+    "Total HTTP requests by route template, method and status class.",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route"),
+)
+HTTP_RESPONSE_SIZE = registry.histogram(
+    "http_response_size_bytes",
+    "HTTP response body size by route template.",
+    ("method", "route"),
+    buckets=DEFAULT_SIZE_BUCKETS,
+)
+HTTP_REQUESTS_IN_PROGRESS = registry.gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served by route template.",
+    ("method", "route"),
+)
+
+
+def route_template(app, scope) -> str:
+    """Resolve the route template (e.g. /api/logs/{log_id}) for a request scope."""
+    router = getattr(app, "router", None)
+    if router is None:
+        return UNMATCHED_ROUTE
+    partial = None
+    for route in router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request count, latency, size and concurrency per route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(scope.get("app"), scope)
+        status_code = 500
+        response_size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc(method=method, route=route)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_REQUESTS_IN_PROGRESS.dec(method=method, route=route)
+            HTTP_REQUESTS_TOTAL.inc(method=method, route=route, status=f"{status_code // 100}xx")
+            HTTP_REQUEST_DURATION.observe(elapsed, method=method, route=route)
+            HTTP_RESPONSE_SIZE.observe(response_size, method=method, route=route)
@@ -0,0 +1,224 @@
+import asyncio
+import hmac
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+logger = logging.getLogger("devlog.profiling")
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_FORMATS = ("collapsed", "speedscope")
+
+Frame = Tuple[str, str, int]  # (function, filename, first line)
+
+
+class StackSampler:
+    """Samples the call stack of one thread at a fixed interval from a background thread."""
+
+    def __init__(self, thread_id: int, interval: float = 0.001):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="devlog-profiler", daemon=True)
+
+    def _run(self):
+        start = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack: List[Frame] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                stack.reverse()
+                self.samples[tuple(stack)] += 1
+        self.duration = time.perf_counter() - start
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed stack format, consumable by flamegraph.pl and speedscope."""
+        lines = []
+        for stack, count in self.samples.most_common():
+            names = ";".join(f"{name} ({Path(filename).name}:{line})" for name, filename, line in stack)
+            lines.append(f"{names} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name: str) -> Dict:
+        frames: List[Dict] = []
+        frame_index: Dict[Frame, int] = {}
+        samples = []
+        weights = []
+        for stack, count in self.samples.items():
+            indices = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                indices.append(frame_index[frame])
+            samples.append(indices)
+            weights.append(count * self.interval)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+            "name": name,
+            "exporter": "devlog-profiler",
+        }
+
+
+class ProfileRateLimiter:
+    """Per-process limit on profiled requests: at most one at a time and `max_per_minute` overall."""
+
+    def __init__(self, max_per_minute: float):
+        self.min_interval = 60.0 / max_per_minute if max_per_minute > 0 else float("inf")
+        self._last_start = float("-inf")
+        self._active = False
+
+    def acquire(self) -> bool:
+        now = time.monotonic()
+        if self._active or now - self._last_start < self.min_interval:
+            return False
+        self._active = True
+        self._last_start = now
+        return True
+
+    def release(self):
+        self._active = False
+
+
+class ProfilingMiddleware:
+    """Opt-in per-request sampling profiler.
+
+    A request is profiled when it carries `X-Profile: <PROFILING_TOKEN>` or
+    `?profile=<PROFILING_TOKEN>`; profiling is disabled if no token is configured.
+    The event loop thread is sampled while the request is in flight, so
+    concurrent requests on the same worker also show up in the profile.
+    Profiles are written to PROFILE_DIR and the file name is returned in
+    `X-Profile-File`.
+
+    Settings come from the environment:
+
+        PROFILING_TOKEN         token a request must present; empty disables profiling
+        PROFILE_DIR             where profiles are written (default /tmp/devlog-profiles)
+        PROFILE_MAX_PER_MINUTE  profiled requests per minute across the server (default 6)
+        PROFILE_INTERVAL_MS     sampling interval (default 1)
+
+    The limiter lives in each worker process, so PROFILE_MAX_PER_MINUTE is split
+    evenly over the WEB_CONCURRENCY workers (gunicorn.conf.py exports the count
+    it starts). "One at a time" still holds per worker, not across the server.
+    """
+
+    def __init__(
+        self,
+        app,
+        token: Optional[str] = None,
+        output_dir: Optional[str] = None,
+        max_per_minute: Optional[float] = None,
+        interval_ms: Optional[float] = None,
+    ):
+        self.app = app
+        self.token = token if token is not None else os.environ.get("PROFILING_TOKEN", "")
+        self.output_dir = Path(output_dir or os.environ.get("PROFILE_DIR", "/tmp/devlog-profiles"))
+        if max_per_minute is None:
+            max_per_minute = float(os.environ.get("PROFILE_MAX_PER_MINUTE", "6"))
+            max_per_minute /= max(1, int(os.environ.get("WEB_CONCURRENCY", "0") or 1))
+        if interval_ms is None:
+            interval_ms = float(os.environ.get("PROFILE_INTERVAL_MS", "1"))
+        self.interval = interval_ms / 1000.0
+        self.rate_limiter = ProfileRateLimiter(max_per_minute)
+
+    def _requested(self, scope) -> Tuple[Optional[str], str]:
+        supplied = None
+        profile_format = PROFILE_FORMATS[0]
+        for name, value in scope.get("headers", []):
+            if name == PROFILE_HEADER:
+                supplied = value.decode("latin-1")
+            elif name == b"x-profile-format":
+                profile_format = value.decode("latin-1")
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        if supplied is None and PROFILE_QUERY_PARAM in query:
+            supplied = query[PROFILE_QUERY_PARAM][0]
+        if "profile_format" in query:
+            profile_format = query["profile_format"][0]
+        if profile_format not in PROFILE_FORMATS:
+            profile_format = PROFILE_FORMATS[0]
+        return supplied, profile_format
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.token:
+            await self.app(scope, receive, send)
+            return
+
+        supplied, profile_format = self._requested(scope)
+        if supplied is None or not hmac.compare_digest(supplied.encode(), self.token.encode()):
+            await self.app(scope, receive, send)
+            return
+
+        if not self.rate_limiter.acquire():
+            async def send_limited(message):
+                if message["type"] == "http.response.start":
+                    message = {**message, "headers": list(message.get("headers", [])) + [(b"x-profile-status", b"rate-limited")]}
+                await send(message)
+
+            await self.app(scope, receive, send_limited)
+            return
+
+        extension = "json" if profile_format == "speedscope" else "folded"
+        filename = f"{int(time.time())}-{uuid.uuid4().hex[:8]}.{extension}"
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-status", b"recorded"))
+                headers.append((b"x-profile-file", filename.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            self.rate_limiter.release()
+            name = f"{scope['method']} {scope['path']}"
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._write, filename, sampler, profile_format, name)
+
+    def _write(self, filename: str, sampler: StackSampler, profile_format: str, name: str):
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            path = self.output_dir / filename
+            if profile_format == "speedscope":
+                path.write_text(json.dumps(sampler.speedscope(name)))
+            else:
+                path.write_text(sampler.collapsed())
+            logger.info("Wrote profile for %s (%.1f ms, %d samples) to %s", name, sampler.duration * 1000, sum(sampler.samples.values()), path)
+        except OSError as e:
+            logger.error("Failed to write profile %s: %s", filename, e)
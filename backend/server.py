@@ -1,45 +1,116 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header, Query, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import asyncio
+import contextvars
+import functools
+import hashlib
+import json
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
-import uuid
+from pydantic import AfterValidator, BaseModel, Field
+from typing import Annotated, List, Literal, Optional, Dict, Any
 from datetime import datetime, timedelta, date
-from passlib.context import CryptContext
-from jose import JWTError, jwt
-import pandas as pd
 from io import StringIO
 
+from metrics import MetricsMiddleware, configure_metrics, generate_latest as generate_metrics, CONTENT_TYPE_LATEST
+from db_monitoring import CommandMonitor, DBQueryMiddleware
+from profiling import ProfilingMiddleware
+from tracing import tracer, configure_tracing, TracingMiddleware, TracedRoute, TracingCommandListener
+from storage import create_storage
+from storage.ids import new_id, normalize_id
+from suggestions import TaskSuggestions
+from trends import HISTORY_DAYS, compute_trends
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
+configure_tracing()
+metrics_collector = configure_metrics()
+
+# Storage engine: "mongo" (default), "sqlite" or "memory"
+storage = create_storage(
+    os.environ.get('STORAGE_BACKEND', 'mongo'),
+    mongo_url=os.environ.get('MONGO_URL'),
+    db_name=os.environ.get('DB_NAME'),
+    sqlite_path=os.environ.get('SQLITE_PATH', str(ROOT_DIR / 'devlog.db')),
+    sqlite_workers=int(os.environ.get('SQLITE_WORKERS', '4')),
+    client_options={"event_listeners": [CommandMonitor(), TracingCommandListener()]},
+)
+task_suggestions = TaskSuggestions(storage)
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm connections, indexes and auth before serving; drain background work after the last request."""
+    try:
+        await storage.ensure_indexes()
+        await storage.warm_up(int(os.environ.get('STARTUP_WARM_CONNECTIONS', '4')))
+    except Exception as e:
+        # Keep serving so /api/health/ready can report the storage problem
+        logger.warning("Could not warm up storage: %s", e)
+    await warm_up_auth()
+    if metrics_collector is not None:
+        metrics_collector.start()
+    yield
+    # uvicorn has already waited for in-flight requests; flush what they left behind
+    await asyncio.to_thread(shutdown_password_executor)
+    if tracer.processor is not None:
+        await asyncio.to_thread(tracer.processor.shutdown)
+    if metrics_collector is not None:
+        metrics_collector.stop()
+    storage.close()
 
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Create a router with the /api prefix
-api_router = APIRouter(prefix="/api")
+api_router = APIRouter(prefix="/api", route_class=TracedRoute)
 
 # Security
 SECRET_KEY = "your-secret-key-change-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# passlib, jose and pandas are imported on first use to keep worker start-up fast;
+# tests/test_import_time.py fails if one of them creeps back into `import server`
+@functools.lru_cache(maxsize=None)
+def get_pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# bcrypt releases the GIL, so hashing on a small pool keeps it off the event loop
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '2'))
+_password_executor: Optional[ThreadPoolExecutor] = None
+
+def password_executor() -> ThreadPoolExecutor:
+    """The hashing pool, created on first use so an app started again after shutdown (tests) gets a new one."""
+    global _password_executor
+    if _password_executor is None:
+        _password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="devlog-bcrypt")
+    return _password_executor
+
+def shutdown_password_executor():
+    global _password_executor
+    executor, _password_executor = _password_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
 security = HTTPBearer()
 
+# Ids: new ones are ObjectId hex strings, older ones UUID4 strings; both are accepted
+EntityId = Annotated[str, AfterValidator(normalize_id)]
+# The registration form sends "" when no manager is picked
+OptionalEntityId = Annotated[Optional[str], AfterValidator(lambda value: normalize_id(value) if value else None)]
+
 # Models
 class User(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     username: str
     email: str
     role: str  # "developer" or "manager"
@@ -52,7 +123,7 @@ class UserCreate(BaseModel):
     email: str
     password: str
     role: str
-    manager_id: Optional[str] = None
+    manager_id: OptionalEntityId = None
 
 class UserLogin(BaseModel):
     username: str
@@ -77,7 +148,7 @@ class Task(BaseModel):
     completed: bool = True
 
 class DailyLog(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     user_id: str
     date: date
     tasks: List[Task]
@@ -86,6 +157,7 @@ class DailyLog(BaseModel):
     blockers: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    version: int = 1  # bumped by every update; send it back in If-Match
 
 class DailyLogCreate(BaseModel):
     date: date
@@ -105,21 +177,92 @@ class DailyLogResponse(BaseModel):
     blockers: Optional[str] = None
     created_at: datetime
     updated_at: datetime
+    version: int = 0  # logs written before versioning have none
     feedback: Optional[str] = None
+    feedback_count: int = 0
+    feedback_at: Optional[datetime] = None
+
+class SearchHit(DailyLogResponse):
+    score: float
+
+class SearchResults(BaseModel):
+    query: str
+    offset: int
+    limit: int
+    has_more: bool
+    results: List[SearchHit]
+
+class BlockerWeek(BaseModel):
+    week: str  # ISO date of the Monday starting the week
+    blocker: str
+    count: int
+    developer_ids: List[str]
+
+class BlockerStreak(BaseModel):
+    days: int
+    start: str
+    end: str
+
+class DeveloperBlockers(BaseModel):
+    developer_id: str
+    developer_name: str
+    blocked_days: int
+    longest_streak: Optional[BlockerStreak] = None
+    latest_streak: Optional[BlockerStreak] = None
+
+class TeamBlockers(BaseModel):
+    start_date: date
+    end_date: date
+    weeks: List[BlockerWeek]
+    developers: List[DeveloperBlockers]
+
+class Heatmap(BaseModel):
+    # values is row-major: values[i * len(dates) + j] is developer i on dates[j], 0 without a log
+    # (as in /api/analytics/productivity)
+    metric: str
+    start_date: date
+    end_date: date
+    developer_ids: List[str]
+    developer_names: List[str]
+    dates: List[str]
+    values: List[float]
+
+class TrendWeek(BaseModel):
+    week: str  # ISO date of the Monday starting the week
+    logs: int
+    hours: Optional[float] = None
+    mood: Optional[float] = None
+    hours_delta: Optional[float] = None  # change from the previous week
+    mood_delta: Optional[float] = None
+
+class Trends(BaseModel):
+    # Per-day series line up with `dates`; null where there are no logs to average
+    start_date: date
+    end_date: date
+    logs: int
+    dates: List[str]
+    hours: List[Optional[float]]
+    mood: List[Optional[float]]
+    hours_7d: List[Optional[float]]
+    hours_28d: List[Optional[float]]
+    mood_7d: List[Optional[float]]
+    mood_28d: List[Optional[float]]
+    weeks: List[TrendWeek]
+    hours_mood_correlation: Optional[float] = None
 
 class Feedback(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     log_id: str
     manager_id: str
     feedback_text: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class FeedbackCreate(BaseModel):
-    log_id: str
+    log_id: EntityId
     feedback_text: str
 
 class Notification(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     user_id: str
     message: str
     type: str  # "reminder", "feedback", "info"
@@ -128,12 +271,118 @@ class Notification(BaseModel):
 
 # Utility functions
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    with tracer.span("bcrypt.verify"):
+        return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    with tracer.span("bcrypt.hash"):
+        return get_pwd_context().hash(password)
+
+async def run_password_hash(fn, *args):
+    # Copy the context so bcrypt spans stay attached to the request trace
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor(), contextvars.copy_context().run, fn, *args)
+
+async def warm_up_auth():
+    """Start every hashing thread and load the bcrypt and JWT backends before the first login."""
+    sample_hash = await run_password_hash(get_password_hash, "warm-up")
+    await asyncio.gather(*(
+        run_password_hash(verify_password, "warm-up", sample_hash)
+        for _ in range(PASSWORD_HASH_WORKERS)
+    ))
+    from jose import jwt
+    jwt.decode(create_access_token({"sub": "warm-up"}), SECRET_KEY, algorithms=[ALGORITHM])
+
+def feedback_fields(log: dict) -> dict:
+    """DailyLogResponse feedback fields, read from the summary kept on the log itself."""
+    summary = log.get("feedback_summary") or {}
+    return {
+        "feedback": summary.get("latest_text"),
+        "feedback_count": summary.get("count", 0),
+        "feedback_at": summary.get("last_at"),
+    }
+
+# How long a write's first response is replayed to retries carrying the same Idempotency-Key
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', '86400'))
+# How long a request in progress holds its key. A worker killed mid-request never releases it,
+# so a retry takes the key over after this; keep it above gunicorn's WORKER_TIMEOUT (60s)
+IDEMPOTENCY_LEASE_SECONDS = int(os.environ.get('IDEMPOTENCY_LEASE_SECONDS', '90'))
+
+IdempotencyKey = Annotated[Optional[str], Header(alias="Idempotency-Key", max_length=255)]
+
+def request_fingerprint(route: str, payload: BaseModel) -> str:
+    body = json.dumps(jsonable_encoder(payload), sort_keys=True)
+    return hashlib.sha256(f"{route}\n{body}".encode()).hexdigest()
+
+async def run_idempotent(key: Optional[str], user: User, route: str, payload: BaseModel, handler):
+    """Run `handler` once per user and Idempotency-Key; retries get the stored first response.
+
+    4xx outcomes are stored too, so a retry sees what the first attempt saw. Errors and
+    5xx responses release the key, letting the client retry for real.
+    """
+    if not key:
+        return await handler()
+    fingerprint = request_fingerprint(route, payload)
+    lease_until = datetime.utcnow() + timedelta(seconds=IDEMPOTENCY_LEASE_SECONDS)
+    record = await storage.idempotency.reserve(user.id, key, fingerprint, lease_until)
+    if record is not None:
+        if record["fingerprint"] != fingerprint:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+        if record["status_code"] is None:
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still being processed")
+        return JSONResponse(record["body"], status_code=record["status_code"], headers={"Idempotent-Replayed": "true"})
+
+    def replay_until():
+        return datetime.utcnow() + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS)
+
+    try:
+        result = await handler()
+    except HTTPException as e:
+        if e.status_code >= 500:
+            await storage.idempotency.release(user.id, key)
+        else:
+            await storage.idempotency.complete(user.id, key, e.status_code, {"detail": e.detail}, replay_until())
+        raise
+    except BaseException:
+        await storage.idempotency.release(user.id, key)
+        raise
+    await storage.idempotency.complete(user.id, key, status.HTTP_200_OK, jsonable_encoder(result), replay_until())
+    return result
+
+def parse_if_match(value: Optional[str]) -> Optional[int]:
+    """Log version named by an If-Match header ("3", W/"3" or 3); None when absent or "*"."""
+    if value is None or value.strip() == "*":
+        return None
+    try:
+        return int(value.strip().removeprefix("W/").strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="If-Match must name a log version") from None
+
+def blocked_streaks(dates: List[str], logged: Optional[set] = None) -> List[BlockerStreak]:
+    """Runs of blocked days in ascending ISO dates.
+
+    A weekend between two blocked days does not end a run unless one of its days is in `logged`,
+    the dates with a log at all: a weekend log without a blocker is an explicit unblocked day.
+    """
+    logged = logged or set()
+    streaks = []
+    for value in dates:
+        day = date.fromisoformat(value)
+        if streaks:
+            last = date.fromisoformat(streaks[-1].end)
+            gap = [last + timedelta(days=i) for i in range(1, (day - last).days)]
+            if day > last and all(d.weekday() >= 5 and d.isoformat() not in logged for d in gap):
+                streaks[-1].days += 1
+                streaks[-1].end = value
+                continue
+        streaks.append(BlockerStreak(days=1, start=value, end=value))
+    return streaks
+
+def iso_date(value: Optional[date]) -> Optional[str]:
+    return value.isoformat() if value else None
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    from jose import jwt
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -143,35 +392,43 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    credentials_exception = HTTPException(
+def credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+@tracer.traced("auth.get_current_user_id")
+async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
+    """The user id in a valid token, without loading the user (for per-keystroke endpoints)."""
+    from jose import JWTError, jwt
     try:
         payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
         if user_id is None:
-            raise credentials_exception
+            raise credentials_exception()
     except JWTError:
-        raise credentials_exception
-    
-    user = await db.users.find_one({"id": user_id})
+        raise credentials_exception()
+    return user_id
+
+@tracer.traced("auth.get_current_user")
+async def get_current_user(user_id: str = Depends(get_current_user_id)):
+    user = await storage.users.get(user_id)
     if user is None:
-        raise credentials_exception
+        raise credentials_exception()
     return User(**user)
 
 # Authentication routes
 @api_router.post("/auth/register", response_model=Token)
 async def register(user_data: UserCreate):
     # Check if user exists
-    existing_user = await db.users.find_one({"$or": [{"username": user_data.username}, {"email": user_data.email}]})
+    existing_user = await storage.users.find_by_username_or_email(user_data.username, user_data.email)
     if existing_user:
         raise HTTPException(status_code=400, detail="Username or email already registered")
     
     # Create user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await run_password_hash(get_password_hash, user_data.password)
     user = User(
         username=user_data.username,
         email=user_data.email,
@@ -180,7 +437,7 @@ async def register(user_data: UserCreate):
         manager_id=user_data.manager_id
     )
     
-    await db.users.insert_one(user.dict())
+    await storage.users.create(user.dict())
     
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -194,7 +451,7 @@ async def register(user_data: UserCreate):
         message=f"Welcome to DevLog, {user.username}! Start logging your daily work.",
         type="info"
     )
-    await db.notifications.insert_one(welcome_notification.dict())
+    await storage.notifications.create(welcome_notification.dict())
     
     return Token(
         access_token=access_token,
@@ -204,8 +461,8 @@ async def register(user_data: UserCreate):
 
 @api_router.post("/auth/login", response_model=Token)
 async def login(login_data: UserLogin):
-    user = await db.users.find_one({"username": login_data.username})
-    if not user or not verify_password(login_data.password, user["password_hash"]):
+    user = await storage.users.get_by_username(login_data.username)
+    if not user or not await run_password_hash(verify_password, login_data.password, user["password_hash"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -225,9 +482,15 @@ async def login(login_data: UserLogin):
 
 # Daily log routes
 @api_router.post("/logs", response_model=DailyLog)
-async def create_daily_log(log_data: DailyLogCreate, current_user: User = Depends(get_current_user)):
+async def create_daily_log(log_data: DailyLogCreate, current_user: User = Depends(get_current_user), idempotency_key: IdempotencyKey = None):
+    return await run_idempotent(
+        idempotency_key, current_user, "POST /api/logs", log_data,
+        lambda: insert_daily_log(log_data, current_user),
+    )
+
+async def insert_daily_log(log_data: DailyLogCreate, current_user: User):
     # Check if log already exists for this date
-    existing_log = await db.daily_logs.find_one({"user_id": current_user.id, "date": log_data.date.isoformat()})
+    existing_log = await storage.daily_logs.get_by_date(current_user.id, log_data.date.isoformat())
     if existing_log:
         raise HTTPException(status_code=400, detail="Log already exists for this date")
     
@@ -241,11 +504,12 @@ async def create_daily_log(log_data: DailyLogCreate, current_user: User = Depend
         blockers=log_data.blockers
     )
     
-    # Convert date to string for MongoDB storage
+    # Convert date to string for storage
     log_dict = daily_log.dict()
     log_dict["date"] = log_data.date.isoformat()
     
-    await db.daily_logs.insert_one(log_dict)
+    await storage.daily_logs.create(log_dict)
+    task_suggestions.record_log(log_dict)
     
     # Notify manager if user has one
     if current_user.manager_id:
@@ -254,111 +518,222 @@ async def create_daily_log(log_data: DailyLogCreate, current_user: User = Depend
             message=f"{current_user.username} submitted a daily log for {log_data.date}",
             type="info"
         )
-        await db.notifications.insert_one(manager_notification.dict())
+        await storage.notifications.create(manager_notification.dict())
     
     return daily_log
 
 @api_router.get("/logs", response_model=List[DailyLogResponse])
-async def get_logs(current_user: User = Depends(get_current_user), start_date: Optional[str] = None, end_date: Optional[str] = None):
-    query = {"user_id": current_user.id}
-    
-    if start_date:
-        query["date"] = {"$gte": start_date}
-    if end_date:
-        if "date" not in query:
-            query["date"] = {}
-        query["date"]["$lte"] = end_date
+async def get_logs(current_user: User = Depends(get_current_user), start_date: Optional[date] = None, end_date: Optional[date] = None):
+    logs = await storage.daily_logs.list_for_users([current_user.id], iso_date(start_date), iso_date(end_date))
     
-    logs = await db.daily_logs.find(query).sort("date", -1).to_list(1000)
-    
-    # Get feedback for each log
     result = []
     for log in logs:
-        feedback = await db.feedback.find_one({"log_id": log["id"]})
         log_response = DailyLogResponse(
             **log,
             user_name=current_user.username,
-            feedback=feedback["feedback_text"] if feedback else None
+            **feedback_fields(log)
         )
         result.append(log_response)
     
     return result
 
 @api_router.put("/logs/{log_id}", response_model=DailyLog)
-async def update_daily_log(log_id: str, log_data: DailyLogCreate, current_user: User = Depends(get_current_user)):
-    existing_log = await db.daily_logs.find_one({"id": log_id, "user_id": current_user.id})
-    if not existing_log:
-        raise HTTPException(status_code=404, detail="Log not found")
-    
+async def update_daily_log(log_id: EntityId, log_data: DailyLogCreate, response: Response, current_user: User = Depends(get_current_user), if_match: Optional[str] = Header(None)):
+    expected_version = parse_if_match(if_match)
     update_data = log_data.dict()
     update_data["updated_at"] = datetime.utcnow()
-    update_data["date"] = log_data.date.isoformat()  # Convert date to string for MongoDB
-    
-    await db.daily_logs.update_one({"id": log_id}, {"$set": update_data})
-    
-    updated_log = await db.daily_logs.find_one({"id": log_id})
+    update_data["date"] = log_data.date.isoformat()  # Convert date to string for storage
+    
+    # The version check is part of the update itself, so concurrent edits cannot both succeed
+    updated_log = await storage.daily_logs.update(log_id, current_user.id, update_data, expected_version)
+    if not updated_log:
+        # Only failed updates pay for this read, to tell a stale version from a missing log
+        current_log = await storage.daily_logs.get_for_user(log_id, current_user.id) if expected_version is not None else None
+        if current_log is None:
+            raise HTTPException(status_code=404, detail="Log not found")
+        current_version = current_log.get("version", 0)
+        raise HTTPException(
+            status_code=409,
+            detail=f"Log was modified by another request (version {current_version}, expected {expected_version})",
+            headers={"ETag": f'"{current_version}"'},
+        )
+    task_suggestions.record_log(updated_log)
+    response.headers["ETag"] = f'"{updated_log["version"]}"'
     return DailyLog(**updated_log)
 
+@api_router.get("/tasks/suggest", response_model=List[str])
+async def suggest_tasks(
+    prefix: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(8, ge=1, le=20),
+    user_id: str = Depends(get_current_user_id),
+):
+    # Served from the in-process prefix index; only a user's first keystroke loads their logs
+    return await task_suggestions.suggest(user_id, prefix, limit)
+
 # Manager routes
 @api_router.get("/team/logs", response_model=List[DailyLogResponse])
-async def get_team_logs(current_user: User = Depends(get_current_user), start_date: Optional[str] = None, end_date: Optional[str] = None, developer_id: Optional[str] = None):
+async def get_team_logs(current_user: User = Depends(get_current_user), start_date: Optional[date] = None, end_date: Optional[date] = None, developer_id: OptionalEntityId = None):
     if current_user.role != "manager":
         raise HTTPException(status_code=403, detail="Only managers can view team logs")
     
     # Get developers under this manager
-    developers = await db.users.find({"manager_id": current_user.id}).to_list(1000)
+    developers = await storage.users.list_by_manager(current_user.id)
     developer_ids = [dev["id"] for dev in developers]
     
-    query = {"user_id": {"$in": developer_ids}}
-    
     if developer_id:
-        query["user_id"] = developer_id
-    if start_date:
-        query["date"] = {"$gte": start_date}
-    if end_date:
-        if "date" not in query:
-            query["date"] = {}
-        query["date"]["$lte"] = end_date
+        developer_ids = [developer_id]
     
-    logs = await db.daily_logs.find(query).sort("date", -1).to_list(1000)
+    logs = await storage.daily_logs.list_for_users(developer_ids, iso_date(start_date), iso_date(end_date))
     
-    # Get user names and feedback
+    # Get user names with one lookup instead of one per log; feedback is stored on the log
+    users_by_id = {dev["id"]: dev for dev in developers}
+    missing_user_ids = {log["user_id"] for log in logs} - users_by_id.keys()
+    if missing_user_ids:
+        users_by_id.update({user["id"]: user for user in await storage.users.get_many(missing_user_ids)})
     result = []
     for log in logs:
-        user = await db.users.find_one({"id": log["user_id"]})
-        feedback = await db.feedback.find_one({"log_id": log["id"]})
+        user = users_by_id.get(log["user_id"])
         log_response = DailyLogResponse(
             **log,
             user_name=user["username"] if user else "Unknown",
-            feedback=feedback["feedback_text"] if feedback else None
+            **feedback_fields(log)
         )
         result.append(log_response)
     
     return result
 
+@api_router.get("/search", response_model=SearchResults)
+async def search_logs(
+    q: str = Query(..., min_length=1, max_length=200),
+    offset: int = Query(0, ge=0, le=1000),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+):
+    # Developers search their own logs, managers their team's
+    if current_user.role == "manager":
+        users_by_id = {dev["id"]: dev for dev in await storage.users.list_by_manager(current_user.id)}
+    else:
+        users_by_id = {current_user.id: current_user.dict()}
+    
+    # One extra hit tells whether there is a next page without counting every match
+    logs = await storage.daily_logs.search(list(users_by_id), q, offset, limit + 1) if users_by_id else []
+    results = [
+        SearchHit(**log, user_name=users_by_id[log["user_id"]]["username"], **feedback_fields(log))
+        for log in logs[:limit]
+    ]
+    return SearchResults(query=q, offset=offset, limit=limit, has_more=len(logs) > limit, results=results)
+
 @api_router.get("/team/developers", response_model=List[UserResponse])
 async def get_team_developers(current_user: User = Depends(get_current_user)):
     if current_user.role != "manager":
         raise HTTPException(status_code=403, detail="Only managers can view team developers")
     
-    developers = await db.users.find({"manager_id": current_user.id}).to_list(1000)
+    developers = await storage.users.list_by_manager(current_user.id)
     return [UserResponse(**dev) for dev in developers]
 
+@api_router.get("/team/blockers", response_model=TeamBlockers)
+async def get_team_blockers(current_user: User = Depends(get_current_user), start_date: Optional[date] = None, end_date: Optional[date] = None):
+    if current_user.role != "manager":
+        raise HTTPException(status_code=403, detail="Only managers can view team blockers")
+    
+    end_date = end_date or datetime.utcnow().date()
+    start_date = start_date or end_date - timedelta(weeks=12) + timedelta(days=1)
+    developers = await storage.users.list_by_manager(current_user.id)
+    developer_ids = [dev["id"] for dev in developers]
+    if not developer_ids:
+        return TeamBlockers(start_date=start_date, end_date=end_date, weeks=[], developers=[])
+    
+    # All are grouped or projected by the storage engine; no log bodies leave the database
+    weeks, blocked, summaries = await asyncio.gather(
+        storage.daily_logs.blocker_weeks(developer_ids, start_date.isoformat(), end_date.isoformat()),
+        storage.daily_logs.blocked_days(developer_ids, start_date.isoformat(), end_date.isoformat()),
+        storage.daily_logs.daily_summaries(developer_ids, start_date.isoformat(), end_date.isoformat()),
+    )
+    dates_by_developer: Dict[str, List[str]] = {dev_id: [] for dev_id in developer_ids}
+    for row in blocked:
+        dates_by_developer[row["user_id"]].append(row["date"])
+    logged_by_developer: Dict[str, set] = {dev_id: set() for dev_id in developer_ids}
+    for row in summaries:
+        logged_by_developer[row["user_id"]].add(row["date"])
+    
+    result = []
+    for dev in developers:
+        streaks = blocked_streaks(dates_by_developer[dev["id"]], logged_by_developer[dev["id"]])
+        result.append(DeveloperBlockers(
+            developer_id=dev["id"],
+            developer_name=dev["username"],
+            blocked_days=len(dates_by_developer[dev["id"]]),
+            longest_streak=max(streaks, key=lambda streak: streak.days, default=None),
+            latest_streak=streaks[-1] if streaks else None,
+        ))
+    result.sort(key=lambda dev: (dev.longest_streak.days if dev.longest_streak else 0, dev.blocked_days), reverse=True)
+    
+    return TeamBlockers(
+        start_date=start_date,
+        end_date=end_date,
+        weeks=[BlockerWeek(**row, developer_ids=row["user_ids"]) for row in weeks],
+        developers=result,
+    )
+
+# Heatmap metric -> daily_summaries field
+HEATMAP_METRICS = {"hours": "total_time", "mood": "mood", "tasks": "tasks_count"}
+
+@api_router.get("/team/heatmap", response_model=Heatmap)
+async def get_team_heatmap(
+    current_user: User = Depends(get_current_user),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    metric: Literal["hours", "mood", "tasks"] = "hours",
+):
+    if current_user.role != "manager":
+        raise HTTPException(status_code=403, detail="Only managers can view the team heatmap")
+    
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=27)
+    if not timedelta(0) <= end - start < timedelta(days=366):
+        raise HTTPException(status_code=400, detail="start must be on or before end and at most 366 days earlier")
+    
+    developers = await storage.users.list_by_manager(current_user.id)
+    dates = [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+    row_of = {dev["id"]: i for i, dev in enumerate(developers)}
+    column_of = {day: j for j, day in enumerate(dates)}
+    values: List[float] = [0] * (len(developers) * len(dates))
+    
+    # One projected read of (user, date, metric) rows; no task bodies
+    field = HEATMAP_METRICS[metric]
+    summaries = await storage.daily_logs.daily_summaries(list(row_of), start.isoformat(), end.isoformat()) if developers else []
+    for row in summaries:
+        values[row_of[row["user_id"]] * len(dates) + column_of[row["date"][:10]]] = row[field]
+    
+    return Heatmap(
+        metric=metric,
+        start_date=start,
+        end_date=end,
+        developer_ids=[dev["id"] for dev in developers],
+        developer_names=[dev["username"] for dev in developers],
+        dates=dates,
+        values=values,
+    )
+
 @api_router.post("/feedback", response_model=Feedback)
-async def add_feedback(feedback_data: FeedbackCreate, current_user: User = Depends(get_current_user)):
+async def add_feedback(feedback_data: FeedbackCreate, current_user: User = Depends(get_current_user), idempotency_key: IdempotencyKey = None):
     if current_user.role != "manager":
         raise HTTPException(status_code=403, detail="Only managers can add feedback")
-    
+    return await run_idempotent(
+        idempotency_key, current_user, "POST /api/feedback", feedback_data,
+        lambda: insert_feedback(feedback_data, current_user),
+    )
+
+async def insert_feedback(feedback_data: FeedbackCreate, current_user: User):
     feedback = Feedback(
         log_id=feedback_data.log_id,
         manager_id=current_user.id,
         feedback_text=feedback_data.feedback_text
     )
     
-    await db.feedback.insert_one(feedback.dict())
-    
-    # Get the log to find the developer
-    log = await db.daily_logs.find_one({"id": feedback_data.log_id})
+    # The feedback collection keeps the full history; the log gets the summary its readers show
+    await storage.feedback.create(feedback.dict())
+    log = await storage.daily_logs.add_feedback(feedback_data.log_id, feedback.dict())
     if log:
         # Notify developer about feedback
         notification = Notification(
@@ -366,27 +741,24 @@ async def add_feedback(feedback_data: FeedbackCreate, current_user: User = Depen
             message=f"New feedback from {current_user.username} on your {log['date']} log",
             type="feedback"
         )
-        await db.notifications.insert_one(notification.dict())
+        await storage.notifications.create(notification.dict())
     
     return feedback
 
 # Notification routes
 @api_router.get("/notifications", response_model=List[Notification])
 async def get_notifications(current_user: User = Depends(get_current_user)):
-    notifications = await db.notifications.find({"user_id": current_user.id}).sort("created_at", -1).to_list(100)
+    notifications = await storage.notifications.list_for_user(current_user.id)
     return [Notification(**notif) for notif in notifications]
 
 @api_router.put("/notifications/{notification_id}/read")
-async def mark_notification_read(notification_id: str, current_user: User = Depends(get_current_user)):
+async def mark_notification_read(notification_id: EntityId, current_user: User = Depends(get_current_user)):
     # First check if the notification belongs to the current user
-    notification = await db.notifications.find_one({"id": notification_id})
+    notification = await storage.notifications.get(notification_id)
     if not notification or notification["user_id"] != current_user.id:
         raise HTTPException(status_code=404, detail="Notification not found")
         
-    await db.notifications.update_one(
-        {"id": notification_id, "user_id": current_user.id},
-        {"$set": {"read": True}}
-    )
+    await storage.notifications.mark_read(notification_id, current_user.id)
     return {"message": "Notification marked as read"}
 
 # Analytics routes
@@ -395,35 +767,49 @@ async def get_productivity_data(current_user: User = Depends(get_current_user),
     end_date = datetime.utcnow().date()
     start_date = end_date - timedelta(days=days)
     
-    query = {
-        "user_id": current_user.id,
-        "date": {"$gte": start_date.isoformat(), "$lte": end_date.isoformat()}
-    }
-    
-    logs = await db.daily_logs.find(query).to_list(1000)
+    summaries = await storage.daily_logs.daily_summaries([current_user.id], start_date.isoformat(), end_date.isoformat())
+    logs_by_date = {log["date"]: log for log in summaries}
     
     # Create productivity data
     productivity_data = []
     for i in range(days):
         current_date = start_date + timedelta(days=i)
-        log = next((l for l in logs if l["date"] == current_date.isoformat()), None)
+        log = logs_by_date.get(current_date.isoformat())
         productivity_data.append({
             "date": current_date.isoformat(),
             "total_time": log["total_time"] if log else 0,
             "mood": log["mood"] if log else 0,
-            "tasks_count": len(log["tasks"]) if log else 0
+            "tasks_count": log["tasks_count"] if log else 0
         })
     
     return productivity_data
 
-@api_router.get("/analytics/export")
-async def export_productivity_data(start_date: str, end_date: str, current_user: User = Depends(get_current_user)):
-    query = {
-        "user_id": current_user.id,
-        "date": {"$gte": start_date, "$lte": end_date}
-    }
+@api_router.get("/analytics/trends", response_model=Trends)
+async def get_trends(
+    current_user: User = Depends(get_current_user),
+    days: int = Query(90, ge=7, le=366),
+    developer_id: OptionalEntityId = None,
+):
+    # Developers see their own trends; managers their team's, or one developer's with developer_id
+    if current_user.role == "manager":
+        user_ids = [dev["id"] for dev in await storage.users.list_by_manager(current_user.id)]
+        if developer_id:
+            if developer_id not in user_ids:
+                raise HTTPException(status_code=404, detail="Developer not found")
+            user_ids = [developer_id]
+    else:
+        user_ids = [current_user.id]
     
-    logs = await db.daily_logs.find(query).sort("date", 1).to_list(1000)
+    end_date = datetime.utcnow().date()
+    start_date = end_date - timedelta(days=days - 1)
+    history_start = start_date - timedelta(days=HISTORY_DAYS)
+    columns = await storage.daily_logs.daily_columns(user_ids, history_start.isoformat(), end_date.isoformat())
+    with tracer.span("analytics.trends", logs=len(columns["day"])):
+        return compute_trends(columns, start_date, end_date)
+
+@api_router.get("/analytics/export")
+async def export_productivity_data(start_date: date, end_date: date, current_user: User = Depends(get_current_user)):
+    logs = await storage.daily_logs.list_for_users([current_user.id], start_date.isoformat(), end_date.isoformat(), ascending=True, analytics=True)
     
     # Prepare data for CSV
     export_data = []
@@ -443,19 +829,45 @@ async def export_productivity_data(start_date: str, end_date: str, current_user:
         raise HTTPException(status_code=404, detail="No data found for the specified date range")
     
     # Create CSV
-    df = pd.DataFrame(export_data)
-    csv_buffer = StringIO()
-    df.to_csv(csv_buffer, index=False)
-    csv_content = csv_buffer.getvalue()
+    with tracer.span("export.csv", rows=len(export_data)):
+        import pandas as pd
+        df = pd.DataFrame(export_data)
+        csv_buffer = StringIO()
+        df.to_csv(csv_buffer, index=False)
+        csv_content = csv_buffer.getvalue()
     
     return {"csv_data": csv_content}
 
 # Users list for manager assignment
 @api_router.get("/users/managers", response_model=List[UserResponse])
 async def get_managers():
-    managers = await db.users.find({"role": "manager"}).to_list(1000)
+    managers = await storage.users.list_by_role("manager")
     return [UserResponse(**manager) for manager in managers]
 
+# Health checks: liveness never touches storage, readiness does
+@api_router.get("/health/live")
+async def health_live():
+    return {"status": "ok"}
+
+@api_router.get("/health/ready")
+async def health_ready():
+    timeout = float(os.environ.get('READINESS_TIMEOUT_SECONDS', '2'))
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(storage.ping(), timeout=timeout)
+    except Exception as e:
+        reason = f"ping timed out after {timeout}s" if isinstance(e, asyncio.TimeoutError) else str(e)
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "unavailable", "storage": storage.name, "error": reason, "pool": storage.pool_stats()},
+        )
+    return {
+        "status": "ready",
+        "storage": storage.name,
+        "ping_ms": round((time.perf_counter() - start) * 1000.0, 2),
+        "pool": storage.pool_stats(),
+    }
+
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -465,15 +877,22 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Idempotent-Replayed"],
 )
 
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(TracingMiddleware)
+app.add_middleware(DBQueryMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(generate_metrics(), media_type=CONTENT_TYPE_LATEST)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
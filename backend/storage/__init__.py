@@ -0,0 +1,44 @@
+from .base import (
+    DailyLogRepository,
+    Document,
+    FeedbackRepository,
+    IdempotencyRepository,
+    NotificationRepository,
+    Storage,
+    UserRepository,
+)
+
+STORAGE_BACKENDS = ("mongo", "memory", "sqlite")
+
+
+def create_storage(backend: str, **options) -> Storage:
+    """Build the storage engine named by STORAGE_BACKEND.
+
+    Engines are imported lazily so a deployment only needs the driver it uses.
+    """
+    if backend == "mongo":
+        from .mongo import MongoStorage
+
+        return MongoStorage(options["mongo_url"], options["db_name"], **options.get("client_options", {}))
+    if backend == "memory":
+        from .memory import MemoryStorage
+
+        return MemoryStorage()
+    if backend == "sqlite":
+        from .sqlite import SQLiteStorage
+
+        return SQLiteStorage(options["sqlite_path"], options.get("sqlite_workers", 4))
+    raise ValueError(f"Unknown storage backend {backend!r}, expected one of {', '.join(STORAGE_BACKENDS)}")
+
+
+__all__ = [
+    "DailyLogRepository",
+    "Document",
+    "FeedbackRepository",
+    "IdempotencyRepository",
+    "NotificationRepository",
+    "Storage",
+    "UserRepository",
+    "STORAGE_BACKENDS",
+    "create_storage",
+]
@@ -0,0 +1,288 @@
+import re
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Documents are plain dicts shaped like the Mongo documents server.py has
+# always stored: ids are strings and log dates are ISO "YYYY-MM-DD" strings.
+# Engines also store each log's `day` (see day_number) and filter and sort on it,
+# and a `feedback_summary` (see feedback_summary) so log reads need no feedback lookup.
+# Logs carry a `version` that every update increments; logs from before it existed
+# have none and count as version 0.
+Document = Dict[str, Any]
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+SEARCH_TERM = re.compile(r"\w+")
+
+# Blockers are compared lowercased with surrounding whitespace and periods stripped,
+# and these stock answers count as not blocked
+BLOCKER_STRIP = " \t\r\n."
+NO_BLOCKERS = ("none", "no", "n/a", "na", "nothing", "no blockers", "-")
+
+
+def day_number(iso_date: str) -> int:
+    """Days since 1970-01-01 for an ISO date: a compact, indexable stand-in for the date string."""
+    return date.fromisoformat(iso_date[:10]).toordinal() - EPOCH_ORDINAL
+
+
+def day_range(start_date: Optional[str], end_date: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    return (
+        day_number(start_date) if start_date else None,
+        day_number(end_date) if end_date else None,
+    )
+
+
+def with_day(log: Document) -> Document:
+    """Copy of a log (or of update fields) with `day` derived from its `date`."""
+    log = dict(log)
+    if "date" in log:
+        log["day"] = day_number(log["date"])
+    return log
+
+
+def iso_day(day: int) -> str:
+    """The ISO date of a day number (the inverse of day_number)."""
+    return date.fromordinal(day + EPOCH_ORDINAL).isoformat()
+
+
+def week_day(day: int) -> int:
+    """Day number of the Monday starting the week `day` falls in (1970-01-01 was a Thursday)."""
+    return day - (day + 3) % 7
+
+
+def normalize_blocker(text: Optional[str]) -> str:
+    """The text blockers are grouped by; empty when the log was not blocked."""
+    blocker = (text or "").lower().strip(BLOCKER_STRIP)
+    return "" if blocker in NO_BLOCKERS else blocker
+
+
+def search_terms(text: str) -> List[str]:
+    """Lowercased words of a search query or of searchable log text, in order, duplicates removed."""
+    return list(dict.fromkeys(SEARCH_TERM.findall(text.lower())))
+
+
+def search_text(log: Document) -> str:
+    """What log search matches against: the task descriptions and the blockers."""
+    return "\n".join([*(task["description"] for task in log.get("tasks") or []), log.get("blockers") or ""])
+
+
+def feedback_summary(latest: Document, count: int) -> Document:
+    """What a log carries about its feedback: the newest text, when it was given and how many there are."""
+    return {"latest_text": latest["feedback_text"], "last_at": latest["created_at"], "count": count}
+
+
+class UserRepository(ABC):
+    @abstractmethod
+    async def get(self, user_id: str) -> Optional[Document]:
+        ...
+
+    @abstractmethod
+    async def get_many(self, user_ids: Iterable[str]) -> List[Document]:
+        ...
+
+    @abstractmethod
+    async def get_by_username(self, username: str) -> Optional[Document]:
+        ...
+
+    @abstractmethod
+    async def find_by_username_or_email(self, username: str, email: str) -> Optional[Document]:
+        ...
+
+    @abstractmethod
+    async def list_by_manager(self, manager_id: str, limit: int = 1000) -> List[Document]:
+        ...
+
+    @abstractmethod
+    async def list_by_role(self, role: str, limit: int = 1000) -> List[Document]:
+        ...
+
+    @abstractmethod
+    async def create(self, user: Document) -> None:
+        ...
+
+    @abstractmethod
+    async def create_many(self, users: List[Document]) -> None:
+        ...
+
+
+class DailyLogRepository(ABC):
+    @abstractmethod
+    async def get(self, log_id: str) -> Optional[Document]:
+        ...
+
+    @abstractmethod
+    async def get_for_user(self, log_id: str, user_id: str) -> Optional[Document]:
+        ...
+
+    @abstractmethod
+    async def get_by_date(self, user_id: str, log_date: str) -> Optional[Document]:
+        ...
+
+    @abstractmethod
+    async def list_for_users(
+        self,
+        user_ids: List[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        ascending: bool = False,
+        limit: int = 1000,
+        analytics: bool = False,
+    ) -> List[Document]:
+        """Logs of the given users within [start_date, end_date], ordered by date.
+
+        analytics=True marks report reads, which engines with replicas may serve from a secondary.
+        """
+
+    @abstractmethod
+    async def daily_summaries(
+        self,
+        user_ids: List[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> List[Document]:
+        """Per-log {user_id, date, total_time, mood, tasks_count} rows ordered by date, without task bodies."""
+
+    @abstractmethod
+    async def daily_columns(
+        self,
+        user_ids: List[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Dict[str, list]:
+        """The logs in the window as parallel {day, total_time, mood} lists, in no particular order."""
+
+    @abstractmethod
+    async def create(self, log: Document) -> None:
+        ...
+
+    @abstractmethod
+    async def create_many(self, logs: List[Document]) -> None:
+        ...
+
+    @abstractmethod
+    async def update(
+        self, log_id: str, user_id: str, fields: Document, expected_version: Optional[int] = None
+    ) -> Optional[Document]:
+        """Apply `fields` to the user's log, bump its version and return the updated document.
+
+        With expected_version, the update applies only if the log is still at that version, checked
+        in the same atomic write. Returns None if the log is missing or the version did not match.
+        """
+
+    @abstractmethod
+    async def search(self, user_ids: List[str], query: str, offset: int = 0, limit: int = 20) -> List[Document]:
+        """The given users' logs whose task descriptions or blockers contain any word of `query`.
+
+        Best matches first, each with a `score` (higher is better; only comparable within one search).
+        """
+
+    @abstractmethod
+    async def blocker_weeks(self, user_ids: List[str], start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[Document]:
+        """How often each normalized blocker was reported per week, grouped by the engine.
+
+        Rows of {blocker, week (ISO date of its Monday), count, user_ids}, ordered by week, then most reported.
+        """
+
+    @abstractmethod
+    async def blocked_days(self, user_ids: List[str], start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[Document]:
+        """{user_id, date} of every log reporting a blocker, ordered by user and date."""
+
+    @abstractmethod
+    async def add_feedback(self, log_id: str, feedback: Document) -> Optional[Document]:
+        """Fold a new feedback entry into the log's feedback_summary in one atomic update.
+
+        Returns the updated log, or None if there is no such log.
+        """
+
+
+class FeedbackRepository(ABC):
+    @abstractmethod
+    async def create(self, feedback: Document) -> None:
+        ...
+
+    @abstractmethod
+    async def create_many(self, feedback: List[Document]) -> None:
+        ...
+
+
+class NotificationRepository(ABC):
+    @abstractmethod
+    async def get(self, notification_id: str) -> Optional[Document]:
+        ...
+
+    @abstractmethod
+    async def list_for_user(self, user_id: str, limit: int = 100) -> List[Document]:
+        """Newest first."""
+
+    @abstractmethod
+    async def create(self, notification: Document) -> None:
+        ...
+
+    @abstractmethod
+    async def create_many(self, notifications: List[Document]) -> None:
+        ...
+
+    @abstractmethod
+    async def mark_read(self, notification_id: str, user_id: str) -> None:
+        ...
+
+
+class IdempotencyRepository(ABC):
+    """First responses to write requests sent with an Idempotency-Key, kept until they expire."""
+
+    @abstractmethod
+    async def reserve(self, user_id: str, key: str, fingerprint: str, expires_at: datetime) -> Optional[Document]:
+        """Claim the user's key for a new request and return None.
+
+        `expires_at` is a short lease: a reservation nobody completes or releases (a killed
+        worker) stops blocking the key once it passes, and the next reserve takes it over.
+        If an unexpired record already holds the key, leave it and return it instead:
+        {fingerprint, status_code, body}, with status_code None while the first request runs.
+        None means the caller holds the reservation; an engine that cannot tell returns an
+        unfinished record (status_code None) rather than None.
+        """
+
+    @abstractmethod
+    async def complete(self, user_id: str, key: str, status_code: int, body: Any, expires_at: datetime) -> None:
+        """Store the response that retries with this key will get until `expires_at`."""
+
+    @abstractmethod
+    async def release(self, user_id: str, key: str) -> None:
+        """Drop an unfinished reservation so a retry runs the request again."""
+
+
+class Storage(ABC):
+    """A storage engine: one repository per collection plus lifecycle hooks."""
+
+    name: str
+    users: UserRepository
+    daily_logs: DailyLogRepository
+    feedback: FeedbackRepository
+    notifications: NotificationRepository
+    idempotency: IdempotencyRepository
+
+    async def ensure_indexes(self) -> None:
+        """Create whatever indexes the hot queries rely on. Idempotent."""
+
+    async def ping(self) -> None:
+        """Raise if the storage engine is unreachable."""
+
+    async def warm_up(self, connections: int) -> None:
+        """Open up to `connections` pooled connections ahead of the first request."""
+        await self.ping()
+
+    def pool_stats(self) -> Document:
+        """Connection or worker pool counters for the readiness probe."""
+        return {}
+
+    async def reconcile_feedback_summaries(self) -> int:
+        """Rebuild each log's feedback_summary from the feedback collection; returns how many logs changed."""
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        """Delete all data (benchmarks and tests only)."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        ...
@@ -0,0 +1,35 @@
+"""
+Entity ids.
+
+New users, logs, feedback and notifications get ObjectIds: 12 bytes whose
+leading timestamp makes them increase over time, so inserts land on the
+right-hand edge of each id index instead of random B-tree pages. They travel
+through the API and the memory/SQLite engines as 24-character hex strings
+and are stored as native ObjectIds in Mongo. Ids created earlier are UUID4
+strings; they stay valid everywhere and are stored unchanged.
+"""
+import re
+import uuid
+
+from bson import ObjectId
+
+OBJECT_ID_HEX = re.compile(r"^[0-9a-f]{24}$")
+
+
+def new_id() -> str:
+    return str(ObjectId())
+
+
+def is_object_id(value) -> bool:
+    return isinstance(value, str) and OBJECT_ID_HEX.match(value) is not None
+
+
+def normalize_id(value: str) -> str:
+    """Canonical form of an id received by the API: lowercase ObjectId hex or hyphenated UUID."""
+    candidate = value.strip().lower()
+    if OBJECT_ID_HEX.match(candidate):
+        return candidate
+    try:
+        return str(uuid.UUID(candidate))
+    except ValueError:
+        raise ValueError("must be an ObjectId or a UUID") from None
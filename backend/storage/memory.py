@@ -0,0 +1,407 @@
+import copy
+import math
+import time
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from db_monitoring import record_operation
+
+from .base import (
+    DailyLogRepository,
+    Document,
+    FeedbackRepository,
+    IdempotencyRepository,
+    NotificationRepository,
+    SEARCH_TERM,
+    Storage,
+    UserRepository,
+    day_number,
+    day_range,
+    feedback_summary,
+    iso_day,
+    normalize_blocker,
+    search_terms,
+    search_text,
+    week_day,
+    with_day,
+)
+
+
+class _Timed:
+    """Reports each repository call to the request's query stats, like the Mongo command listener does."""
+
+    def __init__(self, docs: int = 0):
+        self.docs = docs
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record_operation((time.perf_counter() - self.start) * 1000.0, self.docs)
+
+
+def _copy(doc: Optional[Document]) -> Optional[Document]:
+    return dict(doc) if doc is not None else None
+
+
+class MemoryUserRepository(UserRepository):
+    def __init__(self):
+        self.by_id: Dict[str, Document] = {}
+        self.by_username: Dict[str, str] = {}
+        self.by_email: Dict[str, str] = {}
+        self.by_manager: Dict[Optional[str], List[str]] = defaultdict(list)
+        self.by_role: Dict[str, List[str]] = defaultdict(list)
+
+    async def get(self, user_id: str) -> Optional[Document]:
+        with _Timed():
+            return _copy(self.by_id.get(user_id))
+
+    async def get_many(self, user_ids: Iterable[str]) -> List[Document]:
+        with _Timed() as op:
+            users = [dict(self.by_id[user_id]) for user_id in dict.fromkeys(user_ids) if user_id in self.by_id]
+            op.docs = len(users)
+            return users
+
+    async def get_by_username(self, username: str) -> Optional[Document]:
+        with _Timed():
+            return _copy(self.by_id.get(self.by_username.get(username)))
+
+    async def find_by_username_or_email(self, username: str, email: str) -> Optional[Document]:
+        with _Timed():
+            user_id = self.by_username.get(username) or self.by_email.get(email)
+            return _copy(self.by_id.get(user_id))
+
+    async def list_by_manager(self, manager_id: str, limit: int = 1000) -> List[Document]:
+        with _Timed():
+            return [dict(self.by_id[user_id]) for user_id in self.by_manager.get(manager_id, [])[:limit]]
+
+    async def list_by_role(self, role: str, limit: int = 1000) -> List[Document]:
+        with _Timed():
+            return [dict(self.by_id[user_id]) for user_id in self.by_role.get(role, [])[:limit]]
+
+    def _insert(self, user: Document):
+        user = copy.deepcopy(user)
+        self.by_id[user["id"]] = user
+        self.by_username.setdefault(user["username"], user["id"])
+        self.by_email.setdefault(user["email"], user["id"])
+        self.by_manager[user.get("manager_id")].append(user["id"])
+        self.by_role[user["role"]].append(user["id"])
+
+    async def create(self, user: Document) -> None:
+        with _Timed():
+            self._insert(user)
+
+    async def create_many(self, users: List[Document]) -> None:
+        with _Timed():
+            for user in users:
+                self._insert(user)
+
+
+class MemoryDailyLogRepository(DailyLogRepository):
+    def __init__(self):
+        self.by_id: Dict[str, Document] = {}
+        # user_id -> sorted [(day, log_id)], the in-memory equivalent of the (user_id, day) index
+        self.by_user_day: Dict[str, List[Tuple[int, str]]] = defaultdict(list)
+        # Inverted index for search: term -> {log_id: occurrences}, plus each log's terms for re-indexing
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.terms_by_log: Dict[str, Counter] = {}
+
+    def _index_text(self, log: Document):
+        self._unindex_text(log["id"])
+        counts = Counter(SEARCH_TERM.findall(search_text(log).lower()))
+        for term, count in counts.items():
+            self.postings[term][log["id"]] = count
+        self.terms_by_log[log["id"]] = counts
+
+    def _unindex_text(self, log_id: str):
+        for term in self.terms_by_log.pop(log_id, ()):
+            postings = self.postings[term]
+            del postings[log_id]
+            if not postings:
+                del self.postings[term]
+
+    async def get(self, log_id: str) -> Optional[Document]:
+        with _Timed():
+            return _copy(self.by_id.get(log_id))
+
+    async def get_for_user(self, log_id: str, user_id: str) -> Optional[Document]:
+        with _Timed():
+            log = self.by_id.get(log_id)
+            return dict(log) if log is not None and log["user_id"] == user_id else None
+
+    async def get_by_date(self, user_id: str, log_date: str) -> Optional[Document]:
+        with _Timed():
+            day = day_number(log_date)
+            entries = self.by_user_day.get(user_id, [])
+            i = bisect_left(entries, (day, ""))
+            if i < len(entries) and entries[i][0] == day:
+                return dict(self.by_id[entries[i][1]])
+            return None
+
+    def _range(self, user_id: str, start_date: Optional[str], end_date: Optional[str]) -> List[Tuple[int, str]]:
+        entries = self.by_user_day.get(user_id, [])
+        start_day, end_day = day_range(start_date, end_date)
+        lo = bisect_left(entries, (start_day, "")) if start_day is not None else 0
+        hi = bisect_left(entries, (end_day + 1, "")) if end_day is not None else len(entries)
+        return entries[lo:hi]
+
+    async def list_for_users(self, user_ids, start_date=None, end_date=None, ascending=False, limit=1000, analytics=False):
+        with _Timed() as op:
+            entries = []
+            for user_id in dict.fromkeys(user_ids):
+                entries.extend(self._range(user_id, start_date, end_date))
+            # Stable sort on day only, so ties keep per-user insertion order like Mongo's index scan
+            entries.sort(key=lambda entry: entry[0], reverse=not ascending)
+            logs = [dict(self.by_id[log_id]) for _, log_id in entries[:limit]]
+            op.docs = len(logs)
+            return logs
+
+    async def daily_summaries(self, user_ids, start_date=None, end_date=None):
+        with _Timed() as op:
+            entries = []
+            for user_id in dict.fromkeys(user_ids):
+                entries.extend(self._range(user_id, start_date, end_date))
+            entries.sort(key=lambda entry: entry[0])
+            rows = []
+            for _, log_id in entries:
+                log = self.by_id[log_id]
+                rows.append({
+                    "user_id": log["user_id"],
+                    "date": log["date"],
+                    "total_time": log["total_time"],
+                    "mood": log["mood"],
+                    "tasks_count": len(log["tasks"]),
+                })
+            op.docs = len(rows)
+            return rows
+
+    async def daily_columns(self, user_ids, start_date=None, end_date=None):
+        with _Timed() as op:
+            columns: Dict[str, list] = {"day": [], "total_time": [], "mood": []}
+            for user_id in dict.fromkeys(user_ids):
+                for day, log_id in self._range(user_id, start_date, end_date):
+                    log = self.by_id[log_id]
+                    columns["day"].append(day)
+                    columns["total_time"].append(log["total_time"])
+                    columns["mood"].append(log["mood"])
+            op.docs = len(columns["day"])
+            return columns
+
+    async def blocker_weeks(self, user_ids, start_date=None, end_date=None):
+        with _Timed() as op:
+            groups: Dict[Tuple[int, str], list] = {}
+            for user_id in dict.fromkeys(user_ids):
+                for day, log_id in self._range(user_id, start_date, end_date):
+                    blocker = normalize_blocker(self.by_id[log_id].get("blockers"))
+                    if blocker:
+                        group = groups.setdefault((week_day(day), blocker), [0, {}])
+                        group[0] += 1
+                        group[1][user_id] = None
+            rows = [
+                {"blocker": blocker, "week": iso_day(week), "count": count, "user_ids": list(users)}
+                for (week, blocker), (count, users) in groups.items()
+            ]
+            rows.sort(key=lambda row: (row["week"], -row["count"], row["blocker"]))
+            op.docs = len(rows)
+            return rows
+
+    async def blocked_days(self, user_ids, start_date=None, end_date=None):
+        with _Timed() as op:
+            rows = [
+                {"user_id": user_id, "date": self.by_id[log_id]["date"]}
+                for user_id in sorted(set(user_ids))
+                for _, log_id in self._range(user_id, start_date, end_date)
+                if normalize_blocker(self.by_id[log_id].get("blockers"))
+            ]
+            op.docs = len(rows)
+            return rows
+
+    async def search(self, user_ids, query, offset=0, limit=20):
+        with _Timed() as op:
+            users = set(user_ids)
+            scores: Dict[str, float] = defaultdict(float)
+            for term in search_terms(query):
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                # tf-idf: repeated words count less than rare ones
+                idf = math.log(1 + len(self.by_id) / len(postings))
+                for log_id, count in postings.items():
+                    if self.by_id[log_id]["user_id"] in users:
+                        scores[log_id] += (1 + math.log(count)) * idf
+            ranked = sorted(scores, key=lambda log_id: (-scores[log_id], -self.by_id[log_id]["day"]))
+            logs = [{**self.by_id[log_id], "score": scores[log_id]} for log_id in ranked[offset:offset + limit]]
+            op.docs = len(logs)
+            return logs
+
+    def _insert(self, log: Document):
+        log = copy.deepcopy(with_day(log))
+        self.by_id[log["id"]] = log
+        insort(self.by_user_day[log["user_id"]], (log["day"], log["id"]))
+        self._index_text(log)
+
+    async def create(self, log: Document) -> None:
+        with _Timed():
+            self._insert(log)
+
+    async def create_many(self, logs: List[Document]) -> None:
+        with _Timed():
+            for log in logs:
+                self._insert(log)
+
+    async def update(self, log_id: str, user_id: str, fields: Document, expected_version: Optional[int] = None) -> Optional[Document]:
+        with _Timed():
+            log = self.by_id.get(log_id)
+            if log is None or log["user_id"] != user_id:
+                return None
+            if expected_version is not None and log.get("version", 0) != expected_version:
+                return None
+            fields = with_day(fields)
+            if "day" in fields and fields["day"] != log["day"]:
+                entries = self.by_user_day[user_id]
+                entries.remove((log["day"], log_id))
+                insort(entries, (fields["day"], log_id))
+            log.update(copy.deepcopy(fields))
+            log["version"] = log.get("version", 0) + 1
+            if "tasks" in fields or "blockers" in fields:
+                self._index_text(log)
+            return dict(log)
+
+    async def add_feedback(self, log_id: str, feedback: Document) -> Optional[Document]:
+        with _Timed():
+            log = self.by_id.get(log_id)
+            if log is None:
+                return None
+            count = log.get("feedback_summary", {}).get("count", 0)
+            # Replaced, not mutated, so copies handed out earlier keep their summary
+            log["feedback_summary"] = feedback_summary(feedback, count + 1)
+            return dict(log)
+
+
+class MemoryFeedbackRepository(FeedbackRepository):
+    def __init__(self):
+        self.by_log: Dict[str, List[Document]] = defaultdict(list)
+
+    def _insert(self, feedback: Document):
+        self.by_log[feedback["log_id"]].append(copy.deepcopy(feedback))
+
+    async def create(self, feedback: Document) -> None:
+        with _Timed():
+            self._insert(feedback)
+
+    async def create_many(self, feedback: List[Document]) -> None:
+        with _Timed():
+            for item in feedback:
+                self._insert(item)
+
+
+class MemoryNotificationRepository(NotificationRepository):
+    def __init__(self):
+        self.by_id: Dict[str, Document] = {}
+        # Kept in insertion order; list_for_user sorts the user's slice by created_at
+        self.by_user: Dict[str, List[str]] = defaultdict(list)
+
+    async def get(self, notification_id: str) -> Optional[Document]:
+        with _Timed():
+            return _copy(self.by_id.get(notification_id))
+
+    async def list_for_user(self, user_id: str, limit: int = 100) -> List[Document]:
+        with _Timed():
+            notifications = [self.by_id[nid] for nid in self.by_user.get(user_id, [])]
+            notifications.sort(key=lambda n: n["created_at"], reverse=True)
+            return [dict(n) for n in notifications[:limit]]
+
+    def _insert(self, notification: Document):
+        notification = copy.deepcopy(notification)
+        self.by_id[notification["id"]] = notification
+        self.by_user[notification["user_id"]].append(notification["id"])
+
+    async def create(self, notification: Document) -> None:
+        with _Timed():
+            self._insert(notification)
+
+    async def create_many(self, notifications: List[Document]) -> None:
+        with _Timed():
+            for notification in notifications:
+                self._insert(notification)
+
+    async def mark_read(self, notification_id: str, user_id: str) -> None:
+        with _Timed():
+            notification = self.by_id.get(notification_id)
+            if notification is not None and notification["user_id"] == user_id:
+                notification["read"] = True
+
+
+class MemoryIdempotencyRepository(IdempotencyRepository):
+    def __init__(self):
+        # Insertion order is expiry order: complete() moves a record to the end as it extends the
+        # lease to the full TTL, so expired ones sit at the front (pending leases aside, see reserve)
+        self.by_key: Dict[Tuple[str, str], Document] = {}
+
+    def _purge_expired(self, now: datetime):
+        while self.by_key:
+            oldest = next(iter(self.by_key))
+            if self.by_key[oldest]["expires_at"] > now:
+                break
+            del self.by_key[oldest]
+
+    async def reserve(self, user_id: str, key: str, fingerprint: str, expires_at: datetime) -> Optional[Document]:
+        with _Timed():
+            self._purge_expired(datetime.utcnow())
+            existing = self.by_key.get((user_id, key))
+            if existing is not None:
+                if existing["expires_at"] > datetime.utcnow():
+                    return dict(existing)
+                # A lease can expire behind a longer-lived record that _purge_expired stops at
+                del self.by_key[(user_id, key)]
+            self.by_key[(user_id, key)] = {"fingerprint": fingerprint, "status_code": None, "body": None, "expires_at": expires_at}
+            return None
+
+    async def complete(self, user_id: str, key: str, status_code: int, body: Any, expires_at: datetime) -> None:
+        with _Timed():
+            record = self.by_key.pop((user_id, key), None)
+            if record is not None:
+                record.update(status_code=status_code, body=copy.deepcopy(body), expires_at=expires_at)
+                self.by_key[(user_id, key)] = record
+
+    async def release(self, user_id: str, key: str) -> None:
+        with _Timed():
+            record = self.by_key.get((user_id, key))
+            if record is not None and record["status_code"] is None:
+                del self.by_key[(user_id, key)]
+
+
+class MemoryStorage(Storage):
+    """Process-local storage with dict/bisect indexes. Data is lost on restart and not shared between workers."""
+
+    name = "memory"
+
+    def __init__(self):
+        self.clear_sync()
+
+    def clear_sync(self):
+        self.users = MemoryUserRepository()
+        self.daily_logs = MemoryDailyLogRepository()
+        self.feedback = MemoryFeedbackRepository()
+        self.notifications = MemoryNotificationRepository()
+        self.idempotency = MemoryIdempotencyRepository()
+
+    async def reconcile_feedback_summaries(self) -> int:
+        repaired = 0
+        for log_id, log in self.daily_logs.by_id.items():
+            items = self.feedback.by_log.get(log_id)
+            # reversed(): on equal timestamps the entry added last wins, as it does in add_feedback
+            expected = feedback_summary(max(reversed(items), key=lambda item: item["created_at"]), len(items)) if items else None
+            if log.get("feedback_summary") != expected:
+                if expected is None:
+                    del log["feedback_summary"]
+                else:
+                    log["feedback_summary"] = expected
+                repaired += 1
+        return repaired
+
+    async def clear(self) -> None:
+        self.clear_sync()
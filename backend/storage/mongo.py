@@ -0,0 +1,529 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from bson.codec_options import TypeDecoder, TypeRegistry
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, TEXT, ReadPreference, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from config import MongoSettings
+from db_monitoring import PoolMonitor
+
+from .base import (
+    BLOCKER_STRIP,
+    NO_BLOCKERS,
+    DailyLogRepository,
+    Document,
+    FeedbackRepository,
+    IdempotencyRepository,
+    NotificationRepository,
+    Storage,
+    UserRepository,
+    day_number,
+    day_range,
+    iso_day,
+    search_terms,
+    with_day,
+)
+from .ids import is_object_id
+
+# Mongo's internal _id is never part of the API
+NO_ID = {"_id": 0}
+
+# Logs with a blocker, as matched by the partial index blocker analytics read
+BLOCKED = {"$type": "string", "$gt": ""}
+
+# A log's day number computed from its date, for logs from before the day backfill
+DAY_FROM_DATE = {"$toInt": {"$divide": [
+    {"$toLong": {"$dateFromString": {"dateString": {"$substrBytes": ["$date", 0, 10]}}}}, 86400000,
+]}}
+
+# Fields holding an entity id; ObjectId-format ids are stored as ObjectIds, UUID ids as strings
+ID_FIELDS = ("id", "user_id", "manager_id", "log_id")
+
+
+class _ObjectIdAsString(TypeDecoder):
+    bson_type = ObjectId
+
+    def transform_bson(self, value):
+        return str(value)
+
+
+# Repositories read ids back as the hex strings the rest of the app uses
+ID_TYPE_REGISTRY = TypeRegistry([_ObjectIdAsString()])
+
+
+def encode_id(value: Any) -> Any:
+    return ObjectId(value) if is_object_id(value) else value
+
+
+def encode_ids(values: Iterable[Any]) -> List[Any]:
+    return [encode_id(value) for value in values]
+
+
+def encode_doc(doc: Document) -> Document:
+    doc = dict(doc)
+    for field in ID_FIELDS:
+        if field in doc:
+            doc[field] = encode_id(doc[field])
+    return doc
+
+
+# migrations document tracking the daily_logs.day backfill (scripts/migrate_log_days.py)
+DAY_MIGRATION_ID = "daily_logs.day"
+# How often a repository still reading by date string re-checks whether the backfill finished
+DAY_STATE_REFRESH_SECONDS = 30
+
+# Logs compared per round trip by reconcile_feedback_summaries
+RECONCILE_BATCH = 1000
+
+
+def date_range(start_date: Optional[Any], end_date: Optional[Any]) -> Optional[Dict[str, Any]]:
+    condition = {}
+    if start_date is not None:
+        condition["$gte"] = start_date
+    if end_date is not None:
+        condition["$lte"] = end_date
+    return condition or None
+
+
+class MongoRepository:
+    """Holds the collection handle and the maxTimeMS every read on it is sent with."""
+
+    def __init__(self, collection, max_time_ms: int = 0):
+        self.collection = collection
+        self.max_time_ms = max_time_ms
+
+    def find(self, query: Document, **kwargs):
+        return self.collection.find(query, NO_ID, max_time_ms=self.max_time_ms, **kwargs)
+
+    async def find_one(self, query: Document) -> Optional[Document]:
+        return await self.collection.find_one(query, NO_ID, max_time_ms=self.max_time_ms)
+
+
+class MongoUserRepository(MongoRepository, UserRepository):
+    async def get(self, user_id: str) -> Optional[Document]:
+        return await self.find_one({"id": encode_id(user_id)})
+
+    async def get_many(self, user_ids: Iterable[str]) -> List[Document]:
+        user_ids = encode_ids(user_ids)
+        return await self.find({"id": {"$in": user_ids}}).to_list(len(user_ids) or 1)
+
+    async def get_by_username(self, username: str) -> Optional[Document]:
+        return await self.find_one({"username": username})
+
+    async def find_by_username_or_email(self, username: str, email: str) -> Optional[Document]:
+        return await self.find_one({"$or": [{"username": username}, {"email": email}]})
+
+    async def list_by_manager(self, manager_id: str, limit: int = 1000) -> List[Document]:
+        return await self.find({"manager_id": encode_id(manager_id)}).to_list(limit)
+
+    async def list_by_role(self, role: str, limit: int = 1000) -> List[Document]:
+        return await self.find({"role": role}).to_list(limit)
+
+    async def create(self, user: Document) -> None:
+        await self.collection.insert_one(encode_doc(user))
+
+    async def create_many(self, users: List[Document]) -> None:
+        if users:
+            await self.collection.insert_many([encode_doc(user) for user in users])
+
+
+class MongoDailyLogRepository(MongoRepository, DailyLogRepository):
+    def __init__(self, collection, max_time_ms: int = 0, analytics_collection=None, analytics_max_time_ms: int = 0, migrations=None):
+        super().__init__(collection, max_time_ms)
+        # Report queries may read from secondaries and get a longer time limit
+        self.analytics_collection = analytics_collection if analytics_collection is not None else collection
+        self.analytics_max_time_ms = analytics_max_time_ms
+        self.migrations = migrations
+        # Reads filter on the `day` number once every log has one; writes always store it
+        self.day_queries = migrations is None
+        self._next_state_check = 0.0
+
+    async def uses_day(self) -> bool:
+        if not self.day_queries and time.monotonic() >= self._next_state_check:
+            self._next_state_check = time.monotonic() + DAY_STATE_REFRESH_SECONDS
+            state = await self.migrations.find_one({"_id": DAY_MIGRATION_ID}, max_time_ms=self.max_time_ms)
+            self.day_queries = bool(state and state.get("done"))
+        return self.day_queries
+
+    async def mark_day_migration_if_complete(self) -> bool:
+        """Mark the backfill done when no log lacks `day`, e.g. on a database created by this version."""
+        if await self.uses_day():
+            return True
+        if await self.collection.find_one({"day": {"$exists": False}}, {"_id": 1}) is not None:
+            return False
+        await self.migrations.update_one(
+            {"_id": DAY_MIGRATION_ID},
+            {"$set": {"done": True, "finished_at": datetime.utcnow()}},
+            upsert=True,
+        )
+        self.day_queries = True
+        return True
+
+    async def _date_filter(self, start_date: Optional[str], end_date: Optional[str]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """The field to filter and sort on, and its range condition."""
+        if await self.uses_day():
+            return "day", date_range(*day_range(start_date, end_date))
+        return "date", date_range(start_date or None, end_date or None)
+
+    async def get(self, log_id: str) -> Optional[Document]:
+        return await self.find_one({"id": encode_id(log_id)})
+
+    async def get_for_user(self, log_id: str, user_id: str) -> Optional[Document]:
+        return await self.find_one({"id": encode_id(log_id), "user_id": encode_id(user_id)})
+
+    async def get_by_date(self, user_id: str, log_date: str) -> Optional[Document]:
+        if await self.uses_day():
+            return await self.find_one({"user_id": encode_id(user_id), "day": day_number(log_date)})
+        return await self.find_one({"user_id": encode_id(user_id), "date": log_date})
+
+    async def list_for_users(self, user_ids, start_date=None, end_date=None, ascending=False, limit=1000, analytics=False):
+        user_ids = encode_ids(user_ids)
+        query = {"user_id": user_ids[0] if len(user_ids) == 1 else {"$in": user_ids}}
+        field, condition = await self._date_filter(start_date, end_date)
+        if condition:
+            query[field] = condition
+        if analytics:
+            cursor = self.analytics_collection.find(query, NO_ID, max_time_ms=self.analytics_max_time_ms)
+        else:
+            cursor = self.find(query)
+        cursor = cursor.sort(field, ASCENDING if ascending else DESCENDING)
+        return await cursor.to_list(limit)
+
+    async def daily_summaries(self, user_ids, start_date=None, end_date=None):
+        match = {"user_id": {"$in": encode_ids(user_ids)}}
+        field, condition = await self._date_filter(start_date, end_date)
+        if condition:
+            match[field] = condition
+        pipeline = [
+            {"$match": match},
+            {"$sort": {field: ASCENDING}},
+            {"$project": {
+                "_id": 0,
+                "user_id": 1,
+                "date": 1,
+                "total_time": 1,
+                "mood": 1,
+                "tasks_count": {"$size": {"$ifNull": ["$tasks", []]}},
+            }},
+        ]
+        return await self.analytics_collection.aggregate(pipeline, maxTimeMS=self.analytics_max_time_ms).to_list(None)
+
+    async def daily_columns(self, user_ids, start_date=None, end_date=None):
+        match = {"user_id": {"$in": encode_ids(user_ids)}}
+        field, condition = await self._date_filter(start_date, end_date)
+        if condition:
+            match[field] = condition
+        # One document of three arrays instead of a document per log; a year of a 50-person team is ~1 MB
+        pipeline = [
+            {"$match": match},
+            {"$group": {
+                "_id": None,
+                "day": {"$push": "$day" if field == "day" else DAY_FROM_DATE},
+                "total_time": {"$push": "$total_time"},
+                "mood": {"$push": "$mood"},
+            }},
+        ]
+        rows = await self.analytics_collection.aggregate(pipeline, maxTimeMS=self.analytics_max_time_ms).to_list(1)
+        columns = rows[0] if rows else {}
+        return {name: columns.get(name, []) for name in ("day", "total_time", "mood")}
+
+    async def _blocked_logs(self, user_ids, start_date, end_date, sort: bool = False) -> List[Dict[str, Any]]:
+        """Pipeline stages yielding {user_id, date, day, blocker} for logs reporting a blocker, normalized like normalize_blocker.
+
+        The $match is answered from the partial index over logs with blockers, in user and date order when `sort` is set.
+        """
+        match = {"user_id": {"$in": encode_ids(user_ids)}, "blockers": BLOCKED}
+        field, condition = await self._date_filter(start_date, end_date)
+        if condition:
+            match[field] = condition
+        day = "$day" if field == "day" else DAY_FROM_DATE
+        return [
+            {"$match": match},
+            *([{"$sort": {"user_id": ASCENDING, field: ASCENDING}}] if sort else []),
+            {"$project": {
+                "_id": 0,
+                "user_id": 1,
+                "date": 1,
+                "day": day,
+                "blocker": {"$trim": {"input": {"$toLower": "$blockers"}, "chars": BLOCKER_STRIP}},
+            }},
+            {"$match": {"blocker": {"$nin": ["", *NO_BLOCKERS]}}},
+        ]
+
+    async def blocker_weeks(self, user_ids, start_date=None, end_date=None):
+        pipeline = await self._blocked_logs(user_ids, start_date, end_date)
+        pipeline += [
+            # Weeks start on Monday; day 0 (1970-01-01) was a Thursday
+            {"$group": {
+                "_id": {"week": {"$subtract": ["$day", {"$mod": [{"$add": ["$day", 3]}, 7]}]}, "blocker": "$blocker"},
+                "count": {"$sum": 1},
+                "user_ids": {"$addToSet": "$user_id"},
+            }},
+            {"$sort": {"_id.week": ASCENDING, "count": DESCENDING, "_id.blocker": ASCENDING}},
+        ]
+        rows = await self.analytics_collection.aggregate(pipeline, maxTimeMS=self.analytics_max_time_ms).to_list(None)
+        return [
+            {"blocker": row["_id"]["blocker"], "week": iso_day(int(row["_id"]["week"])), "count": row["count"], "user_ids": row["user_ids"]}
+            for row in rows
+        ]
+
+    async def blocked_days(self, user_ids, start_date=None, end_date=None):
+        pipeline = await self._blocked_logs(user_ids, start_date, end_date, sort=True)
+        pipeline.append({"$project": {"user_id": 1, "date": 1}})
+        return await self.analytics_collection.aggregate(pipeline, maxTimeMS=self.analytics_max_time_ms).to_list(None)
+
+    async def search(self, user_ids, query, offset=0, limit=20):
+        user_ids = encode_ids(user_ids)
+        terms = search_terms(query)
+        if not user_ids or not terms:
+            return []
+        score = {"$meta": "textScore"}
+        # $text matches any of the words, stemmed by the text index; quotes and minus signs were stripped above
+        query = {
+            "$text": {"$search": " ".join(terms)},
+            "user_id": user_ids[0] if len(user_ids) == 1 else {"$in": user_ids},
+        }
+        cursor = self.collection.find(query, {**NO_ID, "score": score}, max_time_ms=self.max_time_ms)
+        cursor = cursor.sort([("score", score), ("date", DESCENDING)]).skip(offset).limit(limit)
+        return await cursor.to_list(limit)
+
+    async def create(self, log: Document) -> None:
+        await self.collection.insert_one(encode_doc(with_day(log)))
+
+    async def create_many(self, logs: List[Document]) -> None:
+        if logs:
+            await self.collection.insert_many([encode_doc(with_day(log)) for log in logs])
+
+    async def update(self, log_id: str, user_id: str, fields: Document, expected_version: Optional[int] = None) -> Optional[Document]:
+        query = {"id": encode_id(log_id), "user_id": encode_id(user_id)}
+        if expected_version is not None:
+            # A null match also covers logs written before versioning, which have no field (version 0)
+            query["version"] = expected_version or None
+        return await self.collection.find_one_and_update(
+            query,
+            {"$set": encode_doc(with_day(fields)), "$inc": {"version": 1}},
+            projection=NO_ID,
+            return_document=ReturnDocument.AFTER,
+            maxTimeMS=self.max_time_ms,
+        )
+
+    async def add_feedback(self, log_id: str, feedback: Document) -> Optional[Document]:
+        # Concurrent feedback on one log: the count stays exact, the last write sets the text
+        return await self.collection.find_one_and_update(
+            {"id": encode_id(log_id)},
+            {
+                "$set": {
+                    "feedback_summary.latest_text": feedback["feedback_text"],
+                    "feedback_summary.last_at": feedback["created_at"],
+                },
+                "$inc": {"feedback_summary.count": 1},
+            },
+            projection=NO_ID,
+            return_document=ReturnDocument.AFTER,
+            maxTimeMS=self.max_time_ms,
+        )
+
+
+class MongoFeedbackRepository(MongoRepository, FeedbackRepository):
+    async def create(self, feedback: Document) -> None:
+        await self.collection.insert_one(encode_doc(feedback))
+
+    async def create_many(self, feedback: List[Document]) -> None:
+        if feedback:
+            await self.collection.insert_many([encode_doc(item) for item in feedback])
+
+
+class MongoNotificationRepository(MongoRepository, NotificationRepository):
+    async def get(self, notification_id: str) -> Optional[Document]:
+        return await self.find_one({"id": encode_id(notification_id)})
+
+    async def list_for_user(self, user_id: str, limit: int = 100) -> List[Document]:
+        return await self.find({"user_id": encode_id(user_id)}).sort("created_at", DESCENDING).to_list(limit)
+
+    async def create(self, notification: Document) -> None:
+        await self.collection.insert_one(encode_doc(notification))
+
+    async def create_many(self, notifications: List[Document]) -> None:
+        if notifications:
+            await self.collection.insert_many([encode_doc(item) for item in notifications])
+
+    async def mark_read(self, notification_id: str, user_id: str) -> None:
+        await self.collection.update_one(
+            {"id": encode_id(notification_id), "user_id": encode_id(user_id)},
+            {"$set": {"read": True}},
+        )
+
+
+class MongoIdempotencyRepository(MongoRepository, IdempotencyRepository):
+    """One document per (user_id, key); a TTL index on expires_at removes old ones."""
+
+    async def reserve(self, user_id: str, key: str, fingerprint: str, expires_at: datetime) -> Optional[Document]:
+        key_filter = {"user_id": encode_id(user_id), "key": key}
+        for _ in range(2):
+            try:
+                await self.collection.insert_one(
+                    {**key_filter, "fingerprint": fingerprint, "status_code": None, "body": None, "expires_at": expires_at}
+                )
+                return None
+            except DuplicateKeyError:
+                existing = await self.find_one(key_filter)
+                if existing is not None and existing["expires_at"] > datetime.utcnow():
+                    return existing
+                # Expired but not yet removed by the TTL monitor, which runs once a minute
+                await self.collection.delete_one({**key_filter, "expires_at": {"$lte": datetime.utcnow()}})
+        # Other requests kept claiming or expiring the key under us. No reservation is ours, so never
+        # report one (None); answer as if the first request were still running and let the client retry
+        return {"fingerprint": fingerprint, "status_code": None, "body": None}
+
+    async def complete(self, user_id: str, key: str, status_code: int, body: Any, expires_at: datetime) -> None:
+        await self.collection.update_one(
+            {"user_id": encode_id(user_id), "key": key},
+            {"$set": {"status_code": status_code, "body": body, "expires_at": expires_at}},
+        )
+
+    async def release(self, user_id: str, key: str) -> None:
+        await self.collection.delete_one({"user_id": encode_id(user_id), "key": key, "status_code": None})
+
+
+class MongoStorage(Storage):
+    name = "mongo"
+
+    def __init__(self, mongo_url: str, db_name: str, settings: Optional[MongoSettings] = None, **client_options):
+        self.settings = settings = settings or MongoSettings.from_env()
+        self.pool_monitor = PoolMonitor()
+        client_options["event_listeners"] = [*client_options.get("event_listeners", []), self.pool_monitor]
+        self.client = AsyncIOMotorClient(mongo_url, **{**settings.client_options(), **client_options})
+        self.db = self.client[db_name]
+        self.users = MongoUserRepository(self._collection("users"), settings.max_time_ms)
+        self.daily_logs = MongoDailyLogRepository(
+            self._collection("daily_logs"),
+            settings.max_time_ms,
+            self._collection("daily_logs", settings.analytics_read_preference_for("daily_logs")),
+            settings.analytics_max_time_ms,
+            self.db.migrations,
+        )
+        self.feedback = MongoFeedbackRepository(self._collection("feedback"), settings.max_time_ms)
+        self.notifications = MongoNotificationRepository(self._collection("notifications"), settings.max_time_ms)
+        # Replays must see the reservation just written, so never read it from a secondary
+        self.idempotency = MongoIdempotencyRepository(
+            self._collection("idempotency_keys", ReadPreference.PRIMARY), settings.max_time_ms
+        )
+
+    def _collection(self, name: str, read_preference=None):
+        return self.db.get_collection(
+            name,
+            codec_options=self.db.codec_options.with_options(type_registry=ID_TYPE_REGISTRY),
+            read_preference=read_preference or self.settings.collection_read_preference(name),
+        )
+
+    async def ensure_indexes(self) -> None:
+        await self.db.users.create_index("id", unique=True)
+        await self.db.users.create_index("username")
+        await self.db.users.create_index("email")
+        await self.db.users.create_index([("manager_id", ASCENDING)])
+        await self.db.users.create_index([("role", ASCENDING)])
+        await self.db.daily_logs.create_index("id", unique=True)
+        await self.db.daily_logs.create_index([("user_id", ASCENDING), ("day", DESCENDING)])
+        # Reads use (user_id, date) until the day backfill is done; migrate_log_days.py drops it afterwards
+        if not await self.daily_logs.mark_day_migration_if_complete():
+            await self.db.daily_logs.create_index([("user_id", ASCENDING), ("date", DESCENDING)])
+        await self.db.daily_logs.create_index(
+            [("tasks.description", TEXT), ("blockers", TEXT)], name="daily_logs_search", default_language="english"
+        )
+        # Blocker analytics read only the (usually few) logs that report a blocker
+        await self.db.daily_logs.create_index(
+            [("user_id", ASCENDING), ("day", ASCENDING)], name="daily_logs_blocked", partialFilterExpression={"blockers": BLOCKED}
+        )
+        await self.db.feedback.create_index([("log_id", ASCENDING), ("created_at", ASCENDING)])
+        await self.db.notifications.create_index("id", unique=True)
+        await self.db.notifications.create_index([("user_id", ASCENDING), ("created_at", DESCENDING)])
+        await self.db.idempotency_keys.create_index([("user_id", ASCENDING), ("key", ASCENDING)], unique=True)
+        await self.db.idempotency_keys.create_index("expires_at", expireAfterSeconds=0)
+
+    async def ping(self) -> None:
+        await self.client.admin.command("ping")
+
+    async def warm_up(self, connections: int) -> None:
+        # Concurrent commands each check out their own connection, so the pool grows to `connections`
+        connections = max(1, min(connections, self.client.delegate.options.pool_options.max_pool_size or connections))
+        await asyncio.gather(*(self.client.admin.command("ping") for _ in range(connections)))
+
+    def pool_stats(self) -> Document:
+        pool_options = self.client.delegate.options.pool_options
+        return {
+            "max_pool_size": pool_options.max_pool_size,
+            "min_pool_size": pool_options.min_pool_size,
+            "servers": self.pool_monitor.snapshot(),
+        }
+
+    async def reconcile_feedback_summaries(self) -> int:
+        """Walk the feedback collection once, grouped by log, and fix every log whose summary drifted."""
+        pipeline = [
+            # Sorting on the full index prefix lets the (log_id, created_at) index supply the order
+            {"$sort": {"log_id": ASCENDING, "created_at": ASCENDING}},
+            {"$group": {
+                "_id": "$log_id",
+                "latest_text": {"$last": "$feedback_text"},
+                "last_at": {"$last": "$created_at"},
+                "count": {"$sum": 1},
+            }},
+        ]
+        repaired = 0
+        expected: Dict[str, Document] = {}
+        async for row in self.feedback.collection.aggregate(pipeline, allowDiskUse=True):
+            expected[row.pop("_id")] = row
+            if len(expected) >= RECONCILE_BATCH:
+                repaired += await self._repair_feedback_summaries(expected)
+                expected = {}
+        if expected:
+            repaired += await self._repair_feedback_summaries(expected)
+        return repaired + await self._drop_orphaned_feedback_summaries()
+
+    async def _repair_feedback_summaries(self, expected: Dict[str, Document]) -> int:
+        logs = self.daily_logs.collection.find(
+            {"id": {"$in": encode_ids(expected)}},
+            {"_id": 0, "id": 1, "feedback_summary": 1},
+        )
+        requests = []
+        async for log in logs:
+            # The $group rows already have feedback_summary's shape
+            summary = expected[log["id"]]
+            current = log.get("feedback_summary") or {}
+            if current != summary:
+                # Skipped if feedback arrived since the aggregate ran; add_feedback already moved last_at
+                requests.append(UpdateOne(
+                    {"id": encode_id(log["id"]), "feedback_summary.last_at": current.get("last_at")},
+                    {"$set": {"feedback_summary": summary}},
+                ))
+        if not requests:
+            return 0
+        return (await self.daily_logs.collection.bulk_write(requests, ordered=False)).modified_count
+
+    async def _drop_orphaned_feedback_summaries(self) -> int:
+        """Unset summaries on logs whose feedback no longer exists."""
+        repaired = 0
+        logs = self.daily_logs.collection.find({"feedback_summary": {"$exists": True}}, {"_id": 0, "id": 1})
+        while True:
+            log_ids = [log["id"] for log in await logs.to_list(RECONCILE_BATCH)]
+            if not log_ids:
+                return repaired
+            with_feedback = set(await self.feedback.collection.distinct("log_id", {"log_id": {"$in": encode_ids(log_ids)}}))
+            orphaned = [log_id for log_id in log_ids if log_id not in with_feedback]
+            if orphaned:
+                result = await self.daily_logs.collection.update_many(
+                    {"id": {"$in": encode_ids(orphaned)}},
+                    {"$unset": {"feedback_summary": ""}},
+                )
+                repaired += result.modified_count
+
+    async def clear(self) -> None:
+        for name in ("users", "daily_logs", "feedback", "notifications", "idempotency_keys"):
+            await self.db[name].delete_many({})
+
+    def close(self) -> None:
+        self.client.close()
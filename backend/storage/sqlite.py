@@ -0,0 +1,740 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from db_monitoring import record_operation
+
+from .base import (
+    BLOCKER_STRIP,
+    NO_BLOCKERS,
+    DailyLogRepository,
+    Document,
+    FeedbackRepository,
+    IdempotencyRepository,
+    NotificationRepository,
+    Storage,
+    UserRepository,
+    day_number,
+    day_range,
+    feedback_summary,
+    iso_day,
+    search_terms,
+    search_text,
+    with_day,
+)
+
+# Full-text index over each log's search_text; porter stems like Mongo's text index. Rows name their log by
+# id, and the log keeps the row's rowid in search_rowid: daily_logs has no INTEGER PRIMARY KEY, so its own
+# rowids may change on VACUUM and cannot link the two
+SEARCH_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS daily_logs_search USING fts5(log_id UNINDEXED, body, tokenize='porter unicode61');"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    email TEXT NOT NULL,
+    role TEXT NOT NULL,
+    password_hash TEXT NOT NULL,
+    manager_id TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_users_username ON users (username);
+CREATE INDEX IF NOT EXISTS idx_users_email ON users (email);
+CREATE INDEX IF NOT EXISTS idx_users_manager ON users (manager_id);
+CREATE INDEX IF NOT EXISTS idx_users_role ON users (role);
+
+CREATE TABLE IF NOT EXISTS daily_logs (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    day INTEGER,
+    total_time REAL NOT NULL,
+    mood INTEGER NOT NULL,
+    blockers TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    version INTEGER,
+    feedback_count INTEGER NOT NULL DEFAULT 0,
+    feedback_latest_text TEXT,
+    feedback_last_at TEXT,
+    search_rowid INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_daily_logs_user_day ON daily_logs (user_id, day);
+""" + SEARCH_SCHEMA + """
+
+CREATE TABLE IF NOT EXISTS tasks (
+    log_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    description TEXT NOT NULL,
+    time_spent REAL NOT NULL,
+    completed INTEGER NOT NULL,
+    PRIMARY KEY (log_id, position)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS feedback (
+    id TEXT PRIMARY KEY,
+    log_id TEXT NOT NULL,
+    manager_id TEXT NOT NULL,
+    feedback_text TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_feedback_log ON feedback (log_id, created_at);
+
+CREATE TABLE IF NOT EXISTS notifications (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    message TEXT NOT NULL,
+    type TEXT NOT NULL,
+    read INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_notifications_user_created ON notifications (user_id, created_at);
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    user_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    status_code INTEGER,
+    body TEXT,
+    expires_at TEXT NOT NULL,
+    PRIMARY KEY (user_id, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires ON idempotency_keys (expires_at);
+"""
+
+LOG_COLUMNS = ("id", "user_id", "date", "day", "total_time", "mood", "blockers", "created_at", "updated_at", "version")
+# The log's feedback_summary, flattened; written only by add_feedback and the reconciliation
+FEEDBACK_SUMMARY_COLUMNS = ("feedback_count", "feedback_latest_text", "feedback_last_at")
+LOG_SELECT = "SELECT " + ", ".join(LOG_COLUMNS + FEEDBACK_SUMMARY_COLUMNS) + " FROM daily_logs"
+DATETIME_FIELDS = ("created_at", "updated_at")
+
+# Stay below SQLITE_MAX_VARIABLE_NUMBER on older builds
+MAX_PARAMS = 900
+
+# Rows per backfill transaction, small enough that writers never wait long on the lock
+DAY_BACKFILL_BATCH = 5000
+# julianday('1970-01-01'), so julianday(date) - UNIX_EPOCH_JULIAN_DAY == day_number(date)
+UNIX_EPOCH_JULIAN_DAY = 2440587.5
+
+
+def _add_day_column(conn: sqlite3.Connection):
+    """Databases created before daily_logs.day existed get the column; backfill_days fills it."""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(daily_logs)")]
+    if columns and "day" not in columns:
+        conn.execute("ALTER TABLE daily_logs ADD COLUMN day INTEGER")
+        conn.execute("DROP INDEX IF EXISTS idx_daily_logs_user_date")
+
+
+def _add_version_column(conn: sqlite3.Connection):
+    """Logs in databases created before versioning keep a NULL version, read as version 0."""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(daily_logs)")]
+    if columns and "version" not in columns:
+        conn.execute("ALTER TABLE daily_logs ADD COLUMN version INTEGER")
+
+
+def _add_feedback_summary_columns(conn: sqlite3.Connection):
+    """Databases created before logs carried a feedback summary get the columns, filled from feedback."""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(daily_logs)")]
+    if columns and "feedback_count" not in columns:
+        conn.execute("ALTER TABLE daily_logs ADD COLUMN feedback_count INTEGER NOT NULL DEFAULT 0")
+        conn.execute("ALTER TABLE daily_logs ADD COLUMN feedback_latest_text TEXT")
+        conn.execute("ALTER TABLE daily_logs ADD COLUMN feedback_last_at TEXT")
+        _reconcile_feedback_summaries(conn)
+
+
+def _add_search_index(conn: sqlite3.Connection):
+    """Databases created before log search, or whose index was linked by daily_logs rowid, get the
+    full-text index rebuilt from existing logs."""
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if "daily_logs" not in tables:
+        return
+    if "log_id" in [row[1] for row in conn.execute("PRAGMA table_info(daily_logs_search)")]:
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if "search_rowid" not in [row[1] for row in conn.execute("PRAGMA table_info(daily_logs)")]:
+            conn.execute("ALTER TABLE daily_logs ADD COLUMN search_rowid INTEGER")
+        conn.execute("DROP TABLE IF EXISTS daily_logs_search")
+        conn.execute(SEARCH_SCHEMA)
+        # Today's rowids are unique, so they serve as the index rows' ids; from here on they are stored values
+        conn.execute("UPDATE daily_logs SET search_rowid = rowid")
+        conn.execute(
+            "INSERT INTO daily_logs_search (rowid, log_id, body) SELECT search_rowid, id,"
+            " COALESCE((SELECT group_concat(description, char(10)) FROM tasks WHERE tasks.log_id = daily_logs.id), '')"
+            " || char(10) || COALESCE(blockers, '') FROM daily_logs"
+        )
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def _index_log_text(conn: sqlite3.Connection, log_id: str, text: str):
+    conn.execute("INSERT INTO daily_logs_search (log_id, body) VALUES (?, ?)", (log_id, text))
+    conn.execute("UPDATE daily_logs SET search_rowid = last_insert_rowid() WHERE id = ?", (log_id,))
+
+
+def _reconcile_feedback_summaries(conn: sqlite3.Connection) -> int:
+    # A bare column next to MAX() takes its value from the row holding the maximum
+    cursor = conn.execute(
+        "UPDATE daily_logs SET feedback_count = summary.count,"
+        " feedback_latest_text = summary.latest_text, feedback_last_at = summary.last_at"
+        " FROM (SELECT log_id, COUNT(*) AS count, feedback_text AS latest_text, MAX(created_at) AS last_at"
+        "       FROM feedback GROUP BY log_id) AS summary"
+        " WHERE daily_logs.id = summary.log_id AND (feedback_count != summary.count"
+        "  OR feedback_latest_text IS NOT summary.latest_text OR feedback_last_at IS NOT summary.last_at)"
+    )
+    repaired = cursor.rowcount
+    cursor = conn.execute(
+        "UPDATE daily_logs SET feedback_count = 0, feedback_latest_text = NULL, feedback_last_at = NULL"
+        " WHERE feedback_count != 0 AND NOT EXISTS (SELECT 1 FROM feedback WHERE feedback.log_id = daily_logs.id)"
+    )
+    return repaired + cursor.rowcount
+
+
+def _backfill_day_batch(conn: sqlite3.Connection) -> int:
+    cursor = conn.execute(
+        f"UPDATE daily_logs SET day = CAST(julianday(date) - {UNIX_EPOCH_JULIAN_DAY} AS INTEGER)"
+        " WHERE rowid IN (SELECT rowid FROM daily_logs WHERE day IS NULL LIMIT ?)",
+        (DAY_BACKFILL_BATCH,),
+    )
+    return cursor.rowcount
+
+
+def _to_db(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def _row_to_doc(row: sqlite3.Row) -> Document:
+    doc = dict(row)
+    for field in DATETIME_FIELDS:
+        if isinstance(doc.get(field), str):
+            doc[field] = datetime.fromisoformat(doc[field])
+    if "read" in doc:
+        doc["read"] = bool(doc["read"])
+    return doc
+
+
+def _log_row_to_doc(row: sqlite3.Row) -> Document:
+    doc = _row_to_doc(row)
+    if doc["version"] is None:
+        del doc["version"]
+    count, latest_text, last_at = (doc.pop(column) for column in FEEDBACK_SUMMARY_COLUMNS)
+    if count:
+        doc["feedback_summary"] = feedback_summary(
+            {"feedback_text": latest_text, "created_at": datetime.fromisoformat(last_at)}, count
+        )
+    return doc
+
+
+def _placeholders(values: Sequence) -> str:
+    return ",".join("?" * len(values))
+
+
+def _in_list(column: str, values: Sequence) -> Tuple[str, List[Any]]:
+    """`column IN (...)` bound as a single JSON array parameter, however many values there are.
+
+    For queries that order, group or page over all the values at once and so cannot be
+    split with _chunks; the (user_id, day) index is still used for each value.
+    """
+    return f"{column} IN (SELECT value FROM json_each(?))", [json.dumps(list(values))]
+
+
+def _chunks(values: List, size: int = MAX_PARAMS):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def _execute(sql: str, params: Sequence = ()) -> Callable[[sqlite3.Connection], None]:
+    def statement(conn: sqlite3.Connection) -> None:
+        conn.execute(sql, params)
+    return statement
+
+
+def _executemany(sql: str, rows: List[Sequence]) -> Callable[[sqlite3.Connection], None]:
+    def statement(conn: sqlite3.Connection) -> None:
+        conn.executemany(sql, rows)
+    return statement
+
+
+class SQLiteDatabase:
+    """Runs blocking sqlite3 calls on a thread pool, one connection per worker thread.
+
+    WAL mode lets readers on different threads proceed while one thread writes.
+    """
+
+    def __init__(self, path: str, max_workers: int = 4):
+        self.path = path
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="devlog-sqlite")
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        conn = self._connect()
+        try:
+            _add_day_column(conn)
+            _add_version_column(conn)
+            _add_feedback_summary_columns(conn)
+            _add_search_index(conn)
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA foreign_keys=OFF")
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    async def warm_up(self, connections: int) -> None:
+        """Open a connection on `connections` worker threads; the barrier keeps one thread from taking every job."""
+        barrier = threading.Barrier(connections)
+
+        def open_connection():
+            self.connection()
+            try:
+                barrier.wait(timeout=5)
+            except threading.BrokenBarrierError:
+                pass
+
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, open_connection) for _ in range(connections)))
+
+    def connection_count(self) -> int:
+        with self._lock:
+            return len(self._connections)
+
+    async def run(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self.executor, lambda: fn(self.connection()))
+        docs = len(result) if isinstance(result, (list, dict)) else int(result is not None)
+        record_operation((time.perf_counter() - start) * 1000.0, docs)
+        return result
+
+    async def transaction(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        def wrapped(conn: sqlite3.Connection):
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(conn)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+        return await self.run(wrapped)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        # Like a closed MongoClient, the database reopens on next use; threads and connections are made lazily
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="devlog-sqlite")
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+
+class SQLiteUserRepository(UserRepository):
+    COLUMNS = ("id", "username", "email", "role", "password_hash", "manager_id", "created_at")
+
+    def __init__(self, database: SQLiteDatabase):
+        self.database = database
+
+    async def _one(self, sql: str, params: Sequence) -> Optional[Document]:
+        def query(conn):
+            row = conn.execute(sql, params).fetchone()
+            return _row_to_doc(row) if row else None
+        return await self.database.run(query)
+
+    async def _many(self, sql: str, params: Sequence) -> List[Document]:
+        return await self.database.run(lambda conn: [_row_to_doc(row) for row in conn.execute(sql, params)])
+
+    async def get(self, user_id: str) -> Optional[Document]:
+        return await self._one("SELECT * FROM users WHERE id = ?", (user_id,))
+
+    async def get_many(self, user_ids: Iterable[str]) -> List[Document]:
+        user_ids = list(dict.fromkeys(user_ids))
+
+        def query(conn):
+            users = []
+            for chunk in _chunks(user_ids):
+                users.extend(_row_to_doc(row) for row in conn.execute(f"SELECT * FROM users WHERE id IN ({_placeholders(chunk)})", chunk))
+            return users
+        return await self.database.run(query)
+
+    async def get_by_username(self, username: str) -> Optional[Document]:
+        return await self._one("SELECT * FROM users WHERE username = ? LIMIT 1", (username,))
+
+    async def find_by_username_or_email(self, username: str, email: str) -> Optional[Document]:
+        return await self._one("SELECT * FROM users WHERE username = ? OR email = ? LIMIT 1", (username, email))
+
+    async def list_by_manager(self, manager_id: str, limit: int = 1000) -> List[Document]:
+        return await self._many("SELECT * FROM users WHERE manager_id = ? ORDER BY rowid LIMIT ?", (manager_id, limit))
+
+    async def list_by_role(self, role: str, limit: int = 1000) -> List[Document]:
+        return await self._many("SELECT * FROM users WHERE role = ? ORDER BY rowid LIMIT ?", (role, limit))
+
+    async def create(self, user: Document) -> None:
+        await self.create_many([user])
+
+    async def create_many(self, users: List[Document]) -> None:
+        rows = [tuple(_to_db(user.get(column)) for column in self.COLUMNS) for user in users]
+        sql = f"INSERT INTO users ({', '.join(self.COLUMNS)}) VALUES ({_placeholders(self.COLUMNS)})"
+        await self.database.transaction(_executemany(sql, rows))
+
+
+class SQLiteDailyLogRepository(DailyLogRepository):
+    def __init__(self, database: SQLiteDatabase):
+        self.database = database
+
+    @staticmethod
+    def _attach_tasks(conn: sqlite3.Connection, rows: List[sqlite3.Row]) -> List[Document]:
+        logs = [_log_row_to_doc(row) for row in rows]
+        by_id = {log["id"]: log for log in logs}
+        for log in logs:
+            log["tasks"] = []
+        ids = list(by_id)
+        for chunk in _chunks(ids):
+            cursor = conn.execute(
+                f"SELECT log_id, description, time_spent, completed FROM tasks WHERE log_id IN ({_placeholders(chunk)}) ORDER BY log_id, position",
+                chunk,
+            )
+            for log_id, description, time_spent, completed in cursor:
+                by_id[log_id]["tasks"].append({"description": description, "time_spent": time_spent, "completed": bool(completed)})
+        return logs
+
+    async def _one(self, where: str, params: Sequence) -> Optional[Document]:
+        def query(conn):
+            row = conn.execute(f"{LOG_SELECT} WHERE {where} LIMIT 1", params).fetchone()
+            return self._attach_tasks(conn, [row])[0] if row else None
+        return await self.database.run(query)
+
+    async def get(self, log_id: str) -> Optional[Document]:
+        return await self._one("id = ?", (log_id,))
+
+    async def get_for_user(self, log_id: str, user_id: str) -> Optional[Document]:
+        return await self._one("id = ? AND user_id = ?", (log_id, user_id))
+
+    async def get_by_date(self, user_id: str, log_date: str) -> Optional[Document]:
+        return await self._one("user_id = ? AND day = ?", (user_id, day_number(log_date)))
+
+    @staticmethod
+    def _where(user_ids: List[str], start_date: Optional[str], end_date: Optional[str]):
+        # A manager's whole team in one query, past MAX_PARAMS reports too
+        in_users, params = _in_list("user_id", user_ids)
+        clauses = [in_users]
+        start_day, end_day = day_range(start_date, end_date)
+        if start_day is not None:
+            clauses.append("day >= ?")
+            params.append(start_day)
+        if end_day is not None:
+            clauses.append("day <= ?")
+            params.append(end_day)
+        return " AND ".join(clauses), params
+
+    async def list_for_users(self, user_ids, start_date=None, end_date=None, ascending=False, limit=1000, analytics=False):
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return []
+        where, params = self._where(user_ids, start_date, end_date)
+        order = "ASC" if ascending else "DESC"
+
+        def query(conn):
+            rows = conn.execute(f"{LOG_SELECT} WHERE {where} ORDER BY day {order} LIMIT ?", params + [limit]).fetchall()
+            return self._attach_tasks(conn, rows)
+        return await self.database.run(query)
+
+    async def daily_summaries(self, user_ids, start_date=None, end_date=None):
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return []
+        where, params = self._where(user_ids, start_date, end_date)
+        sql = (
+            "SELECT user_id, date, total_time, mood,"
+            " (SELECT COUNT(*) FROM tasks WHERE tasks.log_id = daily_logs.id) AS tasks_count"
+            f" FROM daily_logs WHERE {where} ORDER BY day"
+        )
+        return await self.database.run(lambda conn: [dict(row) for row in conn.execute(sql, params)])
+
+    async def daily_columns(self, user_ids, start_date=None, end_date=None):
+        user_ids = list(dict.fromkeys(user_ids))
+        columns: Dict[str, list] = {"day": [], "total_time": [], "mood": []}
+        if not user_ids:
+            return columns
+        where, params = self._where(user_ids, start_date, end_date)
+        sql = f"SELECT day, total_time, mood FROM daily_logs WHERE {where}"
+
+        def query(conn):
+            rows = conn.execute(sql, params).fetchall()
+            if rows:
+                columns["day"], columns["total_time"], columns["mood"] = (list(column) for column in zip(*rows))
+            return columns
+        return await self.database.run(query)
+
+    def _blocked_logs(self, user_ids: List[str], start_date: Optional[str], end_date: Optional[str]):
+        """Subquery of (user_id, date, day, blocker) for the logs reporting a blocker, normalized like normalize_blocker."""
+        where, params = self._where(user_ids, start_date, end_date)
+        sql = (
+            "SELECT * FROM (SELECT user_id, date, day, trim(lower(blockers), ?) AS blocker"
+            f" FROM daily_logs WHERE {where}) WHERE blocker <> '' AND blocker NOT IN ({_placeholders(NO_BLOCKERS)})"
+        )
+        return sql, [BLOCKER_STRIP, *params, *NO_BLOCKERS]
+
+    async def blocker_weeks(self, user_ids, start_date=None, end_date=None):
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return []
+        blocked, params = self._blocked_logs(user_ids, start_date, end_date)
+        # Weeks start on Monday; day 0 (1970-01-01) was a Thursday
+        sql = (
+            "SELECT blocker, day - (day + 3) % 7 AS week, COUNT(*) AS count, json_group_array(DISTINCT user_id) AS user_ids"
+            f" FROM ({blocked}) GROUP BY week, blocker ORDER BY week, count DESC, blocker"
+        )
+
+        def query(conn):
+            return [
+                {"blocker": row["blocker"], "week": iso_day(row["week"]), "count": row["count"], "user_ids": json.loads(row["user_ids"])}
+                for row in conn.execute(sql, params)
+            ]
+        return await self.database.run(query)
+
+    async def blocked_days(self, user_ids, start_date=None, end_date=None):
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return []
+        blocked, params = self._blocked_logs(user_ids, start_date, end_date)
+        sql = f"SELECT user_id, date FROM ({blocked}) ORDER BY user_id, day"
+        return await self.database.run(lambda conn: [dict(row) for row in conn.execute(sql, params)])
+
+    async def search(self, user_ids, query, offset=0, limit=20):
+        user_ids = list(dict.fromkeys(user_ids))
+        terms = search_terms(query)
+        if not user_ids or not terms:
+            return []
+        # Quoting each word keeps FTS5 query syntax (AND, NEAR, *, ...) out of user input
+        match = " OR ".join(f'"{term}"' for term in terms)
+        columns = ", ".join(f"daily_logs.{column}" for column in LOG_COLUMNS + FEEDBACK_SUMMARY_COLUMNS)
+        in_users, user_params = _in_list("daily_logs.user_id", user_ids)
+        sql = (
+            f"SELECT {columns}, -bm25(daily_logs_search) AS score FROM daily_logs_search"
+            " JOIN daily_logs ON daily_logs.id = daily_logs_search.log_id"
+            f" WHERE daily_logs_search MATCH ? AND {in_users}"
+            " ORDER BY score DESC, daily_logs.day DESC LIMIT ? OFFSET ?"
+        )
+
+        def query_logs(conn):
+            return self._attach_tasks(conn, conn.execute(sql, [match, *user_params, limit, offset]).fetchall())
+        return await self.database.run(query_logs)
+
+    @staticmethod
+    def _write_tasks(conn: sqlite3.Connection, log_id: str, tasks: List[Dict[str, Any]]):
+        conn.execute("DELETE FROM tasks WHERE log_id = ?", (log_id,))
+        conn.executemany(
+            "INSERT INTO tasks (log_id, position, description, time_spent, completed) VALUES (?, ?, ?, ?, ?)",
+            [(log_id, i, task["description"], task["time_spent"], int(task.get("completed", True))) for i, task in enumerate(tasks)],
+        )
+
+    async def create(self, log: Document) -> None:
+        await self.create_many([log])
+
+    async def create_many(self, logs: List[Document]) -> None:
+        rows = [tuple(_to_db(log.get(column)) for column in LOG_COLUMNS) for log in map(with_day, logs)]
+        sql = f"INSERT INTO daily_logs ({', '.join(LOG_COLUMNS)}) VALUES ({_placeholders(LOG_COLUMNS)})"
+
+        def write(conn):
+            conn.executemany(sql, rows)
+            for log in logs:
+                self._write_tasks(conn, log["id"], [dict(task) for task in log.get("tasks", [])])
+            for log in logs:
+                _index_log_text(conn, log["id"], search_text(log))
+        await self.database.transaction(write)
+
+    async def update(self, log_id: str, user_id: str, fields: Document, expected_version: Optional[int] = None) -> Optional[Document]:
+        fields = with_day(fields)
+        columns = [column for column in LOG_COLUMNS if column in fields and column not in ("id", "user_id", "version")]
+        assignments = "".join(f"{column} = ?, " for column in columns) + "version = COALESCE(version, 0) + 1"
+        where = "id = ? AND user_id = ?"
+        params = [_to_db(fields[column]) for column in columns] + [log_id, user_id]
+        if expected_version is not None:
+            where += " AND COALESCE(version, 0) = ?"
+            params.append(expected_version)
+
+        def write(conn):
+            if conn.execute(f"UPDATE daily_logs SET {assignments} WHERE {where}", params).rowcount == 0:
+                return None
+            if "tasks" in fields:
+                self._write_tasks(conn, log_id, [dict(task) for task in fields["tasks"]])
+            row = conn.execute(f"{LOG_SELECT} WHERE id = ?", (log_id,)).fetchone()
+            log = self._attach_tasks(conn, [row])[0]
+            if "tasks" in fields or "blockers" in fields:
+                conn.execute("DELETE FROM daily_logs_search WHERE rowid = (SELECT search_rowid FROM daily_logs WHERE id = ?)", (log_id,))
+                _index_log_text(conn, log_id, search_text(log))
+            return log
+        return await self.database.transaction(write)
+
+    async def add_feedback(self, log_id: str, feedback: Document) -> Optional[Document]:
+        def write(conn):
+            cursor = conn.execute(
+                "UPDATE daily_logs SET feedback_count = feedback_count + 1,"
+                " feedback_latest_text = ?, feedback_last_at = ? WHERE id = ?",
+                (feedback["feedback_text"], _to_db(feedback["created_at"]), log_id),
+            )
+            if cursor.rowcount == 0:
+                return None
+            row = conn.execute(f"{LOG_SELECT} WHERE id = ?", (log_id,)).fetchone()
+            return self._attach_tasks(conn, [row])[0]
+        return await self.database.transaction(write)
+
+
+class SQLiteFeedbackRepository(FeedbackRepository):
+    COLUMNS = ("id", "log_id", "manager_id", "feedback_text", "created_at")
+
+    def __init__(self, database: SQLiteDatabase):
+        self.database = database
+
+    async def create(self, feedback: Document) -> None:
+        await self.create_many([feedback])
+
+    async def create_many(self, feedback: List[Document]) -> None:
+        rows = [tuple(_to_db(item.get(column)) for column in self.COLUMNS) for item in feedback]
+        sql = f"INSERT INTO feedback ({', '.join(self.COLUMNS)}) VALUES ({_placeholders(self.COLUMNS)})"
+        await self.database.transaction(_executemany(sql, rows))
+
+
+class SQLiteNotificationRepository(NotificationRepository):
+    COLUMNS = ("id", "user_id", "message", "type", "read", "created_at")
+
+    def __init__(self, database: SQLiteDatabase):
+        self.database = database
+
+    async def get(self, notification_id: str) -> Optional[Document]:
+        def query(conn):
+            row = conn.execute("SELECT * FROM notifications WHERE id = ?", (notification_id,)).fetchone()
+            return _row_to_doc(row) if row else None
+        return await self.database.run(query)
+
+    async def list_for_user(self, user_id: str, limit: int = 100) -> List[Document]:
+        sql = "SELECT * FROM notifications WHERE user_id = ? ORDER BY created_at DESC LIMIT ?"
+        return await self.database.run(lambda conn: [_row_to_doc(row) for row in conn.execute(sql, (user_id, limit))])
+
+    async def create(self, notification: Document) -> None:
+        await self.create_many([notification])
+
+    async def create_many(self, notifications: List[Document]) -> None:
+        rows = [tuple(_to_db(item.get(column, False if column == "read" else None)) for column in self.COLUMNS) for item in notifications]
+        sql = f"INSERT INTO notifications ({', '.join(self.COLUMNS)}) VALUES ({_placeholders(self.COLUMNS)})"
+        await self.database.transaction(_executemany(sql, rows))
+
+    async def mark_read(self, notification_id: str, user_id: str) -> None:
+        await self.database.run(_execute("UPDATE notifications SET read = 1 WHERE id = ? AND user_id = ?", (notification_id, user_id)))
+
+
+class SQLiteIdempotencyRepository(IdempotencyRepository):
+    def __init__(self, database: SQLiteDatabase):
+        self.database = database
+
+    async def reserve(self, user_id: str, key: str, fingerprint: str, expires_at: datetime) -> Optional[Document]:
+        def write(conn):
+            # Expired records are dropped here, through the expires_at index, instead of by a sweeper
+            conn.execute("DELETE FROM idempotency_keys WHERE expires_at <= ?", (datetime.utcnow().isoformat(),))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO idempotency_keys (user_id, key, fingerprint, expires_at) VALUES (?, ?, ?, ?)",
+                (user_id, key, fingerprint, expires_at.isoformat()),
+            )
+            if cursor.rowcount:
+                return None
+            row = conn.execute(
+                "SELECT fingerprint, status_code, body FROM idempotency_keys WHERE user_id = ? AND key = ?", (user_id, key)
+            ).fetchone()
+            record = dict(row)
+            record["body"] = json.loads(record["body"]) if record["body"] is not None else None
+            return record
+        return await self.database.transaction(write)
+
+    async def complete(self, user_id: str, key: str, status_code: int, body: Any, expires_at: datetime) -> None:
+        await self.database.run(_execute(
+            "UPDATE idempotency_keys SET status_code = ?, body = ?, expires_at = ? WHERE user_id = ? AND key = ?",
+            (status_code, json.dumps(body), expires_at.isoformat(), user_id, key),
+        ))
+
+    async def release(self, user_id: str, key: str) -> None:
+        await self.database.run(_execute(
+            "DELETE FROM idempotency_keys WHERE user_id = ? AND key = ? AND status_code IS NULL", (user_id, key)
+        ))
+
+
+class SQLiteStorage(Storage):
+    """Embedded single-node storage for small installs that don't want to run MongoDB."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str, max_workers: int = 4):
+        self.database = SQLiteDatabase(path, max_workers)
+        self.users = SQLiteUserRepository(self.database)
+        self.daily_logs = SQLiteDailyLogRepository(self.database)
+        self.feedback = SQLiteFeedbackRepository(self.database)
+        self.notifications = SQLiteNotificationRepository(self.database)
+        self.idempotency = SQLiteIdempotencyRepository(self.database)
+
+    async def ensure_indexes(self) -> None:
+        await self.database.run(lambda conn: conn.executescript(SCHEMA).close())
+        await self.backfill_days()
+
+    async def backfill_days(self) -> int:
+        """Fill daily_logs.day for rows written before it existed, one short transaction per batch.
+
+        Rows still NULL are the checkpoint, so an interrupted backfill resumes where it stopped.
+        """
+        total = 0
+        while True:
+            updated = await self.database.run(_backfill_day_batch)
+            total += updated
+            if updated < DAY_BACKFILL_BATCH:
+                return total
+
+    async def ping(self) -> None:
+        await self.database.run(_execute("SELECT 1"))
+
+    async def warm_up(self, connections: int) -> None:
+        await self.database.warm_up(min(connections, self.database.max_workers))
+
+    def pool_stats(self) -> Document:
+        return {
+            "max_workers": self.database.max_workers,
+            "connections": self.database.connection_count(),
+        }
+
+    async def reconcile_feedback_summaries(self) -> int:
+        return await self.database.transaction(_reconcile_feedback_summaries)
+
+    async def clear(self) -> None:
+        def wipe(conn):
+            for table in ("tasks", "daily_logs", "daily_logs_search", "feedback", "notifications", "users", "idempotency_keys"):
+                conn.execute(f"DELETE FROM {table}")
+        await self.database.transaction(wipe)
+
+    def close(self) -> None:
+        self.database.close()
@@ -0,0 +1,124 @@
+"""
+Typeahead suggestions for task descriptions.
+
+Each user's recent task descriptions are kept in a sorted list, so a prefix
+lookup is one bisect plus a scan over the matches and never touches the
+database. A user's index is built from their recent logs on their first
+keystroke, updated in place when they create or edit a log, and rebuilt
+once it is TASK_SUGGEST_TTL_SECONDS old so that logs written through other
+workers show up. Only the most recently active users are kept.
+
+    TASK_SUGGEST_USERS        users kept per process, least recently used evicted first (default 1000)
+    TASK_SUGGEST_DAYS         days of logs an index is built from (default 90)
+    TASK_SUGGEST_TTL_SECONDS  rebuild an index this long after it was loaded (default 300)
+"""
+import asyncio
+import os
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+
+
+def normalize(text: str) -> str:
+    """Lowercase with runs of whitespace collapsed, so "Code  Review" and "code review" are one entry."""
+    return " ".join(text.lower().split())
+
+
+class UserTaskIndex:
+    """One user's task descriptions sorted by normalized text, with how many logs used each."""
+
+    def __init__(self):
+        self.loaded_at = time.monotonic()
+        self.keys: List[str] = []
+        # normalized text -> [latest spelling, number of logs using it, date last used]
+        self.entries: Dict[str, list] = {}
+        # log id -> normalized descriptions it contributed, so an edited log replaces its old ones
+        self.by_log: Dict[str, List[str]] = {}
+
+    def add_log(self, log_id: str, log_date: str, descriptions: Iterable[str]):
+        self.remove_log(log_id)
+        keys = []
+        for description in descriptions:
+            key = normalize(description)
+            if not key or key in keys:
+                continue
+            keys.append(key)
+            entry = self.entries.get(key)
+            if entry is None:
+                self.entries[key] = [description.strip(), 1, log_date]
+                insort(self.keys, key)
+            else:
+                entry[1] += 1
+                if log_date >= entry[2]:
+                    entry[0], entry[2] = description.strip(), log_date
+        self.by_log[log_id] = keys
+
+    def remove_log(self, log_id: str):
+        for key in self.by_log.pop(log_id, ()):
+            entry = self.entries[key]
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self.entries[key]
+                del self.keys[bisect_left(self.keys, key)]
+
+    def suggest(self, prefix: str, limit: int) -> List[str]:
+        """Descriptions starting with `prefix`, most used first, then most recently used."""
+        key = normalize(prefix)
+        if prefix[-1:].isspace() and key:
+            # "code " should not match "codebase"
+            key += " "
+        matches = []
+        for i in range(bisect_left(self.keys, key), len(self.keys)):
+            if not self.keys[i].startswith(key):
+                break
+            matches.append(self.entries[self.keys[i]])
+        matches.sort(key=lambda entry: (entry[1], entry[2]), reverse=True)
+        return [entry[0] for entry in matches[:limit]]
+
+
+class TaskSuggestions:
+    """Per-process LRU of UserTaskIndex, loaded from the storage engine on demand."""
+
+    def __init__(self, storage, max_users: Optional[int] = None, history_days: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.storage = storage
+        self.max_users = max_users if max_users is not None else int(os.environ.get("TASK_SUGGEST_USERS", "1000"))
+        self.history_days = history_days if history_days is not None else int(os.environ.get("TASK_SUGGEST_DAYS", "90"))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.environ.get("TASK_SUGGEST_TTL_SECONDS", "300"))
+        self._indexes: "OrderedDict[str, UserTaskIndex]" = OrderedDict()
+        # One load per user at a time; keystrokes arriving meanwhile wait for it
+        self._loading: Dict[str, asyncio.Future] = {}
+
+    async def suggest(self, user_id: str, prefix: str, limit: int = 8) -> List[str]:
+        return (await self._index(user_id)).suggest(prefix, limit)
+
+    def record_log(self, log: dict):
+        """Fold a created or edited log into its owner's index, if that index is loaded."""
+        index = self._indexes.get(log["user_id"])
+        if index is not None:
+            index.add_log(log["id"], log["date"], (task["description"] for task in log["tasks"]))
+
+    async def _index(self, user_id: str) -> UserTaskIndex:
+        index = self._indexes.get(user_id)
+        if index is not None and time.monotonic() - index.loaded_at < self.ttl_seconds:
+            self._indexes.move_to_end(user_id)
+            return index
+        loading = self._loading.get(user_id)
+        if loading is None:
+            loading = self._loading[user_id] = asyncio.ensure_future(self._load(user_id))
+            loading.add_done_callback(lambda _: self._loading.pop(user_id, None))
+        # Shielded so a client that stops typing does not cancel a load others are waiting on
+        return await asyncio.shield(loading)
+
+    async def _load(self, user_id: str) -> UserTaskIndex:
+        start_date = (date.today() - timedelta(days=self.history_days)).isoformat()
+        logs = await self.storage.daily_logs.list_for_users([user_id], start_date, limit=self.history_days + 1)
+        index = UserTaskIndex()
+        for log in logs:
+            index.add_log(log["id"], log["date"], (task["description"] for task in log["tasks"]))
+        self._indexes[user_id] = index
+        self._indexes.move_to_end(user_id)
+        while len(self._indexes) > self.max_users:
+            self._indexes.popitem(last=False)
+        return index
@@ -0,0 +1,399 @@
+import asyncio
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+from pymongo import monitoring
+
+from metrics import route_template
+
+logger = logging.getLogger("devlog.tracing")
+
+SERVICE_NAME = "devlog-backend"
+TRACEPARENT = re.compile(r"([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})")
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], attributes: Optional[Dict[str, Any]] = None, start_ns: Optional[int] = None):
+        self.trace = trace
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = dict(attributes or {})
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def end(self, end_ns: Optional[int] = None):
+        if self.end_ns is None:
+            self.end_ns = end_ns if end_ns is not None else time.time_ns()
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class Trace:
+    """Spans of one request. Spans may finish on Motor executor threads, hence the lock."""
+
+    def __init__(self, trace_id: Optional[str] = None, sampled: bool = False):
+        self.trace_id = trace_id or f"{random.getrandbits(128):032x}"
+        self.sampled = sampled
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class JSONLExporter:
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, spans: List[Span]):
+        # One write per batch so lines from several worker processes never interleave
+        payload = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        with open(self.path, "a") as f:
+            f.write(payload)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OTLPHTTPExporter:
+    """Posts spans as OTLP/JSON to a collector's /v1/traces endpoint."""
+
+    def __init__(self, endpoint: str, timeout: float = 2.0):
+        self.endpoint = endpoint.rstrip("/")
+        if not self.endpoint.endswith("/v1/traces"):
+            self.endpoint += "/v1/traces"
+        self.timeout = timeout
+
+    def export(self, spans: List[Span]):
+        otlp_spans = []
+        for span in spans:
+            otlp_span = {
+                "traceId": span.trace.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 2 if span.parent_id is None else 1,
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items()],
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+            }
+            if span.parent_id:
+                otlp_span["parentSpanId"] = span.parent_id
+            otlp_spans.append(otlp_span)
+        body = {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+                "scopeSpans": [{"scope": {"name": "devlog.tracing"}, "spans": otlp_spans}],
+            }]
+        }
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(body).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+class BatchSpanProcessor:
+    """Hands finished traces to the exporter on a background thread so requests never block on I/O."""
+
+    def __init__(self, exporter, max_queue_size: int = 2048):
+        self.exporter = exporter
+        self._queue: "queue.Queue[List[Span]]" = queue.Queue(maxsize=max_queue_size)
+        self._thread = threading.Thread(target=self._run, name="devlog-trace-export", daemon=True)
+        self._thread.start()
+
+    def submit(self, spans: List[Span]):
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            logger.warning("Trace export queue full, dropping %d spans", len(spans))
+
+    def _run(self):
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            # Drain whatever else is queued into the same export call
+            while True:
+                try:
+                    more = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if more is None:
+                    self._queue.put(None)
+                    break
+                batch.extend(more)
+            try:
+                self.exporter.export(batch)
+            except Exception as e:
+                logger.warning("Trace export failed: %s", e)
+
+    def shutdown(self):
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+
+class Tracer:
+    """Head sampling at TRACE_SAMPLE_RATE plus tail sampling of requests slower than TRACE_SLOW_MS."""
+
+    def __init__(self, processor: Optional[BatchSpanProcessor] = None, sample_rate: float = 0.0, slow_ms: Optional[float] = None):
+        self.processor = processor
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+
+    @property
+    def enabled(self) -> bool:
+        return self.processor is not None
+
+    def start_trace(self, name: str, trace_id: Optional[str] = None, parent_id: Optional[str] = None, sampled: Optional[bool] = None, attributes: Optional[Dict[str, Any]] = None) -> Span:
+        if sampled is None:
+            sampled = random.random() < self.sample_rate
+        trace = Trace(trace_id, sampled)
+        root = Span(trace, name, parent_id, attributes)
+        trace.add(root)
+        return root
+
+    def finish_trace(self, root: Span):
+        root.end()
+        trace = root.trace
+        keep = trace.sampled or (self.slow_ms is not None and root.duration_ms >= self.slow_ms)
+        if keep and self.processor is not None:
+            self.processor.submit([span for span in trace.spans if span.end_ns is not None])
+
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None, parent: Optional[Span] = None, start_ns: Optional[int] = None) -> Optional[Span]:
+        parent = parent or current_span.get()
+        if parent is None:
+            return None
+        span = Span(parent.trace, name, parent.span_id, attributes, start_ns)
+        parent.trace.add(span)
+        return span
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        span = self.start_span(name, attributes)
+        if span is None:
+            yield None
+            return
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = repr(e)
+            raise
+        finally:
+            span.end()
+            current_span.reset(token)
+
+    def traced(self, name: Optional[str] = None):
+        """Decorator wrapping a sync or async function in a span."""
+        def decorator(func: Callable):
+            span_name = name or func.__qualname__
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(span_name):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+
+tracer = Tracer()
+
+
+def configure_tracing() -> Tracer:
+    """Configure the module tracer from TRACE_* settings; tracing stays off for TRACE_EXPORTER=none."""
+    exporter_name = os.environ.get("TRACE_EXPORTER", "none").lower()
+    if exporter_name == "jsonl":
+        exporter = JSONLExporter(os.environ.get("TRACE_JSONL_PATH", "traces.jsonl"))
+    elif exporter_name == "otlp":
+        exporter = OTLPHTTPExporter(os.environ.get("OTLP_ENDPOINT", "http://localhost:4318"))
+    else:
+        return tracer
+    slow_ms = os.environ.get("TRACE_SLOW_MS", "500")
+    tracer.processor = BatchSpanProcessor(exporter)
+    tracer.sample_rate = float(os.environ.get("TRACE_SAMPLE_RATE", "0.01"))
+    tracer.slow_ms = float(slow_ms) if slow_ms else None
+    return tracer
+
+
+def _parse_traceparent(value: str) -> Optional[Tuple[str, str, bool]]:
+    """(trace id, parent id, sampled) from a W3C traceparent header; None if it is malformed."""
+    # version-traceid-parentid-flags, all lowercase hex; ids of all zeros are invalid
+    match = TRACEPARENT.fullmatch(value.strip())
+    if not match or match.group(1) == "ff" or not int(match.group(2), 16) or not int(match.group(3), 16):
+        return None
+    return match.group(2), match.group(3), bool(int(match.group(4), 16) & 1)
+
+
+class TracingMiddleware:
+    """Opens the root span for each request and exports the trace when it is sampled or slow."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        trace_id = parent_id = sampled = None
+        for name, value in scope.get("headers", []):
+            if name == b"traceparent":
+                parsed = _parse_traceparent(value.decode("latin-1"))
+                if parsed:
+                    trace_id, parent_id, sampled = parsed
+                break
+
+        route = route_template(scope.get("app"), scope)
+        root = tracer.start_trace(
+            f"{scope['method']} {route}",
+            trace_id=trace_id,
+            parent_id=parent_id,
+            sampled=sampled or None,
+            attributes={"http.method": scope["method"], "http.route": route, "http.target": scope.get("path")},
+        )
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                root.set_attribute("http.status_code", message["status"])
+                headers = list(message.get("headers", []))
+                headers.append((b"x-trace-id", root.trace.trace_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = current_span.set(root)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            root.error = repr(e)
+            raise
+        finally:
+            current_span.reset(token)
+            tracer.finish_trace(root)
+
+
+_serialize_span: ContextVar[Optional[Span]] = ContextVar("serialize_span", default=None)
+
+
+class TracedRoute(APIRoute):
+    """APIRoute that splits each request into dependency resolution, handler and serialization spans."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, endpoint, **kwargs)
+        call = self.dependant.call
+        if asyncio.iscoroutinefunction(call):
+            route_name = self.name
+
+            @functools.wraps(call)
+            async def traced_endpoint(*args, **kwargs):
+                with tracer.span(f"handler.{route_name}"):
+                    result = await call(*args, **kwargs)
+                # Closed by the route handler once FastAPI has validated and encoded the response
+                _serialize_span.set(tracer.start_span("serialize"))
+                return result
+
+            self.dependant.call = traced_endpoint
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def traced_handler(request):
+            with tracer.span("route", path=self.path):
+                token = _serialize_span.set(None)
+                try:
+                    return await handler(request)
+                finally:
+                    span = _serialize_span.get()
+                    if span is not None:
+                        span.end()
+                    _serialize_span.reset(token)
+
+        return traced_handler
+
+
+class TracingCommandListener(monitoring.CommandListener):
+    """Records each Mongo command as a child span of the span that issued it."""
+
+    def __init__(self):
+        self._pending: Dict[Tuple[Any, int], Span] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        parent = current_span.get()
+        if parent is None:
+            return
+        span = tracer.start_span(
+            f"mongo.{event.command_name}",
+            {"db.system": "mongodb", "db.name": event.database_name, "db.collection": str(event.command.get(event.command_name))},
+            parent=parent,
+        )
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = span
+
+    def _finish(self, event, error: Optional[str] = None):
+        with self._lock:
+            span = self._pending.pop((event.connection_id, event.request_id), None)
+        if span is None:
+            return
+        span.error = error
+        span.end(span.start_ns + event.duration_micros * 1000)
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event, str(event.failure))
@@ -0,0 +1,100 @@
+"""
+Trend analytics over daily logs, vectorized with NumPy.
+
+The storage engine hands over a window of logs as three parallel columns
+(day number, hours, mood) and everything here is array arithmetic over
+them: no per-log Python objects, so a year across a whole team costs about
+as much as a month for one developer.
+
+numpy is imported inside compute_trends so that importing the API does not
+pay for it (see tests/test_import_time.py).
+"""
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+from storage.base import day_number, iso_day, week_day
+
+ROLLING_WINDOWS = (7, 28)
+# Days before start_date that the columns must cover so the first rolling windows are full
+HISTORY_DAYS = max(ROLLING_WINDOWS) - 1
+
+
+def _values(array) -> List[Optional[float]]:
+    """JSON-ready list with NaN (no logs) as None."""
+    return [None if value != value else round(float(value), 3) for value in array.tolist()]
+
+
+def compute_trends(columns: Dict[str, list], start_date: date, end_date: date) -> Dict[str, Any]:
+    """Daily means, trailing rolling means, week-over-week deltas and the hours/mood correlation.
+
+    `columns` should reach back HISTORY_DAYS before start_date: those logs feed the rolling
+    windows of the first days only. Days with several logs (a team) are averaged per log; days
+    with none are null and left out of rolling windows rather than counted as zero, so a
+    window's mean is over the logs it contains.
+    """
+    import numpy as np
+
+    first = day_number(start_date.isoformat())
+    n = (end_date - start_date).days + 1
+    # Day i of the window is index HISTORY_DAYS + i of the history-extended arrays
+    days = np.asarray(columns["day"], dtype=np.int64) - first + HISTORY_DAYS
+    hours = np.asarray(columns["total_time"], dtype=np.float64)
+    mood = np.asarray(columns["mood"], dtype=np.float64)
+    inside = (days >= 0) & (days < HISTORY_DAYS + n)
+    days, hours, mood = days[inside], hours[inside], mood[inside]
+
+    all_counts = np.bincount(days, minlength=HISTORY_DAYS + n).astype(np.float64)
+    all_sums = {
+        "hours": np.bincount(days, weights=hours, minlength=HISTORY_DAYS + n),
+        "mood": np.bincount(days, weights=mood, minlength=HISTORY_DAYS + n),
+    }
+    counts = all_counts[HISTORY_DAYS:]
+    sums = {name: daily[HISTORY_DAYS:] for name, daily in all_sums.items()}
+    in_window = days >= HISTORY_DAYS
+    days, hours, mood = days[in_window], hours[in_window], mood[in_window]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result: Dict[str, Any] = {
+            "start_date": start_date,
+            "end_date": end_date,
+            "dates": [(start_date + timedelta(days=i)).isoformat() for i in range(n)],
+            "logs": int(days.size),
+        }
+        # Trailing window sums from prefix sums over the extended arrays: window i covers days (i - w, i]
+        count_prefix = np.concatenate(([0.0], np.cumsum(all_counts)))
+        upper = np.arange(HISTORY_DAYS + 1, HISTORY_DAYS + n + 1)
+        for name, daily in sums.items():
+            result[name] = _values(daily / counts)
+            prefix = np.concatenate(([0.0], np.cumsum(all_sums[name])))
+            for window in ROLLING_WINDOWS:
+                lower = upper - window
+                result[f"{name}_{window}d"] = _values(
+                    (prefix[upper] - prefix[lower]) / (count_prefix[upper] - count_prefix[lower])
+                )
+
+        # Weeks start on Monday; the first and last may be partial
+        week_starts = week_day(np.arange(first, first + n))
+        week_index = (week_starts - week_starts[0]) // 7
+        week_counts = np.bincount(week_index, weights=counts)
+        weeks = {name: np.bincount(week_index, weights=daily) / week_counts for name, daily in sums.items()}
+        deltas = {name: np.concatenate(([np.nan], np.diff(means))) for name, means in weeks.items()}
+    result["weeks"] = [
+        {
+            "week": iso_day(int(week_starts[0]) + 7 * i),
+            "logs": int(week_counts[i]),
+            "hours": hours_mean,
+            "mood": mood_mean,
+            "hours_delta": hours_delta,
+            "mood_delta": mood_delta,
+        }
+        for i, (hours_mean, mood_mean, hours_delta, mood_delta) in enumerate(zip(
+            _values(weeks["hours"]), _values(weeks["mood"]), _values(deltas["hours"]), _values(deltas["mood"])
+        ))
+    ]
+
+    # Pearson correlation over individual logs; undefined without two logs that vary in both
+    correlation = None
+    if days.size >= 2 and hours.std() > 0 and mood.std() > 0:
+        correlation = round(float(np.corrcoef(hours, mood)[0, 1]), 3)
+    result["hours_mood_correlation"] = correlation
+    return result
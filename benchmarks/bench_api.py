@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+In-process micro-benchmarks for every DevLog API handler
+
+Runs the FastAPI app through an ASGI transport (no uvicorn, no network)
+against a local mongod, the embedded SQLite engine or the in-memory engine,
+seeds datasets at several scales and records per-endpoint p50/p99
+latency and DB operations. Results can be stored as a JSON baseline;
+later runs exit non-zero when an endpoint regresses past the tolerance.
+
+Usage:
+    python benchmarks/bench_api.py --storage memory
+    python benchmarks/bench_api.py --storage mongo --mongo-url mongodb://localhost:27017 \\
+        --baseline benchmarks/baseline.json --update-baseline
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, time as dt_time, timedelta
+from pathlib import Path
+
+from bson import ObjectId
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+BENCH_PASSWORD = "Bench123!"
+DEFAULT_SCALES = [10, 1_000, 100_000]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark DevLog API handlers in-process")
+    parser.add_argument("--storage", choices=["memory", "sqlite", "mongo"], default="memory")
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017")
+    parser.add_argument("--db-name", default="devlog_bench")
+    parser.add_argument("--sqlite-path", default="/tmp/devlog_bench.db")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES, help="Number of seeded daily logs")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write results JSON to this path")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline with this run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative latency regression")
+    return parser.parse_args()
+
+
+def seeded_id(rng, created_at):
+    """The hex id the API would have made at created_at, with its random and counter bytes from rng."""
+    return str(ObjectId(ObjectId.from_datetime(created_at).binary[:4] + rng.randbytes(8)))
+
+
+def build_dataset(num_logs, password_hash, seed):
+    """Deterministic users and logs: roughly one year of history per developer."""
+    rng = random.Random(seed)
+    num_developers = max(1, num_logs // 365)
+    days_per_developer = -(-num_logs // num_developers)
+    today = date.today()
+    now = datetime.utcnow()
+
+    manager = {
+        "id": seeded_id(rng, now),
+        "username": "bench_manager",
+        "email": "bench_manager@example.com",
+        "role": "manager",
+        "password_hash": password_hash,
+        "manager_id": None,
+        "created_at": now,
+    }
+    developers = []
+    for i in range(num_developers):
+        developers.append({
+            "id": seeded_id(rng, now),
+            "username": f"bench_dev_{i}",
+            "email": f"bench_dev_{i}@example.com",
+            "role": "developer",
+            "password_hash": password_hash,
+            "manager_id": manager["id"],
+            "created_at": now,
+        })
+
+    logs = []
+    feedback = []
+    for dev in developers:
+        for day in range(days_per_developer):
+            if len(logs) >= num_logs:
+                break
+            tasks = [
+                {"description": f"Task {rng.randint(1, 500)}", "time_spent": round(rng.uniform(0.5, 4.0), 1), "completed": rng.random() < 0.75}
+                for _ in range(rng.randint(1, 5))
+            ]
+            log_date = today - timedelta(days=day)
+            log = {
+                # Time-ordered by the day the log was written, as the API would have issued them
+                "id": seeded_id(rng, datetime.combine(log_date, dt_time(17))),
+                "user_id": dev["id"],
+                "date": log_date.isoformat(),
+                "tasks": tasks,
+                "total_time": round(sum(t["time_spent"] for t in tasks), 1),
+                "mood": rng.randint(1, 5),
+                "blockers": "Waiting on review" if rng.random() < 0.3 else None,
+                "created_at": now,
+                "updated_at": now,
+            }
+            logs.append(log)
+            if rng.random() < 0.3:
+                feedback.append({
+                    "id": seeded_id(rng, datetime.combine(log_date, dt_time(18))),
+                    "log_id": log["id"],
+                    "manager_id": manager["id"],
+                    "feedback_text": "Nice work",
+                    "created_at": now,
+                })
+    return manager, developers, logs, feedback
+
+
+async def seed(storage, dataset, chunk_size=5_000):
+    manager, developers, logs, feedback = dataset
+    await storage.clear()
+    await storage.users.create_many([manager] + developers)
+    for i in range(0, len(logs), chunk_size):
+        await storage.daily_logs.create_many(logs[i:i + chunk_size])
+    for i in range(0, len(feedback), chunk_size):
+        await storage.feedback.create_many(feedback[i:i + chunk_size])
+    await storage.reconcile_feedback_summaries()
+
+
+def endpoint_specs(dev_log_id, log_date):
+    """(name, method, path, role, body factory taking the iteration number)."""
+    far_future = date(2100, 1, 1)
+    start = (date.today() - timedelta(days=30)).isoformat()
+    end = date.today().isoformat()
+    log_body = {"tasks": [{"description": "Benchmark task", "time_spent": 2.0, "completed": True}], "total_time": 2.0, "mood": 4, "blockers": None}
+    return [
+        ("POST /api/auth/login", "POST", "/api/auth/login", None, lambda i: {"username": "bench_dev_0", "password": BENCH_PASSWORD}),
+        ("GET /api/logs", "GET", f"/api/logs?start_date={start}&end_date={end}", "developer", None),
+        ("POST /api/logs", "POST", "/api/logs", "developer", lambda i: {**log_body, "date": (far_future + timedelta(days=i)).isoformat()}),
+        ("PUT /api/logs/{log_id}", "PUT", f"/api/logs/{dev_log_id}", "developer", lambda i: {**log_body, "date": log_date}),
+        ("GET /api/team/logs", "GET", f"/api/team/logs?start_date={start}&end_date={end}", "manager", None),
+        ("GET /api/team/developers", "GET", "/api/team/developers", "manager", None),
+        ("GET /api/team/blockers", "GET", f"/api/team/blockers?start_date={start}&end_date={end}", "manager", None),
+        ("GET /api/team/heatmap", "GET", f"/api/team/heatmap?start={start}&end={end}&metric=hours", "manager", None),
+        ("GET /api/search", "GET", "/api/search?q=waiting+review", "manager", None),
+        ("POST /api/feedback", "POST", "/api/feedback", "manager", lambda i: {"log_id": dev_log_id, "feedback_text": f"Feedback {i}"}),
+        ("GET /api/notifications", "GET", "/api/notifications", "developer", None),
+        ("GET /api/analytics/productivity", "GET", "/api/analytics/productivity?days=30", "developer", None),
+        ("GET /api/analytics/trends", "GET", "/api/analytics/trends?days=365", "manager", None),
+        ("GET /api/analytics/export", "GET", f"/api/analytics/export?start_date={start}&end_date={end}", "developer", None),
+        ("GET /api/users/managers", "GET", "/api/users/managers", None, None),
+    ]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+async def run_endpoint(client, method, path, headers, body_factory, iterations, warmup):
+    latencies = []
+    db_ops = []
+    errors = 0
+    for i in range(warmup + iterations):
+        body = body_factory(i) if body_factory else None
+        start = time.perf_counter()
+        response = await client.request(method, path, headers=headers, json=body)
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        if i < warmup:
+            continue
+        if response.status_code >= 400:
+            errors += 1
+        latencies.append(elapsed_ms)
+        db_ops.append(int(response.headers.get("x-db-queries", 0)))
+    latencies.sort()
+    return {
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "db_ops": round(sum(db_ops) / len(db_ops), 2) if db_ops else 0,
+        "errors": errors,
+    }
+
+
+async def bench_scale(server, httpx, num_logs, args):
+    password_hash = server.get_password_hash(BENCH_PASSWORD)
+    dataset = build_dataset(num_logs, password_hash, args.seed)
+    manager, developers, logs, _ = dataset
+    await seed(server.storage, dataset)
+
+    dev = developers[0]
+    dev_log = next(log for log in logs if log["user_id"] == dev["id"])
+    tokens = {
+        "developer": server.create_access_token({"sub": dev["id"]}, timedelta(hours=1)),
+        "manager": server.create_access_token({"sub": manager["id"]}, timedelta(hours=1)),
+    }
+
+    results = {}
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, method, path, role, body_factory in endpoint_specs(dev_log["id"], dev_log["date"]):
+            headers = {"Authorization": f"Bearer {tokens[role]}"} if role else {}
+            iterations = min(args.iterations, 10) if name.endswith("/login") else args.iterations
+            results[name] = await run_endpoint(client, method, path, headers, body_factory, iterations, args.warmup)
+            r = results[name]
+            print(f"  {name:<36} p50={r['p50_ms']:>9.2f}ms  p99={r['p99_ms']:>9.2f}ms  db_ops={r['db_ops']:>6}  errors={r['errors']}")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for scale, endpoints in results.items():
+        for name, current in endpoints.items():
+            previous = baseline.get(scale, {}).get(name)
+            if not previous:
+                continue
+            for metric in ("p50_ms", "p99_ms"):
+                if current[metric] > previous[metric] * (1 + tolerance):
+                    regressions.append(f"[{scale}] {name} {metric}: {previous[metric]} -> {current[metric]}")
+            if current["db_ops"] > previous["db_ops"]:
+                regressions.append(f"[{scale}] {name} db_ops: {previous['db_ops']} -> {current['db_ops']}")
+    return regressions
+
+
+async def main():
+    args = parse_args()
+    os.environ["MONGO_URL"] = args.mongo_url
+    os.environ["DB_NAME"] = args.db_name
+    os.environ["DB_DEBUG_HEADERS"] = "true"
+    os.environ["STORAGE_BACKEND"] = args.storage
+    os.environ["SQLITE_PATH"] = args.sqlite_path
+
+    import httpx
+    import server
+
+    await server.storage.ensure_indexes()
+
+    results = {}
+    for num_logs in args.scales:
+        print(f"📊 Scale: {num_logs} logs ({args.storage})")
+        results[str(num_logs)] = await bench_scale(server, httpx, num_logs, args)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+    exit_code = 0
+    if args.baseline:
+        baseline_path = Path(args.baseline)
+        if args.update_baseline or not baseline_path.exists():
+            baseline_path.write_text(json.dumps(results, indent=2))
+            print(f"✅ Baseline written to {baseline_path}")
+        else:
+            regressions = compare(results, json.loads(baseline_path.read_text()), args.tolerance)
+            if regressions:
+                print("❌ Regressions against baseline:")
+                for regression in regressions:
+                    print(f"  {regression}")
+                exit_code = 1
+            else:
+                print("✅ No regressions against baseline")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
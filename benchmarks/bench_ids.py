@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Insert throughput and id-index size for the entity id formats
+
+Inserts the same log-shaped documents keyed by each id format into a
+collection (or SQLite table) with a unique id index and reports docs/s over
+the whole run and over its last tenth, where random keys hurt most once the
+index outgrows the cache, plus the size of the id index:
+
+    uuid4-str     36-byte random strings (ids created before ObjectIds)
+    uuid4-binary  16-byte random UUIDs (BSON binary subtype 4 / SQLite BLOB)
+    objectid      12-byte time-ordered ObjectIds (what storage.ids.new_id produces)
+
+Usage:
+    python benchmarks/bench_ids.py --storage sqlite --docs 500000
+    python benchmarks/bench_ids.py --storage mongo --mongo-url mongodb://localhost:27017 --docs 1000000
+"""
+import argparse
+import json
+import os
+import sqlite3
+import time
+import uuid
+from datetime import datetime
+
+from bson import ObjectId
+from bson.binary import Binary, UuidRepresentation
+
+FORMATS = ("uuid4-str", "uuid4-binary", "objectid")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare insert throughput and index size per id format")
+    parser.add_argument("--storage", choices=["sqlite", "mongo"], default="sqlite")
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017")
+    parser.add_argument("--db-name", default="devlog_bench_ids")
+    parser.add_argument("--sqlite-path", default="/tmp/devlog_bench_ids.db")
+    parser.add_argument("--docs", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--output", help="Write results JSON to this path")
+    return parser.parse_args()
+
+
+def make_id(id_format: str, sqlite: bool):
+    if id_format == "uuid4-str":
+        return str(uuid.uuid4())
+    if id_format == "uuid4-binary":
+        value = uuid.uuid4()
+        return value.bytes if sqlite else Binary.from_uuid(value, UuidRepresentation.STANDARD)
+    # The SQLite engine stores ObjectIds as their hex string, Mongo natively
+    return str(ObjectId()) if sqlite else ObjectId()
+
+
+def log_document(doc_id, now: datetime) -> dict:
+    return {
+        "id": doc_id,
+        "user_id": "bench-user",
+        "date": now.date().isoformat(),
+        "total_time": 8.0,
+        "mood": 3,
+        "created_at": now,
+    }
+
+
+def timed_batches(args, insert_batch, id_format: str, sqlite: bool):
+    """Insert args.docs documents; return (overall docs/s, docs/s over the last tenth)."""
+    now = datetime.utcnow()
+    tail_start = args.docs - max(args.docs // 10, args.batch_size)
+    tail_docs, tail_elapsed = 0, 0.0
+    started = time.perf_counter()
+    for offset in range(0, args.docs, args.batch_size):
+        batch = [log_document(make_id(id_format, sqlite), now) for _ in range(min(args.batch_size, args.docs - offset))]
+        batch_started = time.perf_counter()
+        insert_batch(batch)
+        if offset >= tail_start:
+            tail_elapsed += time.perf_counter() - batch_started
+            tail_docs += len(batch)
+    elapsed = time.perf_counter() - started
+    return args.docs / elapsed, tail_docs / max(tail_elapsed, 1e-9)
+
+
+def bench_sqlite(args, id_format: str) -> dict:
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(args.sqlite_path + suffix):
+            os.remove(args.sqlite_path + suffix)
+    conn = sqlite3.connect(args.sqlite_path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    id_type = "BLOB" if id_format == "uuid4-binary" else "TEXT"
+    conn.execute(
+        f"CREATE TABLE logs (id {id_type} PRIMARY KEY, user_id TEXT, date TEXT, total_time REAL, mood INTEGER, created_at TEXT)"
+    )
+
+    def insert_batch(batch):
+        conn.execute("BEGIN")
+        conn.executemany(
+            "INSERT INTO logs VALUES (?, ?, ?, ?, ?, ?)",
+            [(d["id"], d["user_id"], d["date"], d["total_time"], d["mood"], d["created_at"].isoformat()) for d in batch],
+        )
+        conn.execute("COMMIT")
+
+    overall, tail = timed_batches(args, insert_batch, id_format, sqlite=True)
+    index_bytes = conn.execute(
+        "SELECT SUM(pgsize) FROM dbstat WHERE name = (SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'logs')"
+    ).fetchone()[0]
+    conn.close()
+    return {"docs_per_second": overall, "tail_docs_per_second": tail, "id_index_bytes": index_bytes}
+
+
+def bench_mongo(args, id_format: str) -> dict:
+    from pymongo import MongoClient
+
+    client = MongoClient(args.mongo_url)
+    collection = client[args.db_name][f"logs_{id_format.replace('-', '_')}"]
+    collection.drop()
+    collection.create_index("id", unique=True)
+    try:
+        overall, tail = timed_batches(args, lambda batch: collection.insert_many(batch, ordered=False), id_format, sqlite=False)
+        stats = client[args.db_name].command("collStats", collection.name)
+        return {
+            "docs_per_second": overall,
+            "tail_docs_per_second": tail,
+            "id_index_bytes": stats["indexSizes"].get("id_1"),
+        }
+    finally:
+        collection.drop()
+        client.close()
+
+
+def main():
+    args = parse_args()
+    bench = bench_sqlite if args.storage == "sqlite" else bench_mongo
+    results = {}
+    print(f"Inserting {args.docs} documents per id format into {args.storage}")
+    for id_format in args.formats:
+        results[id_format] = bench(args, id_format)
+        result = results[id_format]
+        print(
+            f"  {id_format:<13} {result['docs_per_second']:>10.0f} docs/s"
+            f"  last 10%: {result['tail_docs_per_second']:>10.0f} docs/s"
+            f"  id index: {result['id_index_bytes'] / 1024 / 1024:>8.1f} MiB"
+        )
+    if args.storage == "sqlite" and os.path.exists(args.sqlite_path):
+        os.remove(args.sqlite_path)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"storage": args.storage, "docs": args.docs, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
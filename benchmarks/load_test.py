@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Concurrent-user load generator for the DevLog API
+
+Simulates developer and manager sessions that replay the same request
+flows as frontend/src/App.js (login, dashboard load, daily log save,
+team view and feedback). Sessions arrive as a Poisson process at the
+configured rate, and throughput, latency percentiles and error rates are
+reported per request type.
+
+Usage:
+    python benchmarks/load_test.py --base-url http://localhost:8001/api --rate 20 --duration 60
+"""
+import argparse
+import asyncio
+import json
+import random
+import string
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+
+try:
+    import httpx
+except ImportError:
+    print("❌ load_test.py requires httpx (pip install -r benchmarks/requirements.txt)")
+    sys.exit(2)
+
+PASSWORD = "Load123!"
+
+TASK_TEMPLATES = [
+    "Code review for PR #{n}",
+    "Fixed bug in user dashboard",
+    "Updated API documentation",
+    "Optimized database queries",
+    "Added unit tests for payment module",
+    "Resolved production issue",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate realistic DevLog traffic against a running backend")
+    parser.add_argument("--base-url", default="http://localhost:8001/api")
+    parser.add_argument("--rate", type=float, default=10.0, help="New user sessions per second")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds to keep starting sessions")
+    parser.add_argument("--managers", type=int, default=5)
+    parser.add_argument("--developers", type=int, default=50)
+    parser.add_argument("--manager-ratio", type=float, default=0.15, help="Fraction of sessions that are managers")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Mean pause between steps in seconds")
+    parser.add_argument("--max-connections", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    return parser.parse_args()
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.status_codes = defaultdict(lambda: defaultdict(int))
+
+    def record(self, name, elapsed_ms, status_code):
+        self.latencies[name].append(elapsed_ms)
+        self.status_codes[name][status_code] += 1
+        if status_code >= 400 or status_code == 0:
+            self.errors[name] += 1
+
+    def report(self, wall_time):
+        def percentile(values, pct):
+            index = max(0, min(len(values) - 1, int(round(pct / 100.0 * len(values) + 0.5)) - 1))
+            return values[index]
+
+        report = {"wall_time_s": round(wall_time, 2), "endpoints": {}}
+        total_requests = total_errors = 0
+        for name in sorted(self.latencies):
+            values = sorted(self.latencies[name])
+            count = len(values)
+            total_requests += count
+            total_errors += self.errors[name]
+            report["endpoints"][name] = {
+                "requests": count,
+                "throughput_rps": round(count / wall_time, 2),
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+                "p99_ms": round(percentile(values, 99), 2),
+                "max_ms": round(values[-1], 2),
+                "error_rate": round(self.errors[name] / count, 4),
+                "status_codes": dict(self.status_codes[name]),
+            }
+        report["total_requests"] = total_requests
+        report["throughput_rps"] = round(total_requests / wall_time, 2) if wall_time else 0
+        report["error_rate"] = round(total_errors / total_requests, 4) if total_requests else 0
+        return report
+
+
+class Session:
+    def __init__(self, client, stats, user, think_time, rng):
+        self.client = client
+        self.stats = stats
+        self.user = user
+        self.think_time = think_time
+        self.rng = rng
+        self.headers = {}
+
+    async def request(self, name, method, path, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, headers=self.headers, **kwargs)
+            status_code = response.status_code
+        except httpx.HTTPError:
+            response, status_code = None, 0
+        self.stats.record(name, (time.perf_counter() - start) * 1000.0, status_code)
+        return response if response is not None and response.status_code < 400 else None
+
+    async def think(self):
+        if self.think_time > 0:
+            await asyncio.sleep(self.rng.expovariate(1.0 / self.think_time))
+
+    async def login(self):
+        response = await self.request("POST /auth/login", "POST", "/auth/login", json={"username": self.user["username"], "password": PASSWORD})
+        if response is None:
+            return False
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        # App.js validates the stored token by fetching notifications
+        await self.request("GET /notifications", "GET", "/notifications")
+        return True
+
+
+class DeveloperSession(Session):
+    def __init__(self, client, stats, user, think_time, rng, lock):
+        super().__init__(client, stats, user, think_time, rng)
+        # Held for the whole session: two sessions saving the same developer's day would race to
+        # POST it, and the loser's duplicate-date 400 is the load generator's fault, not the server's
+        self.lock = lock
+
+    async def load_dashboard(self):
+        logs, _ = await asyncio.gather(
+            self.request("GET /logs", "GET", "/logs"),
+            self.request("GET /analytics/productivity", "GET", "/analytics/productivity?days=30"),
+        )
+        return logs.json() if logs is not None else []
+
+    async def run(self):
+        async with self.lock:
+            await self.save_log()
+
+    async def save_log(self):
+        if not await self.login():
+            return
+        logs = await self.load_dashboard()
+        await self.think()
+
+        log_date = (date.today() - timedelta(days=self.rng.randint(0, 13))).isoformat()
+        tasks = [
+            {"description": self.rng.choice(TASK_TEMPLATES).format(n=self.rng.randint(1, 999)), "time_spent": round(self.rng.uniform(0.5, 4.0), 1), "completed": True}
+            for _ in range(self.rng.randint(1, 4))
+        ]
+        payload = {
+            "date": log_date,
+            "tasks": tasks,
+            "total_time": round(sum(t["time_spent"] for t in tasks), 1),
+            "mood": self.rng.randint(1, 5),
+            "blockers": None,
+        }
+        existing = next((log for log in logs if log["date"] == log_date), None)
+        if existing:
+            await self.request("PUT /logs/{log_id}", "PUT", f"/logs/{existing['id']}", json=payload)
+        else:
+            await self.request("POST /logs", "POST", "/logs", json=payload)
+        # LogForm's onSuccess refreshes both dashboard panels
+        await self.load_dashboard()
+
+
+class ManagerSession(Session):
+    async def load_team(self):
+        logs, _ = await asyncio.gather(
+            self.request("GET /team/logs", "GET", "/team/logs"),
+            self.request("GET /team/developers", "GET", "/team/developers"),
+        )
+        return logs.json() if logs is not None else []
+
+    async def run(self):
+        if not await self.login():
+            return
+        team_logs = await self.load_team()
+        await self.think()
+        if team_logs:
+            log = self.rng.choice(team_logs[:20])
+            await self.request("POST /feedback", "POST", "/feedback", json={"log_id": log["id"], "feedback_text": "Thanks, looks good!"})
+            await self.request("GET /team/logs", "GET", "/team/logs")
+
+
+async def register_users(client, args, rng):
+    """Create the manager and developer accounts the sessions log in with."""
+    suffix = "".join(rng.choices(string.ascii_lowercase + string.digits, k=6))
+    managers, developers = [], []
+    for i in range(args.managers):
+        username = f"load_mgr_{suffix}_{i}"
+        response = await client.post("/auth/register", json={"username": username, "email": f"{username}@example.com", "password": PASSWORD, "role": "manager"})
+        response.raise_for_status()
+        managers.append({"username": username, "id": response.json()["user"]["id"]})
+    for i in range(args.developers):
+        username = f"load_dev_{suffix}_{i}"
+        manager = managers[i % len(managers)] if managers else None
+        response = await client.post("/auth/register", json={
+            "username": username,
+            "email": f"{username}@example.com",
+            "password": PASSWORD,
+            "role": "developer",
+            "manager_id": manager["id"] if manager else None,
+        })
+        response.raise_for_status()
+        developers.append({"username": username, "id": response.json()["user"]["id"]})
+    return managers, developers
+
+
+async def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        print(f"👥 Registering {args.managers} managers and {args.developers} developers...")
+        managers, developers = await register_users(client, args, rng)
+
+        stats = Stats()
+        sessions = []
+        developer_locks = {developer["id"]: asyncio.Lock() for developer in developers}
+
+        def pick_developer():
+            # A busy developer is only picked (and waited for) when every developer is busy
+            idle = [developer for developer in developers if not developer_locks[developer["id"]].locked()]
+            return rng.choice(idle or developers)
+
+        print(f"🚀 Starting sessions at {args.rate}/s for {args.duration}s against {args.base_url}")
+        start = time.perf_counter()
+        while time.perf_counter() - start < args.duration:
+            if managers and rng.random() < args.manager_ratio:
+                session = ManagerSession(client, stats, rng.choice(managers), args.think_time, random.Random(rng.random()))
+            else:
+                developer = pick_developer()
+                session = DeveloperSession(
+                    client, stats, developer, args.think_time, random.Random(rng.random()), developer_locks[developer["id"]]
+                )
+            sessions.append(asyncio.create_task(session.run()))
+            await asyncio.sleep(rng.expovariate(args.rate))
+        await asyncio.gather(*sessions)
+        wall_time = time.perf_counter() - start
+
+    report = stats.report(wall_time)
+    report["sessions"] = len(sessions)
+    print(f"\n📋 {len(sessions)} sessions, {report['total_requests']} requests in {wall_time:.1f}s "
+          f"({report['throughput_rps']} req/s, error rate {report['error_rate']:.2%})")
+    print(f"{'Request':<32}{'count':>8}{'rps':>9}{'p50':>10}{'p95':>10}{'p99':>10}{'errors':>9}")
+    for name, r in report["endpoints"].items():
+        print(f"{name:<32}{r['requests']:>8}{r['throughput_rps']:>9}{r['p50_ms']:>9.1f}ms{r['p95_ms']:>8.1f}ms{r['p99_ms']:>8.1f}ms{r['error_rate']:>9.2%}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    return 0 if report["error_rate"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -5,17 +5,28 @@ set -e
 cd /backend || { echo "Backend directory not found"; exit 1; }
 
 echo "Starting FastAPI backend"
-# Start Uvicorn with proper host binding
-uvicorn server:app --host 0.0.0.0 --port 8001 &
+# Gunicorn supervises one Uvicorn worker per available CPU, see gunicorn.conf.py
+gunicorn -c gunicorn.conf.py server:app &
 BACKEND_PID=$!
 
-echo "Waiting for backend to start..."
-sleep 30
-
-if ! kill -0 $BACKEND_PID 2>/dev/null; then
-    echo "Backend failed to start at initialization, exiting"
-    exit 1
-fi
+# Poll the readiness probe instead of sleeping a fixed amount of time
+STARTUP_TIMEOUT=${STARTUP_TIMEOUT:-60}
+READY_URL="http://127.0.0.1:8001/api/health/ready"
+echo "Waiting for backend to become ready (timeout ${STARTUP_TIMEOUT}s)..."
+START_TIME=$(date +%s)
+until python3 -c "import sys, urllib.request; sys.exit(urllib.request.urlopen('$READY_URL', timeout=3).status != 200)" 2>/dev/null; do
+    if ! kill -0 $BACKEND_PID 2>/dev/null; then
+        echo "Backend failed to start at initialization, exiting"
+        exit 1
+    fi
+    if [ $(( $(date +%s) - START_TIME )) -ge "$STARTUP_TIMEOUT" ]; then
+        echo "Backend not ready after ${STARTUP_TIMEOUT}s, exiting"
+        kill $BACKEND_PID
+        exit 1
+    fi
+    sleep 0.5
+done
+echo "Backend ready after $(( $(date +%s) - START_TIME ))s"
 
 # Start Nginx
 nginx -g 'daemon off;' &
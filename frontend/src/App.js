@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import axios from 'axios';
 import { BrowserRouter as Router, Routes, Route, Navigate } from 'react-router-dom';
 import { 
@@ -42,6 +42,8 @@ ChartJS.register(
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
+// Wait this long after the last keystroke before asking for task suggestions
+const SUGGEST_DEBOUNCE_MS = 150;
 
 // Auth Context
 const AuthContext = React.createContext();
@@ -649,6 +651,52 @@ function LogForm({ log, onClose, onSuccess }) {
     setFormData({ ...formData, tasks: updatedTasks });
   };
 
+  const [suggestions, setSuggestions] = useState({ index: null, items: [] });
+  // Responses can arrive out of order; only the latest request may update the list
+  const suggestRequest = useRef(0);
+  const suggestTimer = useRef(null);
+  // Task and prefix (normalized as the server does) of the latest request, to skip repeats
+  const suggestKey = useRef(null);
+
+  useEffect(() => () => clearTimeout(suggestTimer.current), []);
+
+  const cancelSuggestions = () => {
+    clearTimeout(suggestTimer.current);
+    suggestRequest.current += 1;
+    suggestKey.current = null;
+    setSuggestions({ index: null, items: [] });
+  };
+
+  const updateDescription = (index, value) => {
+    updateTask(index, 'description', value);
+    if (value.trim().length < 2) {
+      cancelSuggestions();
+      return;
+    }
+    // Edits that leave the prefix unchanged ("Code  review" after "Code review") keep the request in flight
+    const key = `${index}:${value.toLowerCase().replace(/\s+/g, ' ').trimStart()}`;
+    if (key === suggestKey.current) return;
+    suggestKey.current = key;
+    clearTimeout(suggestTimer.current);
+    const request = ++suggestRequest.current;
+    suggestTimer.current = setTimeout(async () => {
+      try {
+        const response = await axios.get(`${API}/tasks/suggest`, { params: { prefix: value } });
+        if (request !== suggestRequest.current) return;
+        setSuggestions({ index, items: response.data.filter((item) => item !== value) });
+      } catch (error) {
+        if (request !== suggestRequest.current) return;
+        suggestKey.current = null;
+        setSuggestions({ index: null, items: [] });
+      }
+    }, SUGGEST_DEBOUNCE_MS);
+  };
+
+  const pickSuggestion = (index, value) => {
+    updateTask(index, 'description', value);
+    cancelSuggestions();
+  };
+
   const removeTask = (index) => {
     const updatedTasks = formData.tasks.filter((_, i) => i !== index);
     setFormData({ ...formData, tasks: updatedTasks });
@@ -663,7 +711,8 @@ function LogForm({ log, onClose, onSuccess }) {
       const payload = { ...formData, total_time: totalTime };
 
       if (log) {
-        await axios.put(`${API}/logs/${log.id}`, payload);
+        // If-Match makes the server reject the edit (409) when the log changed since it was loaded
+        await axios.put(`${API}/logs/${log.id}`, payload, { headers: { 'If-Match': `"${log.version ?? 0}"` } });
       } else {
         await axios.post(`${API}/logs`, payload);
       }
@@ -749,12 +798,26 @@ function LogForm({ log, onClose, onSuccess }) {
                     <div className="flex-1 space-y-2">
                       <textarea
                         value={task.description}
-                        onChange={(e) => updateTask(index, 'description', e.target.value)}
+                        onChange={(e) => updateDescription(index, e.target.value)}
                         placeholder="Task description (markdown supported)"
                         className="w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500"
                         rows="2"
                         required
                       />
+                      {suggestions.index === index && suggestions.items.length > 0 && (
+                        <div className="border border-gray-200 rounded-md bg-white shadow-sm">
+                          {suggestions.items.map((item) => (
+                            <button
+                              type="button"
+                              key={item}
+                              onClick={() => pickSuggestion(index, item)}
+                              className="block w-full text-left px-3 py-1 text-sm text-gray-700 hover:bg-gray-100"
+                            >
+                              {item}
+                            </button>
+                          ))}
+                        </div>
+                      )}
                       <input
                         type="number"
                         step="0.1"
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Online backfill of daily_logs.day, the integer day number (days since
+1970-01-01) that log reads filter and sort on instead of the date string.
+
+Rollout, with no downtime:
+
+  1. Deploy the API version that stores `day` on every create and update.
+     Until this migration is marked done it keeps reading by `date`.
+  2. Run this script. It builds the (user_id, day) index, then walks
+     daily_logs in _id order, setting `day` in small bulk batches. After
+     each batch it saves a checkpoint (last _id, counts) in the
+     `migrations` collection, so an interrupted run resumes where it
+     stopped. --pause-ms throttles it on a busy primary.
+  3. Once no log lacks `day`, it marks the migration done. API workers
+     switch their reads to `day` within 30 seconds, without a restart.
+  4. Optionally drop the old (user_id, date) index with --drop-date-index
+     once every worker reads by `day`.
+
+    python scripts/migrate_log_days.py --mongo-url mongodb://localhost:27017 --db-name test_database
+    python scripts/migrate_log_days.py --status
+"""
+import argparse
+import time
+from datetime import date, datetime
+
+from pymongo import ASCENDING, DESCENDING, MongoClient, UpdateOne
+from pymongo.errors import OperationFailure
+
+MIGRATION_ID = "daily_logs.day"
+DATE_INDEX = "user_id_1_date_-1"
+UNIX_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Backfill daily_logs.day in resumable batches")
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017")
+    parser.add_argument("--db-name", default="test_database")
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    parser.add_argument("--pause-ms", type=float, default=0.0, help="Sleep between batches to limit load")
+    parser.add_argument("--status", action="store_true", help="Print the checkpoint and exit")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and scan from the beginning")
+    parser.add_argument("--drop-date-index", action="store_true", help="Drop the (user_id, date) index after the backfill")
+    return parser.parse_args()
+
+
+def day_number(iso_date: str) -> int:
+    # Same as storage.base.day_number, kept local so the script runs without the backend on sys.path
+    return date.fromisoformat(iso_date[:10]).toordinal() - UNIX_EPOCH_ORDINAL
+
+
+def backfill(db, args) -> dict:
+    state = db.migrations.find_one({"_id": MIGRATION_ID}) or {}
+    if args.restart:
+        state = {}
+    last_id = state.get("last_id")
+    scanned = 0 if args.restart else state.get("scanned", 0)
+    updated = 0 if args.restart else state.get("updated", 0)
+    if last_id is not None:
+        print(f"⏩ Resuming after _id {last_id} ({scanned} logs scanned so far)")
+    db.migrations.update_one(
+        {"_id": MIGRATION_ID},
+        {"$set": {"done": False}, "$setOnInsert": {"started_at": datetime.utcnow()}},
+        upsert=True,
+    )
+
+    started = time.perf_counter()
+    while True:
+        query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        batch = list(
+            db.daily_logs.find(query, {"_id": 1, "date": 1, "day": 1})
+            .sort("_id", ASCENDING)
+            .limit(args.batch_size)
+        )
+        if not batch:
+            break
+        # Matching on the old date means a log re-dated meanwhile keeps the day its writer set
+        requests = [
+            UpdateOne({"_id": doc["_id"], "date": doc["date"]}, {"$set": {"day": day_number(doc["date"])}})
+            for doc in batch
+            if doc.get("day") != day_number(doc["date"])
+        ]
+        if requests:
+            updated += db.daily_logs.bulk_write(requests, ordered=False).modified_count
+        scanned += len(batch)
+        last_id = batch[-1]["_id"]
+        db.migrations.update_one(
+            {"_id": MIGRATION_ID},
+            {"$set": {"last_id": last_id, "scanned": scanned, "updated": updated, "checkpoint_at": datetime.utcnow()}},
+        )
+        rate = scanned / max(time.perf_counter() - started, 1e-9)
+        print(f"  ⏳ {scanned} scanned, {updated} updated ({rate:.0f} logs/s)", end="\r")
+        if args.pause_ms:
+            time.sleep(args.pause_ms / 1000.0)
+    print()
+    return {"last_id": last_id, "scanned": scanned, "updated": updated}
+
+
+def main():
+    args = parse_args()
+    client = MongoClient(args.mongo_url)
+    db = client[args.db_name]
+    try:
+        if args.status:
+            print(db.migrations.find_one({"_id": MIGRATION_ID}) or "Not started")
+            return
+
+        print("🔧 Ensuring the (user_id, day) index")
+        db.daily_logs.create_index([("user_id", ASCENDING), ("day", DESCENDING)])
+
+        result = backfill(db, args)
+        missing = db.daily_logs.count_documents({"day": {"$exists": False}})
+        if missing:
+            # Written by a worker that predates step 1; rerun once every worker stores `day`
+            print(f"⚠️  {missing} logs still have no day; not marking the migration done")
+            return
+        db.migrations.update_one(
+            {"_id": MIGRATION_ID},
+            {"$set": {"done": True, "finished_at": datetime.utcnow()}},
+        )
+        print(f"✅ Backfill complete: {result['scanned']} logs scanned, {result['updated']} updated")
+
+        if args.drop_date_index:
+            try:
+                db.daily_logs.drop_index(DATE_INDEX)
+                print(f"🗑️  Dropped index {DATE_INDEX}")
+            except OperationFailure as e:
+                print(f"⚠️  Could not drop {DATE_INDEX}: {e}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
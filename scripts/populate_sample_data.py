@@ -1,260 +1,392 @@
 #!/usr/bin/env python3
 """
-Script to populate sample data for DevLog application
+Deterministic synthetic data generator for the DevLog application
+
+Creates managers, developers, daily logs, feedback and notifications.
+Every developer gets its own RNG derived from --seed, so the generated
+data is identical for a given seed and end date regardless of how many
+worker processes are used. Logs are generated and written in chunked
+insert_many batches by parallel workers, and all accounts share one
+precomputed bcrypt hash.
+
+The defaults reproduce the original demo data set (sarah_manager plus
+four developers, 30 days of logs). Scale it up for benchmarks, e.g.:
+
+    python scripts/populate_sample_data.py --managers 2000 --developers 100000 \\
+        --days 730 --workers 8 --drop
 """
-import os
-import sys
-sys.path.append('/app/backend')
+import argparse
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, time as dt_time, timedelta
+from random import Random
 
-import asyncio
-from motor.motor_asyncio import AsyncIOMotorClient
+from bson import ObjectId
 from passlib.context import CryptContext
-from datetime import datetime, date, timedelta
-import uuid
-import random
+from pymongo import MongoClient
 
-# Database connection
-mongo_url = "mongodb://localhost:27017"
-client = AsyncIOMotorClient(mongo_url)
-db = client["test_database"]
+# daily_logs.day counts days from here, matching storage.base.day_number
+UNIX_EPOCH = date(1970, 1, 1)
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+DEMO_PASSWORD = "Demo123!"
+DEMO_MANAGER = "sarah_manager"
+DEMO_DEVELOPERS = [
+    ("john_dev", "john@company.com"),
+    ("alice_dev", "alice@company.com"),
+    ("bob_dev", "bob@company.com"),
+    ("emma_dev", "emma@company.com"),
+]
 
-async def create_sample_data():
-    """Create sample users and daily logs"""
-    print("🚀 Creating sample data for DevLog...")
-    
-    # Create sample manager
-    manager_id = str(uuid.uuid4())
-    manager = {
-        "id": manager_id,
-        "username": "sarah_manager",
-        "email": "sarah@company.com",
-        "role": "manager",
-        "password_hash": pwd_context.hash("Demo123!"),
-        "manager_id": None,
-        "created_at": datetime.utcnow()
-    }
-    
-    # Create sample developers
+TASK_TEMPLATES = [
+    ("Implemented authentication system", 3.5),
+    ("Fixed bug in user dashboard", 1.5),
+    ("Code review for PR #{pr}", 0.5),
+    ("Updated API documentation", 2.0),
+    ("Optimized database queries", 2.5),
+    ("Refactored user interface components", 4.0),
+    ("Added unit tests for payment module", 2.0),
+    ("Resolved production issue", 1.0),
+    ("Implemented new feature: dark mode", 3.0),
+    ("Performance optimization", 2.5),
+    ("Security audit and fixes", 3.5),
+    ("Database migration script", 1.5),
+    ("Integration with third-party API", 4.5),
+    ("Mobile responsiveness improvements", 2.0),
+    ("Error handling improvements", 1.5),
+]
+
+BLOCKERS = [
+    "Waiting for API documentation from external team",
+    "Environment setup issues",
+    "Blocked by code review process",
+    "Dependency on another team's work",
+    "Network connectivity issues",
+]
+
+FEEDBACK_MESSAGES = [
+    "Great work on the authentication system! Very clean implementation.",
+    "Good progress today. Please make sure to add more tests for the new features.",
+    "Excellent problem-solving on the production issue. Well done!",
+    "Thanks for the thorough code review. Your feedback was valuable.",
+    "Nice work on the API optimization. The performance improvements are noticeable.",
+    "Keep up the good work! Your consistency is impressive.",
+    "Good job handling the client requirements. Clear communication!",
+    "The documentation updates are very helpful. Thank you!",
+]
+
+
+class Distribution:
+    """How often developers log, how much they do and how they feel."""
+
+    def __init__(self, rng: Random):
+        self.rng = rng
+
+    def skips_day(self, day: date) -> bool:
+        return self.rng.random() < 0.2
+
+    def task_count(self) -> int:
+        return self.rng.randint(2, 5)
+
+    def task_time(self, base_time: float) -> float:
+        return max(0.5, round(base_time + self.rng.uniform(-0.5, 1.0), 1))
+
+    def mood(self) -> int:
+        return self.rng.choices([1, 2, 3, 4, 5], weights=[5, 10, 25, 35, 25])[0]
+
+    def blocker(self):
+        return self.rng.choice(BLOCKERS) if self.rng.random() < 0.3 else None
+
+
+class UniformDistribution(Distribution):
+    def mood(self) -> int:
+        return self.rng.randint(1, 5)
+
+    def blocker(self):
+        return self.rng.choice(BLOCKERS) if self.rng.random() < 0.2 else None
+
+
+class RealisticDistribution(Distribution):
+    """Quiet weekends, Poisson-ish task counts and log-normal task durations."""
+
+    def skips_day(self, day: date) -> bool:
+        if day.weekday() >= 5:
+            return self.rng.random() < 0.9
+        return self.rng.random() < 0.08
+
+    def task_count(self) -> int:
+        # Knuth's Poisson sampler with mean 3, at least one task
+        limit, k, p = math.exp(-3.0), 0, 1.0
+        while p > limit:
+            k += 1
+            p *= self.rng.random()
+        return max(1, k - 1)
+
+    def task_time(self, base_time: float) -> float:
+        return max(0.25, round(self.rng.lognormvariate(math.log(base_time), 0.4), 2))
+
+
+class HeavyTailDistribution(RealisticDistribution):
+    """A few very active developers and many occasional ones (Pareto activity)."""
+
+    def __init__(self, rng: Random):
+        super().__init__(rng)
+        self.activity = min(1.0, 0.15 * rng.paretovariate(1.2))
+
+    def skips_day(self, day: date) -> bool:
+        return super().skips_day(day) or self.rng.random() > self.activity
+
+
+DISTRIBUTIONS = {
+    "default": Distribution,
+    "uniform": UniformDistribution,
+    "realistic": RealisticDistribution,
+    "heavy-tail": HeavyTailDistribution,
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Populate DevLog with deterministic synthetic data")
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017")
+    parser.add_argument("--db-name", default="test_database")
+    parser.add_argument("--managers", type=int, default=1)
+    parser.add_argument("--developers", type=int, default=len(DEMO_DEVELOPERS), help="Total developers, spread round-robin over managers")
+    parser.add_argument("--days", type=int, default=30, help="Days of history per developer")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date.today(), help="Last logged day (YYYY-MM-DD)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--distribution", choices=sorted(DISTRIBUTIONS), default="default")
+    parser.add_argument("--feedback-rate", type=float, default=0.3)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--drop", action="store_true", help="Drop all DevLog collections first instead of removing only the generated users")
+    return parser.parse_args()
+
+
+def seeded_object_id(rng: Random, created_at: datetime) -> ObjectId:
+    """An ObjectId as the API would have made it at created_at, with its random and counter bytes from rng.
+
+    Ids are written as native ObjectIds, as storage.mongo.encode_doc stores them.
+    """
+    return ObjectId(ObjectId.from_datetime(created_at).binary[:4] + rng.randbytes(8))
+
+
+def manager_username(index: int) -> str:
+    return DEMO_MANAGER if index == 0 else f"manager_{index:05d}"
+
+
+def developer_identity(index: int):
+    if index < len(DEMO_DEVELOPERS):
+        return DEMO_DEVELOPERS[index]
+    username = f"dev_{index:06d}"
+    return username, f"{username}@company.com"
+
+
+def build_users(args, password_hash: str):
+    created_at = datetime.combine(args.end_date - timedelta(days=args.days), dt_time(9))
+    managers = []
+    for i in range(args.managers):
+        rng = Random(f"{args.seed}:manager:{i}")
+        username = manager_username(i)
+        managers.append({
+            "id": seeded_object_id(rng, created_at),
+            "username": username,
+            "email": "sarah@company.com" if i == 0 else f"{username}@company.com",
+            "role": "manager",
+            "password_hash": password_hash,
+            "manager_id": None,
+            "created_at": created_at,
+        })
     developers = []
-    dev_names = [
-        ("john_dev", "john@company.com", "John"),
-        ("alice_dev", "alice@company.com", "Alice"),
-        ("bob_dev", "bob@company.com", "Bob"),
-        ("emma_dev", "emma@company.com", "Emma")
-    ]
-    
-    for username, email, name in dev_names:
-        dev_id = str(uuid.uuid4())
-        developer = {
-            "id": dev_id,
+    for i in range(args.developers):
+        rng = Random(f"{args.seed}:developer:{i}")
+        username, email = developer_identity(i)
+        developers.append({
+            "id": seeded_object_id(rng, created_at),
             "username": username,
             "email": email,
             "role": "developer",
-            "password_hash": pwd_context.hash("Demo123!"),
-            "manager_id": manager_id,
-            "created_at": datetime.utcnow()
-        }
-        developers.append(developer)
-    
-    # Insert users
-    await db.users.insert_one(manager)
-    await db.users.insert_many(developers)
-    print(f"✅ Created 1 manager and {len(developers)} developers")
-    
-    # Create daily logs for the past 30 days
-    daily_logs = []
-    feedbacks = []
-    notifications = []
-    
-    for i in range(30):
-        log_date = date.today() - timedelta(days=i)
-        
-        for dev in developers:
-            # Skip some days randomly to make it more realistic
-            if random.random() < 0.2:  # 20% chance to skip a day
-                continue
-                
-            # Generate random tasks for each developer
-            tasks = []
-            num_tasks = random.randint(2, 5)
-            
-            task_templates = [
-                ("Implemented authentication system", 3.5),
-                ("Fixed bug in user dashboard", 1.5),
-                ("Code review for PR #123", 0.5),
-                ("Updated API documentation", 2.0),
-                ("Optimized database queries", 2.5),
-                ("Refactored user interface components", 4.0),
-                ("Added unit tests for payment module", 2.0),
-                ("Resolved production issue", 1.0),
-                ("Implemented new feature: dark mode", 3.0),
-                ("Performance optimization", 2.5),
-                ("Security audit and fixes", 3.5),
-                ("Database migration script", 1.5),
-                ("Integration with third-party API", 4.5),
-                ("Mobile responsiveness improvements", 2.0),
-                ("Error handling improvements", 1.5)
-            ]
-            
-            total_time = 0
-            for _ in range(num_tasks):
-                task_desc, base_time = random.choice(task_templates)
-                time_spent = round(base_time + random.uniform(-0.5, 1.0), 1)
-                if time_spent < 0.5:
-                    time_spent = 0.5
-                    
-                tasks.append({
-                    "description": task_desc,
-                    "time_spent": time_spent,
-                    "completed": random.choice([True, True, True, False])  # 75% completed
-                })
-                total_time += time_spent
-            
-            # Generate random mood (slightly biased towards positive)
-            mood = random.choices([1, 2, 3, 4, 5], weights=[5, 10, 25, 35, 25])[0]
-            
-            # Generate blockers occasionally
-            blocker_options = [
-                None,
-                "Waiting for API documentation from external team",
-                "Environment setup issues",
-                "Blocked by code review process",
-                "Dependency on another team's work",
-                "Network connectivity issues"
-            ]
-            blockers = random.choices(blocker_options, weights=[70, 6, 6, 6, 6, 6])[0]
-            
-            log_id = str(uuid.uuid4())
-            daily_log = {
-                "id": log_id,
-                "user_id": dev["id"],
-                "date": log_date.isoformat(),
-                "tasks": tasks,
-                "total_time": round(total_time, 1),
-                "mood": mood,
-                "blockers": blockers,
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            }
-            daily_logs.append(daily_log)
-            
-            # Add feedback from manager occasionally (30% chance)
-            if random.random() < 0.3:
-                feedback_messages = [
-                    "Great work on the authentication system! Very clean implementation.",
-                    "Good progress today. Please make sure to add more tests for the new features.",
-                    "Excellent problem-solving on the production issue. Well done!",
-                    "Thanks for the thorough code review. Your feedback was valuable.",
-                    "Nice work on the API optimization. The performance improvements are noticeable.",
-                    "Keep up the good work! Your consistency is impressive.",
-                    "Good job handling the client requirements. Clear communication!",
-                    "The documentation updates are very helpful. Thank you!"
-                ]
-                
-                feedback_id = str(uuid.uuid4())
-                feedback = {
-                    "id": feedback_id,
-                    "log_id": log_id,
-                    "manager_id": manager_id,
-                    "feedback_text": random.choice(feedback_messages),
-                    "created_at": datetime.utcnow()
-                }
-                feedbacks.append(feedback)
-                
-                # Create notification for developer about feedback
-                notif_id = str(uuid.uuid4())
-                notification = {
-                    "id": notif_id,
-                    "user_id": dev["id"],
-                    "message": f"New feedback from sarah_manager on your {log_date} log",
-                    "type": "feedback",
-                    "read": random.choice([True, False]),
-                    "created_at": datetime.utcnow()
-                }
-                notifications.append(notification)
-    
-    # Insert daily logs
-    if daily_logs:
-        await db.daily_logs.insert_many(daily_logs)
-    print(f"✅ Created {len(daily_logs)} daily logs")
-    
-    # Insert feedback
-    if feedbacks:
-        await db.feedback.insert_many(feedbacks)
-    print(f"✅ Created {len(feedbacks)} feedback entries")
-    
-    # Insert notifications
-    if notifications:
-        await db.notifications.insert_many(notifications)
-    
-    # Add welcome notifications for all users
-    welcome_notifications = []
-    for user in [manager] + developers:
-        notif_id = str(uuid.uuid4())
-        welcome_notification = {
-            "id": notif_id,
-            "user_id": user["id"],
-            "message": f"Welcome to DevLog, {user['username']}! Start logging your daily work.",
-            "type": "info",
-            "read": False,
-            "created_at": datetime.utcnow()
+            "password_hash": password_hash,
+            "manager_id": managers[i % len(managers)]["id"] if managers else None,
+            "created_at": created_at,
+        })
+    return managers, developers
+
+
+def generate_developer(args, index: int, developer: dict, managers_by_id: dict):
+    """All logs, feedback and notifications for one developer, from that developer's own RNG."""
+    rng = Random(f"{args.seed}:logs:{index}")
+    dist = DISTRIBUTIONS[args.distribution](rng)
+    manager = managers_by_id.get(developer["manager_id"])
+    logs, feedback, notifications = [], [], []
+
+    for offset in range(args.days):
+        log_date = args.end_date - timedelta(days=offset)
+        if dist.skips_day(log_date):
+            continue
+        tasks = []
+        for _ in range(dist.task_count()):
+            description, base_time = rng.choice(TASK_TEMPLATES)
+            tasks.append({
+                "description": description.format(pr=rng.randint(100, 9999)),
+                "time_spent": dist.task_time(base_time),
+                "completed": rng.random() < 0.75,
+            })
+        logged_at = datetime.combine(log_date, dt_time(17)) + timedelta(minutes=rng.randint(0, 180))
+        log_id = seeded_object_id(rng, logged_at)
+        log = {
+            "id": log_id,
+            "user_id": developer["id"],
+            "date": log_date.isoformat(),
+            "day": (log_date - UNIX_EPOCH).days,
+            "tasks": tasks,
+            "total_time": round(sum(task["time_spent"] for task in tasks), 1),
+            "mood": dist.mood(),
+            "blockers": dist.blocker(),
+            "created_at": logged_at,
+            "updated_at": logged_at,
         }
-        welcome_notifications.append(welcome_notification)
-    
-    # Insert notifications
-    all_notifications = welcome_notifications + notifications
-    if all_notifications:
-        try:
-            await db.notifications.insert_many(all_notifications, ordered=False)
-            print(f"✅ Created {len(all_notifications)} notifications")
-        except Exception as e:
-            print(f"⚠️ Some notifications may have been created (error: {str(e)[:100]}...)")
-    
-    print("\n🎉 Sample data creation completed!")
-    print("\n📋 Login Credentials:")
-    print("Manager:")
-    print("  Username: sarah_manager")
-    print("  Password: Demo123!")
-    print("\nDevelopers:")
-    for username, _, _ in dev_names:
-        print(f"  Username: {username}")
-        print(f"  Password: Demo123!")
-    
-    return manager, developers
-
-async def clear_existing_data():
-    """Clear existing sample data"""
+        logs.append(log)
+
+        if manager and rng.random() < args.feedback_rate:
+            feedback_at = logged_at + timedelta(hours=rng.randint(1, 20))
+            feedback.append({
+                "id": seeded_object_id(rng, feedback_at),
+                "log_id": log_id,
+                "manager_id": manager["id"],
+                "feedback_text": rng.choice(FEEDBACK_MESSAGES),
+                "created_at": feedback_at,
+            })
+            # What POST /api/feedback stores on the log (see storage.base.feedback_summary)
+            log["feedback_summary"] = {"latest_text": feedback[-1]["feedback_text"], "last_at": feedback_at, "count": 1}
+            notifications.append({
+                "id": seeded_object_id(rng, feedback_at),
+                "user_id": developer["id"],
+                "message": f"New feedback from {manager['username']} on your {log_date} log",
+                "type": "feedback",
+                "read": rng.random() < 0.5,
+                "created_at": feedback_at,
+            })
+    return logs, feedback, notifications
+
+
+def insert_chunked(collection, docs, batch_size: int) -> int:
+    for i in range(0, len(docs), batch_size):
+        collection.insert_many(docs[i:i + batch_size], ordered=False)
+    return len(docs)
+
+
+def populate_shard(args, shard, managers_by_id: dict):
+    """Worker entry point: generate and insert data for a slice of (index, developer) pairs."""
+    client = MongoClient(args.mongo_url)
+    db = client[args.db_name]
+    counts = {"daily_logs": 0, "feedback": 0, "notifications": 0}
+    buffers = {name: [] for name in counts}
+    try:
+        for index, developer in shard:
+            logs, feedback, notifications = generate_developer(args, index, developer, managers_by_id)
+            buffers["daily_logs"].extend(logs)
+            buffers["feedback"].extend(feedback)
+            buffers["notifications"].extend(notifications)
+            for name, docs in buffers.items():
+                if len(docs) >= args.batch_size:
+                    counts[name] += insert_chunked(db[name], docs, args.batch_size)
+                    docs.clear()
+        for name, docs in buffers.items():
+            if docs:
+                counts[name] += insert_chunked(db[name], docs, args.batch_size)
+    finally:
+        client.close()
+    return counts
+
+
+def clear_existing_data(db, args, users):
+    """Drop everything with --drop, otherwise remove only the users this run is about to create."""
     print("🧹 Clearing existing data...")
-    
-    # List of sample usernames to remove
-    sample_usernames = ["sarah_manager", "john_dev", "alice_dev", "bob_dev", "emma_dev"]
-    
-    # Get user IDs
-    users = await db.users.find({"username": {"$in": sample_usernames}}).to_list(1000)
-    user_ids = [user["id"] for user in users]
-    
-    if user_ids:
-        # Delete related data
-        await db.daily_logs.delete_many({"user_id": {"$in": user_ids}})
-        await db.feedback.delete_many({"manager_id": {"$in": user_ids}})
-        await db.notifications.delete_many({"user_id": {"$in": user_ids}})
-        await db.users.delete_many({"id": {"$in": user_ids}})
-        print(f"✅ Removed data for {len(users)} sample users")
+    if args.drop:
+        for name in ("users", "daily_logs", "feedback", "notifications"):
+            db[name].drop()
+        print("✅ Dropped DevLog collections")
+        return
+
+    usernames = [user["username"] for user in users]
+    removed = 0
+    for i in range(0, len(usernames), args.batch_size):
+        existing = db.users.find({"username": {"$in": usernames[i:i + args.batch_size]}}, {"id": 1})
+        user_ids = [user["id"] for user in existing]
+        if not user_ids:
+            continue
+        db.daily_logs.delete_many({"user_id": {"$in": user_ids}})
+        db.feedback.delete_many({"manager_id": {"$in": user_ids}})
+        db.notifications.delete_many({"user_id": {"$in": user_ids}})
+        db.users.delete_many({"id": {"$in": user_ids}})
+        removed += len(user_ids)
+    if removed:
+        print(f"✅ Removed data for {removed} existing users")
     else:
         print("ℹ️ No existing sample data found")
 
-async def main():
-    """Main function"""
+
+def main():
+    args = parse_args()
+    started = time.perf_counter()
+    print("🚀 Creating sample data for DevLog...")
+
+    # One bcrypt hash for every account; hashing 100k passwords would take hours
+    password_hash = CryptContext(schemes=["bcrypt"], deprecated="auto").hash(DEMO_PASSWORD)
+    managers, developers = build_users(args, password_hash)
+
+    client = MongoClient(args.mongo_url)
+    db = client[args.db_name]
     try:
-        await clear_existing_data()
-        await create_sample_data()
-    except Exception as e:
-        print(f"❌ Error: {e}")
+        clear_existing_data(db, args, managers + developers)
+
+        insert_chunked(db.users, managers + developers, args.batch_size)
+        print(f"✅ Created {len(managers)} managers and {len(developers)} developers")
+
+        welcome = []
+        for user in managers + developers:
+            welcome.append({
+                "id": seeded_object_id(Random(f"{args.seed}:welcome:{user['id']}"), user["created_at"]),
+                "user_id": user["id"],
+                "message": f"Welcome to DevLog, {user['username']}! Start logging your daily work.",
+                "type": "info",
+                "read": False,
+                "created_at": user["created_at"],
+            })
+        insert_chunked(db.notifications, welcome, args.batch_size)
+
+        managers_by_id = {manager["id"]: manager for manager in managers}
+        indexed = list(enumerate(developers))
+        workers = max(1, args.workers)
+        shard_size = max(1, math.ceil(len(indexed) / (workers * 4)))
+        shards = [indexed[i:i + shard_size] for i in range(0, len(indexed), shard_size)]
+
+        totals = {"daily_logs": 0, "feedback": 0, "notifications": len(welcome)}
+        if workers == 1:
+            results = (populate_shard(args, shard, managers_by_id) for shard in shards)
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            futures = [executor.submit(populate_shard, args, shard, managers_by_id) for shard in shards]
+            results = (future.result() for future in as_completed(futures))
+        for done, counts in enumerate(results, start=1):
+            for name, count in counts.items():
+                totals[name] += count
+            print(f"  ⏳ {done}/{len(shards)} shards, {totals['daily_logs']} logs so far", end="\r")
+        if workers > 1:
+            executor.shutdown()
+        print()
     finally:
         client.close()
 
+    print(f"✅ Created {totals['daily_logs']} daily logs")
+    print(f"✅ Created {totals['feedback']} feedback entries")
+    print(f"✅ Created {totals['notifications']} notifications")
+    print(f"\n🎉 Sample data creation completed in {time.perf_counter() - started:.1f}s!")
+    print("\n📋 Login Credentials (all accounts):")
+    print(f"  Password: {DEMO_PASSWORD}")
+    print(f"  Manager: {managers[0]['username'] if managers else '-'}")
+    print(f"  Developers: {', '.join(dev['username'] for dev in developers[:len(DEMO_DEVELOPERS)])}")
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Repair the feedback summary stored on each daily log.
+
+POST /api/feedback inserts the feedback document and then updates the
+log's feedback_summary (latest text, timestamp, count) in a second write,
+so a crash between the two, a manual edit of the feedback collection or a
+database populated before logs carried summaries leaves them out of date.
+This rebuilds every summary from the feedback collection, which keeps the
+full history, and only rewrites the logs that differ. It is safe to run
+while the API serves traffic.
+
+Reads the same environment as the API (backend/.env), so it repairs
+whatever STORAGE_BACKEND points at:
+
+    python scripts/reconcile_feedback.py
+    python scripts/reconcile_feedback.py --storage mongo --mongo-url mongodb://localhost:27017 --db-name test_database
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from storage import STORAGE_BACKENDS, create_storage  # noqa: E402
+
+
+def parse_args():
+    load_dotenv(BACKEND_DIR / ".env")
+    parser = argparse.ArgumentParser(description="Rebuild daily log feedback summaries from the feedback collection")
+    parser.add_argument("--storage", choices=STORAGE_BACKENDS, default=os.environ.get("STORAGE_BACKEND", "mongo"))
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db-name", default=os.environ.get("DB_NAME", "test_database"))
+    parser.add_argument("--sqlite-path", default=os.environ.get("SQLITE_PATH", str(BACKEND_DIR / "devlog.db")))
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    if args.storage == "memory":
+        sys.exit("The memory engine keeps no data between processes; nothing to reconcile")
+    storage = create_storage(args.storage, mongo_url=args.mongo_url, db_name=args.db_name, sqlite_path=args.sqlite_path)
+    try:
+        started = time.perf_counter()
+        repaired = await storage.reconcile_feedback_summaries()
+        print(f"✅ Repaired {repaired} feedback summaries in {time.perf_counter() - started:.1f}s")
+    finally:
+        storage.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
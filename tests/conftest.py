@@ -0,0 +1,52 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# server.py and its modules import each other as top-level modules, as they do under uvicorn
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+
+@pytest.fixture(scope="session")
+def server():
+    """The API module, importing it on the memory storage engine (it picks its engine at import)."""
+    previous = os.environ.get("STORAGE_BACKEND")
+    os.environ["STORAGE_BACKEND"] = "memory"
+    try:
+        import server
+    finally:
+        # Keep it out of subprocesses such as the import-time test's
+        if previous is None:
+            del os.environ["STORAGE_BACKEND"]
+        else:
+            os.environ["STORAGE_BACKEND"] = previous
+    assert server.storage.name == "memory", "server was imported with another storage engine"
+    return server
+
+
+@pytest.fixture
+def client(server):
+    """A TestClient running the app's lifespan over empty storage."""
+    from fastapi.testclient import TestClient
+
+    server.storage.clear_sync()
+    with TestClient(server.app) as client:
+        yield client
+
+
+@pytest.fixture
+def register(client):
+    """register(username, role="developer", manager_id="") -> (user id, auth headers)."""
+    def register(username, role="developer", manager_id=""):
+        response = client.post("/api/auth/register", json={
+            "username": username,
+            "email": f"{username}@example.com",
+            "password": "password123",
+            "role": role,
+            "manager_id": manager_id,
+        })
+        assert response.status_code == 200, response.text
+        body = response.json()
+        return body["user"]["id"], {"Authorization": f"Bearer {body['access_token']}"}
+    return register
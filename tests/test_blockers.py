@@ -0,0 +1,35 @@
+"""
+Blocker streaks: a weekend bridges two blocked days only when nothing was logged on it.
+"""
+def spans(streaks):
+    return [(streak.start, streak.end, streak.days) for streak in streaks]
+
+
+def test_weekend_without_logs_bridges_streak(server):
+    # Fri 2026-10-16, Mon 2026-10-19
+    assert spans(server.blocked_streaks(["2026-10-15", "2026-10-16", "2026-10-19"])) == [("2026-10-15", "2026-10-19", 3)]
+
+
+def test_unblocked_weekend_log_ends_streak(server):
+    dates = ["2026-10-16", "2026-10-18"]
+    logged = {"2026-10-16", "2026-10-17", "2026-10-18"}  # Saturday logged without a blocker
+    assert spans(server.blocked_streaks(dates, logged)) == [("2026-10-16", "2026-10-16", 1), ("2026-10-18", "2026-10-18", 1)]
+
+
+def test_missing_weekday_ends_streak(server):
+    # Thu 2026-10-15 unlogged between Wed and Fri
+    assert spans(server.blocked_streaks(["2026-10-14", "2026-10-16"])) == [("2026-10-14", "2026-10-14", 1), ("2026-10-16", "2026-10-16", 1)]
+
+
+def test_team_blockers_respects_unblocked_weekend_log(client, register):
+    manager_id, manager = register("lead", role="manager")
+    _, ann = register("ann", manager_id=manager_id)
+    for day, blockers in (("2026-10-16", "CI down"), ("2026-10-17", None), ("2026-10-18", "CI down")):
+        log = {"date": day, "tasks": [{"description": "Work", "time_spent": 1}], "total_time": 1, "mood": 3, "blockers": blockers}
+        assert client.post("/api/logs", json=log, headers=ann).status_code == 200
+
+    response = client.get("/api/team/blockers", params={"start_date": "2026-10-12", "end_date": "2026-10-18"}, headers=manager)
+    assert response.status_code == 200, response.text
+    developer = response.json()["developers"][0]
+    assert developer["blocked_days"] == 2
+    assert developer["longest_streak"]["days"] == 1
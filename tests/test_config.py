@@ -0,0 +1,16 @@
+"""
+Mongo client settings read from the environment.
+"""
+from config import MongoSettings
+
+
+def test_wire_compression_is_off_by_default(monkeypatch):
+    monkeypatch.delenv("MONGO_COMPRESSORS", raising=False)
+    settings = MongoSettings.from_env()
+    assert settings.compressors == ()
+    assert "compressors" not in settings.client_options()
+
+
+def test_compressors_are_opt_in_and_skip_missing_packages(monkeypatch):
+    monkeypatch.setenv("MONGO_COMPRESSORS", "nope, zlib")
+    assert MongoSettings.from_env().client_options()["compressors"] == "zlib"
@@ -0,0 +1,70 @@
+"""
+Team heatmap: a developers x days matrix flattened row-major, with 0 for days without a log.
+"""
+
+
+def post_log(client, headers, day, hours, mood, tasks=1):
+    log = {
+        "date": day,
+        "tasks": [{"description": f"Task {i}", "time_spent": hours / tasks} for i in range(tasks)],
+        "total_time": hours,
+        "mood": mood,
+    }
+    assert client.post("/api/logs", json=log, headers=headers).status_code == 200
+
+
+def heatmap(client, headers, **params):
+    response = client.get("/api/team/heatmap", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_matrix_is_row_major_by_developer_then_date(client, register):
+    manager_id, manager = register("lead", role="manager")
+    ann_id, ann = register("ann", manager_id=manager_id)
+    bob_id, bob = register("bob", manager_id=manager_id)
+    _, outsider = register("eve")
+    post_log(client, ann, "2026-10-05", 6, 4, tasks=2)
+    post_log(client, ann, "2026-10-07", 8, 2, tasks=3)
+    post_log(client, bob, "2026-10-06", 5, 5)
+    post_log(client, bob, "2026-10-09", 7, 3)  # after the range
+    post_log(client, outsider, "2026-10-05", 9, 1)
+
+    hours = heatmap(client, manager, start="2026-10-05", end="2026-10-08")
+    assert hours["developer_ids"] == [ann_id, bob_id]
+    assert hours["developer_names"] == ["ann", "bob"]
+    assert hours["dates"] == ["2026-10-05", "2026-10-06", "2026-10-07", "2026-10-08"]
+    assert hours["values"] == [
+        6, 0, 8, 0,  # ann
+        0, 5, 0, 0,  # bob
+    ]
+
+    assert heatmap(client, manager, start="2026-10-05", end="2026-10-08", metric="mood")["values"] == [4, 0, 2, 0, 0, 5, 0, 0]
+    assert heatmap(client, manager, start="2026-10-05", end="2026-10-08", metric="tasks")["values"] == [2, 0, 3, 0, 0, 1, 0, 0]
+
+
+def test_team_without_logs_is_all_zeros(client, register):
+    manager_id, manager = register("lead", role="manager")
+    register("ann", manager_id=manager_id)
+
+    result = heatmap(client, manager, start="2026-10-01", end="2026-10-03")
+    assert result["values"] == [0, 0, 0]
+    assert heatmap(client, register("solo", role="manager")[1], start="2026-10-01", end="2026-10-03")["values"] == []
+
+
+def test_range_is_validated(client, register):
+    _, manager = register("lead", role="manager")
+
+    def status(**params):
+        return client.get("/api/team/heatmap", params=params, headers=manager).status_code
+
+    assert status(start="2026-10-08", end="2026-10-05") == 400
+    assert status(start="2025-10-04", end="2026-10-05") == 400  # 367 days
+    assert status(start="2025-10-05", end="2026-10-05") == 200  # 366 days
+    assert status(start="2026-10-05", end="2026-10-05") == 200
+    assert status(start="2026-10-05", end="2026-10-06", metric="commits") == 422
+
+
+def test_developers_cannot_view_heatmap(client, register):
+    _, developer = register("ann")
+    assert client.get("/api/team/heatmap", headers=developer).status_code == 403
@@ -0,0 +1,153 @@
+"""
+Idempotency-Key on POST /api/logs and /api/feedback, against the memory engine.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+LOG = {"date": "2026-10-05", "tasks": [{"description": "Code review", "time_spent": 2}], "total_time": 2, "mood": 4}
+
+
+def test_retry_replays_first_response(client, register):
+    _, headers = register("dev")
+    headers = {**headers, "Idempotency-Key": "log-1"}
+
+    first = client.post("/api/logs", json=LOG, headers=headers)
+    retry = client.post("/api/logs", json=LOG, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert "Idempotent-Replayed" not in first.headers
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+    assert len(client.get("/api/logs", headers=headers).json()) == 1
+
+
+def test_key_reused_for_different_request_is_rejected(client, register):
+    _, headers = register("dev")
+    headers = {**headers, "Idempotency-Key": "log-1"}
+
+    assert client.post("/api/logs", json=LOG, headers=headers).status_code == 200
+    response = client.post("/api/logs", json={**LOG, "mood": 2}, headers=headers)
+
+    assert response.status_code == 422
+    assert client.get("/api/logs", headers=headers).json()[0]["mood"] == 4
+
+
+def test_client_error_is_replayed(client, register):
+    _, headers = register("dev")
+    assert client.post("/api/logs", json=LOG, headers=headers).status_code == 200
+
+    headers = {**headers, "Idempotency-Key": "duplicate-date"}
+    first = client.post("/api/logs", json=LOG, headers=headers)
+    retry = client.post("/api/logs", json=LOG, headers=headers)
+
+    assert first.status_code == retry.status_code == 400
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+
+
+def test_keys_are_per_user(client, register):
+    _, ann = register("ann")
+    _, bob = register("bob")
+
+    for headers in (ann, bob):
+        response = client.post("/api/logs", json=LOG, headers={**headers, "Idempotency-Key": "same"})
+        assert response.status_code == 200
+        assert "Idempotent-Replayed" not in response.headers
+
+
+def test_feedback_retry_notifies_once(client, register):
+    manager_id, manager = register("lead", role="manager")
+    _, developer = register("dev", manager_id=manager_id)
+    log_id = client.post("/api/logs", json=LOG, headers=developer).json()["id"]
+
+    headers = {**manager, "Idempotency-Key": "feedback-1"}
+    body = {"log_id": log_id, "feedback_text": "Nice work"}
+    first = client.post("/api/feedback", json=body, headers=headers)
+    retry = client.post("/api/feedback", json=body, headers=headers)
+
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json()["id"] == first.json()["id"]
+    notifications = client.get("/api/notifications", headers=developer).json()
+    assert [n["type"] for n in notifications].count("feedback") == 1
+    assert client.get("/api/logs", headers=developer).json()[0]["feedback_count"] == 1
+
+
+def test_abandoned_reservation_is_taken_over_after_its_lease(client, register, server):
+    user_id, headers = register("dev")
+    headers = {**headers, "Idempotency-Key": "log-1"}
+    fingerprint = server.request_fingerprint("POST /api/logs", server.DailyLogCreate(**LOG))
+    now = datetime.utcnow()
+
+    # A worker that is still running (or died less than a lease ago) holds the key
+    asyncio.run(server.storage.idempotency.reserve(user_id, "log-1", fingerprint, now + timedelta(minutes=1)))
+    assert client.post("/api/logs", json=LOG, headers=headers).status_code == 409
+
+    # Once the lease has passed, a retry runs the request instead of waiting out the full TTL
+    asyncio.run(server.storage.idempotency.release(user_id, "log-1"))
+    asyncio.run(server.storage.idempotency.reserve(user_id, "log-1", fingerprint, now - timedelta(seconds=1)))
+    response = client.post("/api/logs", json=LOG, headers=headers)
+    assert response.status_code == 200
+    assert "Idempotent-Replayed" not in response.headers
+
+
+def test_completed_response_outlives_the_lease(client, register, server, monkeypatch):
+    monkeypatch.setattr(server, "IDEMPOTENCY_LEASE_SECONDS", 0)
+    _, headers = register("dev")
+    headers = {**headers, "Idempotency-Key": "log-1"}
+
+    assert client.post("/api/logs", json=LOG, headers=headers).status_code == 200
+    assert client.post("/api/logs", json=LOG, headers=headers).headers["Idempotent-Replayed"] == "true"
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def idempotency(request, tmp_path):
+    from storage import create_storage
+
+    storage = create_storage(request.param, sqlite_path=str(tmp_path / "keys.db"))
+    yield storage.idempotency
+    storage.close()
+
+
+def test_reserve_takes_over_expired_lease(idempotency):
+    now = datetime.utcnow()
+    assert asyncio.run(idempotency.reserve("user", "key", "first", now - timedelta(seconds=1))) is None
+    assert asyncio.run(idempotency.reserve("user", "key", "second", now + timedelta(minutes=1))) is None
+
+    record = asyncio.run(idempotency.reserve("user", "key", "third", now + timedelta(minutes=1)))
+    assert (record["fingerprint"], record["status_code"]) == ("second", None)
+
+
+def test_complete_extends_the_lease(idempotency):
+    now = datetime.utcnow()
+    asyncio.run(idempotency.reserve("user", "key", "first", now + timedelta(milliseconds=50)))
+    asyncio.run(idempotency.complete("user", "key", 200, {"ok": True}, now + timedelta(days=1)))
+    asyncio.run(asyncio.sleep(0.1))
+
+    record = asyncio.run(idempotency.reserve("user", "key", "first", now + timedelta(minutes=1)))
+    assert (record["status_code"], record["body"]) == (200, {"ok": True})
+
+
+class _ContendedKeys:
+    """idempotency_keys collection where the key is always taken on insert and gone on read."""
+
+    async def insert_one(self, document):
+        raise DuplicateKeyError("E11000 duplicate key error")
+
+    async def find_one(self, query, projection=None, max_time_ms=None):
+        return None
+
+    async def delete_one(self, query):
+        pass
+
+
+def test_mongo_reserve_never_reports_a_reservation_it_did_not_make():
+    from storage.mongo import MongoIdempotencyRepository
+
+    repository = MongoIdempotencyRepository(_ContendedKeys())
+    record = asyncio.run(repository.reserve("user", "key", "fingerprint", datetime.utcnow() + timedelta(days=1)))
+
+    assert record is not None
+    assert record["status_code"] is None
@@ -0,0 +1,55 @@
+"""
+Import-time budget for the API module.
+
+Runs `python -X importtime -c "import server"` in a fresh interpreter and
+checks two things: that modules only some endpoints need (pandas for the CSV
+export, passlib and jose for auth) are not imported at module load, and that
+the cumulative import time of `server` stays within IMPORT_TIME_BUDGET_MS.
+"""
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+IMPORT_TIME_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "1000"))
+RUNS = 3
+
+DEFERRED_MODULES = ("pandas", "numpy", "passlib", "jose")
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def _importtime():
+    """{module: cumulative microseconds} for one cold `import server`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import server"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2))
+    return modules
+
+
+def test_heavy_modules_are_deferred():
+    modules = _importtime()
+    loaded = sorted(
+        name for name in modules
+        if any(name == root or name.startswith(root + ".") for root in DEFERRED_MODULES)
+    )
+    assert not loaded, f"import server pulls in modules that should load on first use: {loaded[:10]}"
+
+
+def test_server_import_within_budget():
+    # Best of several runs, so one slow disk read does not fail CI
+    best_ms = min(_importtime()["server"] for _ in range(RUNS)) / 1000.0
+    assert best_ms <= IMPORT_TIME_BUDGET_MS, (
+        f"import server took {best_ms:.0f} ms, budget is {IMPORT_TIME_BUDGET_MS:.0f} ms"
+    )
@@ -0,0 +1,34 @@
+"""
+The app can be started and stopped more than once in one process, as test suites do.
+"""
+from fastapi.testclient import TestClient
+
+
+def test_app_restarts_in_same_process(server):
+    for attempt in range(2):
+        server.storage.clear_sync()
+        with TestClient(server.app) as client:
+            response = client.post("/api/auth/register", json={
+                "username": f"restart{attempt}",
+                "email": f"restart{attempt}@example.com",
+                "password": "password123",
+                "role": "developer",
+                "manager_id": "",
+            })
+            assert response.status_code == 200, response.text
+            login = client.post("/api/auth/login", json={"username": f"restart{attempt}", "password": "password123"})
+            assert login.status_code == 200, login.text
+
+
+def test_app_serves_without_lifespan(server):
+    # benchmarks/bench_api.py drives the app over ASGITransport, which never runs the lifespan
+    server.storage.clear_sync()
+    client = TestClient(server.app)
+    response = client.post("/api/auth/register", json={
+        "username": "nolifespan",
+        "email": "nolifespan@example.com",
+        "password": "password123",
+        "role": "developer",
+        "manager_id": "",
+    })
+    assert response.status_code == 200, response.text
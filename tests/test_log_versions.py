@@ -0,0 +1,79 @@
+"""
+Optimistic concurrency on PUT /api/logs/{log_id}: versions, ETag and If-Match, against the memory engine.
+"""
+import pytest
+
+LOG = {"date": "2026-10-05", "tasks": [{"description": "Code review", "time_spent": 2}], "total_time": 2, "mood": 4}
+
+
+@pytest.fixture
+def developer(client, register):
+    _, headers = register("dev")
+    log = client.post("/api/logs", json=LOG, headers=headers).json()
+    return headers, log
+
+
+def put(client, headers, log_id, if_match=None, **changes):
+    if if_match is not None:
+        headers = {**headers, "If-Match": if_match}
+    return client.put(f"/api/logs/{log_id}", json={**LOG, **changes}, headers=headers)
+
+
+def test_new_log_starts_at_version_one(client, developer):
+    headers, log = developer
+    assert log["version"] == 1
+    assert client.get("/api/logs", headers=headers).json()[0]["version"] == 1
+
+
+def test_update_with_current_version_bumps_etag(client, developer):
+    headers, log = developer
+
+    response = put(client, headers, log["id"], '"1"', mood=5)
+
+    assert response.status_code == 200, response.text
+    assert response.headers["ETag"] == '"2"'
+    assert response.json()["version"] == 2
+    assert put(client, headers, log["id"], 'W/"2"', mood=3).headers["ETag"] == '"3"'
+
+
+def test_stale_version_is_rejected(client, developer):
+    headers, log = developer
+    assert put(client, headers, log["id"], '"1"', mood=5).status_code == 200
+
+    response = put(client, headers, log["id"], '"1"', mood=1)
+
+    assert response.status_code == 409
+    assert response.headers["ETag"] == '"2"'
+    saved = client.get("/api/logs", headers=headers).json()[0]
+    assert (saved["mood"], saved["version"]) == (5, 2)
+
+
+@pytest.mark.parametrize("if_match", ["abc", '"abc"', 'W/"x"', ""])
+def test_malformed_if_match_is_rejected(client, developer, if_match):
+    headers, log = developer
+
+    response = put(client, headers, log["id"], if_match, mood=1)
+
+    assert response.status_code == 400
+    assert client.get("/api/logs", headers=headers).json()[0]["version"] == 1
+
+
+@pytest.mark.parametrize("if_match", [None, "*"])
+def test_update_without_version_check_still_bumps_version(client, developer, if_match):
+    headers, log = developer
+
+    response = put(client, headers, log["id"], if_match, mood=5)
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"2"'
+
+
+def test_missing_log_is_not_found(client, developer):
+    headers, _ = developer
+    assert put(client, headers, "6ad5a1029adcaeb06022d3a1", '"1"').status_code == 404
+
+
+def test_other_users_log_is_not_found(client, register, developer):
+    _, log = developer
+    _, other = register("other")
+    assert put(client, other, log["id"], '"1"').status_code == 404
@@ -0,0 +1,17 @@
+"""
+Profiling rate limit: PROFILE_MAX_PER_MINUTE is a budget for the whole server, split across workers.
+"""
+from profiling import ProfilingMiddleware
+
+
+def test_budget_is_split_across_workers(monkeypatch):
+    monkeypatch.setenv("PROFILE_MAX_PER_MINUTE", "6")
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    # 2 per minute in this worker
+    assert ProfilingMiddleware(app=None, token="t").rate_limiter.min_interval == 30.0
+
+
+def test_single_process_gets_whole_budget(monkeypatch):
+    monkeypatch.setenv("PROFILE_MAX_PER_MINUTE", "6")
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    assert ProfilingMiddleware(app=None, token="t").rate_limiter.min_interval == 10.0
@@ -0,0 +1,245 @@
+"""
+Query-plan regression tests for the hot Mongo queries.
+
+Each test drives a MongoStorage repository method against a seeded local
+mongod, captures the exact commands it sends, and runs them through
+explain("executionStats"). A test fails if a plan contains a collection
+scan, an in-memory SORT stage, or examines more documents per returned
+document than QUERY_PLAN_MAX_EXAMINED_RATIO allows. Text searches are
+checked only for reading their text index (see TEXT_SEARCH_INDEXES).
+
+Requires a reachable mongod (QUERY_PLAN_MONGO_URL, default
+mongodb://localhost:27017); the module is skipped otherwise.
+"""
+import asyncio
+import os
+import uuid
+from datetime import date, datetime, timedelta
+
+import pytest
+from pymongo import MongoClient, monitoring
+from pymongo.errors import PyMongoError
+
+MONGO_URL = os.environ.get("QUERY_PLAN_MONGO_URL", "mongodb://localhost:27017")
+DB_NAME = f"devlog_query_plans_{uuid.uuid4().hex[:8]}"
+MAX_EXAMINED_RATIO = float(os.environ.get("QUERY_PLAN_MAX_EXAMINED_RATIO", "2.0"))
+
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "findAndModify", "update", "delete", "count", "distinct"}
+FORBIDDEN_STAGES = {"COLLSCAN", "SORT"}
+# Session, routing and time-limit fields that explain does not accept inside the explained command
+DRIVER_FIELDS = {"lsid", "$db", "$clusterTime", "$readPreference", "txnNumber", "$readConcern", "maxTimeMS"}
+
+NUM_MANAGERS = 3
+DEVELOPERS_PER_MANAGER = 10
+DAYS = 60
+
+
+def _mongo_available():
+    try:
+        MongoClient(MONGO_URL, serverSelectionTimeoutMS=1000).admin.command("ping")
+        return True
+    except PyMongoError:
+        return False
+
+
+pytestmark = pytest.mark.skipif(not _mongo_available(), reason=f"no mongod reachable at {MONGO_URL}")
+
+
+class CommandCapture(monitoring.CommandListener):
+    def __init__(self):
+        self.commands = []
+
+    def started(self, event):
+        if event.command_name in EXPLAINABLE_COMMANDS:
+            command = {k: v for k, v in event.command.items() if k not in DRIVER_FIELDS}
+            self.commands.append((event.command_name, command))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def _seed_documents():
+    today = date.today()
+    now = datetime.utcnow()
+    users, logs, feedback, notifications = [], [], [], []
+    for m in range(NUM_MANAGERS):
+        manager_id = str(uuid.uuid4())
+        users.append({"id": manager_id, "username": f"qp_manager_{m}", "email": f"qp_manager_{m}@example.com",
+                      "role": "manager", "password_hash": "x", "manager_id": None, "created_at": now})
+        for d in range(DEVELOPERS_PER_MANAGER):
+            dev_id = str(uuid.uuid4())
+            users.append({"id": dev_id, "username": f"qp_dev_{m}_{d}", "email": f"qp_dev_{m}_{d}@example.com",
+                          "role": "developer", "password_hash": "x", "manager_id": manager_id, "created_at": now})
+            for day in range(DAYS):
+                log_id = str(uuid.uuid4())
+                logs.append({
+                    "id": log_id,
+                    "user_id": dev_id,
+                    "date": (today - timedelta(days=day)).isoformat(),
+                    "tasks": [{"description": "Query plan task", "time_spent": 1.0, "completed": True}],
+                    "total_time": 1.0,
+                    "mood": 3,
+                    "blockers": "Waiting on review" if day % 5 == 0 else None,
+                    "created_at": now,
+                    "updated_at": now,
+                })
+                if day % 3 == 0:
+                    feedback.append({"id": str(uuid.uuid4()), "log_id": log_id, "manager_id": manager_id,
+                                     "feedback_text": "ok", "created_at": now + timedelta(seconds=day)})
+                if day % 4 == 0:
+                    notifications.append({"id": str(uuid.uuid4()), "user_id": dev_id, "message": "hi",
+                                          "type": "info", "read": False, "created_at": now - timedelta(days=day)})
+    return users, logs, feedback, notifications
+
+
+@pytest.fixture(scope="module")
+def harness():
+    from storage.mongo import MongoStorage
+
+    loop = asyncio.new_event_loop()
+    capture = CommandCapture()
+    storage = MongoStorage(MONGO_URL, DB_NAME, event_listeners=[capture])
+    users, logs, feedback, notifications = _seed_documents()
+
+    async def setup():
+        await storage.ensure_indexes()
+        await storage.users.create_many(users)
+        await storage.daily_logs.create_many(logs)
+        await storage.feedback.create_many(feedback)
+        await storage.reconcile_feedback_summaries()
+        developer = next(u for u in users if u["role"] == "developer")
+        await storage.idempotency.reserve(developer["id"], "seeded-key", "fingerprint", datetime.utcnow() + timedelta(days=1))
+        await storage.notifications.create_many(notifications)
+
+    loop.run_until_complete(setup())
+    sync_client = MongoClient(MONGO_URL)
+    managers = [u for u in users if u["role"] == "manager"]
+    developers = [u for u in users if u["role"] == "developer"]
+    data = {
+        "manager": managers[0],
+        "team_ids": [u["id"] for u in developers if u["manager_id"] == managers[0]["id"]],
+        "developer": developers[0],
+        "log": next(log for log in logs if log["user_id"] == developers[0]["id"]),
+        "notification": next(n for n in notifications if n["user_id"] == developers[0]["id"]),
+        "start": (date.today() - timedelta(days=30)).isoformat(),
+        "end": date.today().isoformat(),
+    }
+    try:
+        yield loop, storage, capture, sync_client[DB_NAME], data
+    finally:
+        sync_client.drop_database(DB_NAME)
+        sync_client.close()
+        storage.close()
+        loop.close()
+
+
+def _find_key(node, key):
+    if isinstance(node, dict):
+        if key in node:
+            return node[key]
+        children = node.values()
+    elif isinstance(node, list):
+        children = node
+    else:
+        return None
+    for child in children:
+        found = _find_key(child, key)
+        if found is not None:
+            return found
+    return None
+
+
+def _stages(plan):
+    """All stage names in a winning plan, covering classic and slot-based (queryPlan) explain output."""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for key in ("inputStage", "queryPlan", "outerStage", "innerStage"):
+            stages.extend(_stages(plan.get(key)))
+        for child in plan.get("inputStages", []):
+            stages.extend(_stages(child))
+    return stages
+
+
+def _index_names(plan):
+    """Names of the indexes a winning plan reads."""
+    if isinstance(plan, dict):
+        names = [plan["indexName"]] if "indexName" in plan else []
+        for child in plan.values():
+            names.extend(_index_names(child))
+        return names
+    if isinstance(plan, list):
+        return [name for child in plan for name in _index_names(child)]
+    return []
+
+
+# Ranked $text search cannot be scoped by user: a text index's prefix fields need an equality match
+# and team searches use $in. Its plan fetches every user's matches and sorts them by score, so only
+# the use of the text index is checked: search queries name the index they must read.
+TEXT_SEARCH_INDEXES = {
+    "daily_logs.search (own logs)": "daily_logs_search",
+    "daily_logs.search (team logs)": "daily_logs_search",
+}
+
+HOT_QUERIES = {
+    "users.get": lambda s, d: s.users.get(d["developer"]["id"]),
+    "users.get_many": lambda s, d: s.users.get_many(d["team_ids"]),
+    "users.get_by_username": lambda s, d: s.users.get_by_username(d["developer"]["username"]),
+    "users.find_by_username_or_email": lambda s, d: s.users.find_by_username_or_email(d["developer"]["username"], "nobody@example.com"),
+    "users.list_by_manager": lambda s, d: s.users.list_by_manager(d["manager"]["id"]),
+    "users.list_by_role": lambda s, d: s.users.list_by_role("manager"),
+    "daily_logs.get": lambda s, d: s.daily_logs.get(d["log"]["id"]),
+    "daily_logs.get_for_user": lambda s, d: s.daily_logs.get_for_user(d["log"]["id"], d["developer"]["id"]),
+    "daily_logs.get_by_date": lambda s, d: s.daily_logs.get_by_date(d["developer"]["id"], d["log"]["date"]),
+    "daily_logs.list_for_users (own logs)": lambda s, d: s.daily_logs.list_for_users([d["developer"]["id"]], d["start"], d["end"]),
+    "daily_logs.list_for_users (team logs)": lambda s, d: s.daily_logs.list_for_users(d["team_ids"], d["start"], d["end"]),
+    "daily_logs.list_for_users (export)": lambda s, d: s.daily_logs.list_for_users([d["developer"]["id"]], d["start"], d["end"], ascending=True, analytics=True),
+    "daily_logs.daily_summaries": lambda s, d: s.daily_logs.daily_summaries([d["developer"]["id"]], d["start"], d["end"]),
+    "daily_logs.daily_columns (team trends)": lambda s, d: s.daily_logs.daily_columns(d["team_ids"], d["start"], d["end"]),
+    "daily_logs.blocker_weeks": lambda s, d: s.daily_logs.blocker_weeks(d["team_ids"], d["start"], d["end"]),
+    "daily_logs.blocked_days": lambda s, d: s.daily_logs.blocked_days(d["team_ids"], d["start"], d["end"]),
+    "daily_logs.search (own logs)": lambda s, d: s.daily_logs.search([d["developer"]["id"]], "reviews"),
+    "daily_logs.search (team logs)": lambda s, d: s.daily_logs.search(d["team_ids"], "reviews", offset=20),
+    "daily_logs.update": lambda s, d: s.daily_logs.update(d["log"]["id"], d["developer"]["id"], {"mood": 4}),
+    "daily_logs.add_feedback": lambda s, d: s.daily_logs.add_feedback(d["log"]["id"], {"feedback_text": "ok", "created_at": datetime.utcnow()}),
+    "idempotency.reserve (retry)": lambda s, d: s.idempotency.reserve(d["developer"]["id"], "seeded-key", "fingerprint", datetime.utcnow() + timedelta(days=1)),
+    "idempotency.complete": lambda s, d: s.idempotency.complete(d["developer"]["id"], "seeded-key", 200, {"ok": True}, datetime.utcnow() + timedelta(days=1)),
+    "notifications.get": lambda s, d: s.notifications.get(d["notification"]["id"]),
+    "notifications.list_for_user": lambda s, d: s.notifications.list_for_user(d["developer"]["id"]),
+    "notifications.mark_read": lambda s, d: s.notifications.mark_read(d["notification"]["id"], d["developer"]["id"]),
+}
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_index(harness, name):
+    loop, storage, capture, db, data = harness
+    capture.commands.clear()
+    loop.run_until_complete(HOT_QUERIES[name](storage, data))
+    assert capture.commands, f"{name} issued no explainable commands"
+
+    for command_name, command in capture.commands:
+        explain = db.command({"explain": command, "verbosity": "executionStats"})
+        winning_plan = _find_key(explain, "winningPlan")
+        assert winning_plan is not None, f"{name}: no winningPlan in explain output for {command_name}"
+
+        stages = _stages(winning_plan)
+        text_index = TEXT_SEARCH_INDEXES.get(name)
+        if text_index is not None:
+            assert text_index in _index_names(winning_plan), f"{name}: {command_name} plan does not read {text_index} (stages: {stages})"
+            assert "COLLSCAN" not in stages, f"{name}: {command_name} plan uses COLLSCAN (stages: {stages})"
+            continue
+        bad = FORBIDDEN_STAGES.intersection(stages)
+        assert not bad, f"{name}: {command_name} plan uses {sorted(bad)} (stages: {stages})"
+
+        stats = _find_key(explain, "executionStats") or {}
+        examined = stats.get("totalDocsExamined", 0)
+        returned = max(stats.get("nReturned", 0), 1)
+        ratio = examined / returned
+        assert ratio <= MAX_EXAMINED_RATIO, (
+            f"{name}: {command_name} examined {examined} docs for {returned} returned "
+            f"(ratio {ratio:.1f} > {MAX_EXAMINED_RATIO})"
+        )
@@ -0,0 +1,115 @@
+"""
+Log search: the SQLite full-text index directly, and GET /api/search scoping against the memory engine.
+"""
+import asyncio
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+NOW = datetime(2026, 10, 5, 12, 0)
+
+
+def make_log(number, description, user_id="dev", blockers=None):
+    return {
+        "id": f"log{number}",
+        "user_id": user_id,
+        "date": f"2026-10-{number:02d}",
+        "tasks": [{"description": description, "time_spent": 1.0, "completed": True}],
+        "total_time": 1.0,
+        "mood": 3,
+        "blockers": blockers,
+        "created_at": NOW,
+        "updated_at": NOW,
+        "version": 1,
+    }
+
+
+@pytest.fixture
+def sqlite_storage(tmp_path):
+    from storage.sqlite import SQLiteStorage
+
+    storage = SQLiteStorage(str(tmp_path / "search.db"))
+    yield storage
+    storage.close()
+
+
+def search_ids(storage, user_ids, query, **kwargs):
+    return [log["id"] for log in asyncio.run(storage.daily_logs.search(user_ids, query, **kwargs))]
+
+
+def test_sqlite_search_stems_words(sqlite_storage):
+    asyncio.run(sqlite_storage.daily_logs.create_many([
+        make_log(1, "Reviewing pull requests"),
+        make_log(2, "Fixed the login bug"),
+        make_log(3, "Deploy", blockers="Waiting on reviews"),
+    ]))
+
+    assert sorted(search_ids(sqlite_storage, ["dev"], "review")) == ["log1", "log3"]
+    assert search_ids(sqlite_storage, ["dev"], "fixing") == ["log2"]
+
+
+def test_sqlite_search_follows_edits(sqlite_storage):
+    asyncio.run(sqlite_storage.daily_logs.create_many([make_log(1, "Code review"), make_log(2, "Code review")]))
+    asyncio.run(sqlite_storage.daily_logs.update("log1", "dev", {"tasks": [{"description": "Deploy", "time_spent": 1.0}]}))
+
+    assert search_ids(sqlite_storage, ["dev"], "review") == ["log2"]
+    assert search_ids(sqlite_storage, ["dev"], "deploy") == ["log1"]
+
+
+def test_sqlite_search_survives_renumbered_rowids(sqlite_storage):
+    logs = [make_log(number, f"Task {number} review") for number in range(1, 21)]
+    asyncio.run(sqlite_storage.daily_logs.create_many(logs))
+    # VACUUM may renumber rowids of tables without an INTEGER PRIMARY KEY; reinserting every row
+    # in reverse order does so deterministically
+    conn = sqlite3.connect(sqlite_storage.database.path, isolation_level=None)
+    conn.execute("CREATE TEMP TABLE logs_copy AS SELECT * FROM daily_logs ORDER BY id DESC")
+    conn.execute("DELETE FROM daily_logs")
+    conn.execute("INSERT INTO daily_logs SELECT * FROM logs_copy")
+    conn.execute("VACUUM")
+    conn.close()
+
+    hits = asyncio.run(sqlite_storage.daily_logs.search(["dev"], "task 12"))
+    assert hits[0]["id"] == "log12"
+    assert hits[0]["tasks"][0]["description"] == "Task 12 review"
+
+
+@pytest.mark.parametrize("query", ["!!!", "--", '"*"'])
+def test_sqlite_punctuation_only_query_matches_nothing(sqlite_storage, query):
+    asyncio.run(sqlite_storage.daily_logs.create(make_log(1, "Code review!")))
+    assert search_ids(sqlite_storage, ["dev"], query) == []
+
+
+LOG = {"date": "2026-10-05", "tasks": [{"description": "Code review", "time_spent": 2}], "total_time": 2, "mood": 4}
+
+
+def test_developer_searches_own_logs_and_manager_searches_team(client, register):
+    manager_id, manager = register("lead", role="manager")
+    _, ann = register("ann", manager_id=manager_id)
+    _, bob = register("bob", manager_id=manager_id)
+    _, outsider = register("eve")
+    for headers in (ann, bob, outsider):
+        assert client.post("/api/logs", json=LOG, headers=headers).status_code == 200
+
+    def users(headers):
+        response = client.get("/api/search", params={"q": "review"}, headers=headers)
+        assert response.status_code == 200, response.text
+        return sorted(hit["user_name"] for hit in response.json()["results"])
+
+    assert users(ann) == ["ann"]
+    assert users(manager) == ["ann", "bob"]
+
+
+def test_search_pages_and_ignores_punctuation(client, register):
+    _, headers = register("dev")
+    for day in range(1, 4):
+        client.post("/api/logs", json={**LOG, "date": f"2026-10-0{day}"}, headers=headers)
+
+    first = client.get("/api/search", params={"q": "review", "limit": 2}, headers=headers).json()
+    rest = client.get("/api/search", params={"q": "review", "limit": 2, "offset": 2}, headers=headers).json()
+    assert (len(first["results"]), first["has_more"]) == (2, True)
+    assert (len(rest["results"]), rest["has_more"]) == (1, False)
+
+    response = client.get("/api/search", params={"q": "!!!"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["results"] == []
@@ -0,0 +1,65 @@
+"""
+SQLite queries over a manager's whole team stay within the bound-parameter limit of older builds.
+"""
+import asyncio
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+NOW = datetime(2026, 10, 5, 12, 0)
+# SQLITE_MAX_VARIABLE_NUMBER before SQLite 3.32
+OLD_VARIABLE_LIMIT = 999
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    from storage.sqlite import SQLiteDatabase, SQLiteStorage
+
+    connect = SQLiteDatabase._connect
+
+    def connect_like_old_sqlite(self):
+        conn = connect(self)
+        conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, OLD_VARIABLE_LIMIT)
+        return conn
+    monkeypatch.setattr(SQLiteDatabase, "_connect", connect_like_old_sqlite)
+
+    storage = SQLiteStorage(str(tmp_path / "teams.db"))
+    yield storage
+    storage.close()
+
+
+def test_team_queries_accept_more_users_than_bound_parameters(storage):
+    user_ids = [f"dev{i}" for i in range(OLD_VARIABLE_LIMIT + 200)]
+    asyncio.run(storage.daily_logs.create_many([
+        {
+            "id": f"log{i}",
+            "user_id": user_id,
+            "date": "2026-10-05" if i % 2 else "2026-10-06",
+            "tasks": [{"description": "Code review", "time_spent": 1.0, "completed": True}],
+            "total_time": 1.0,
+            "mood": 3,
+            "blockers": "Waiting on CI" if i % 3 == 0 else None,
+            "created_at": NOW,
+            "updated_at": NOW,
+            "version": 1,
+        }
+        for i, user_id in enumerate(user_ids)
+    ]))
+    logs = storage.daily_logs
+
+    async def run_all():
+        return await asyncio.gather(
+            logs.list_for_users(user_ids, "2026-10-01", "2026-10-31", limit=5000),
+            logs.daily_summaries(user_ids, "2026-10-01", "2026-10-31"),
+            logs.daily_columns(user_ids, "2026-10-01", "2026-10-31"),
+            logs.blocker_weeks(user_ids, "2026-10-01", "2026-10-31"),
+            logs.blocked_days(user_ids, "2026-10-01", "2026-10-31"),
+            logs.search(user_ids, "review", limit=3),
+        )
+    listed, summaries, columns, weeks, blocked, hits = asyncio.run(run_all())
+
+    assert len(listed) == len(summaries) == len(columns["day"]) == len(user_ids)
+    assert sum(week["count"] for week in weeks) == len(blocked) == len(range(0, len(user_ids), 3))
+    assert len(hits) == 3
+    assert [log["date"] for log in listed[:2]] == ["2026-10-06", "2026-10-06"]
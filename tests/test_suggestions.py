@@ -0,0 +1,80 @@
+"""
+Task description typeahead: UserTaskIndex ranking and updates, and the per-process LRU of indexes.
+"""
+import asyncio
+
+from suggestions import TaskSuggestions, UserTaskIndex
+
+
+def test_ranks_by_use_then_recency():
+    index = UserTaskIndex()
+    index.add_log("a", "2026-10-01", ["Code review", "Deploy"])
+    index.add_log("b", "2026-10-02", ["code  REVIEW", "Debug CI"])
+    index.add_log("c", "2026-10-03", ["Debugging the parser"])
+
+    # The most recent spelling of an entry wins
+    assert index.suggest("code", 8) == ["code  REVIEW"]
+    # Equal use: the most recently used first
+    assert index.suggest("de", 8) == ["Debugging the parser", "Debug CI", "Deploy"]
+    assert index.suggest("de", 2) == ["Debugging the parser", "Debug CI"]
+
+
+def test_edited_log_replaces_its_entries():
+    index = UserTaskIndex()
+    index.add_log("a", "2026-10-01", ["Code review"])
+    index.add_log("b", "2026-10-02", ["Code review"])
+    index.add_log("a", "2026-10-01", ["Write docs"])
+
+    assert index.suggest("code", 8) == ["Code review"]
+    assert index.entries["code review"][1] == 1
+    index.remove_log("b")
+    assert index.suggest("code", 8) == []
+    assert index.keys == ["write docs"]
+
+
+def test_trailing_space_ends_the_word():
+    index = UserTaskIndex()
+    index.add_log("a", "2026-10-01", ["Code review", "Codebase cleanup"])
+
+    assert sorted(index.suggest("code", 8)) == ["Code review", "Codebase cleanup"]
+    assert index.suggest("code ", 8) == ["Code review"]
+    assert index.suggest("  CODE   r", 8) == ["Code review"]
+
+
+class _Logs:
+    def __init__(self):
+        self.loads = []
+
+    async def list_for_users(self, user_ids, start_date=None, end_date=None, ascending=False, limit=1000, analytics=False):
+        self.loads.extend(user_ids)
+        return [{"id": f"{user_ids[0]}-log", "date": "2026-10-01", "tasks": [{"description": f"Task of {user_ids[0]}"}]}]
+
+
+class _Storage:
+    def __init__(self):
+        self.daily_logs = _Logs()
+
+
+def test_least_recently_used_index_is_evicted():
+    storage = _Storage()
+    suggestions = TaskSuggestions(storage, max_users=2, history_days=30, ttl_seconds=300)
+
+    async def keystrokes(*user_ids):
+        return [await suggestions.suggest(user_id, "task") for user_id in user_ids]
+
+    assert asyncio.run(keystrokes("ann", "bob", "ann", "eve")) == [["Task of ann"], ["Task of bob"], ["Task of ann"], ["Task of eve"]]
+    # bob was least recently used when eve's index was loaded
+    assert list(suggestions._indexes) == ["ann", "eve"]
+    asyncio.run(keystrokes("ann", "bob"))
+    assert storage.daily_logs.loads == ["ann", "bob", "eve", "bob"]
+
+
+def test_recorded_log_updates_loaded_index_only():
+    suggestions = TaskSuggestions(_Storage(), max_users=2, history_days=30, ttl_seconds=300)
+    asyncio.run(suggestions.suggest("ann", "task"))
+
+    suggestions.record_log({"id": "ann-log", "user_id": "ann", "date": "2026-10-02", "tasks": [{"description": "Triage bugs"}]})
+    suggestions.record_log({"id": "bob-log", "user_id": "bob", "date": "2026-10-02", "tasks": [{"description": "Triage bugs"}]})
+
+    assert asyncio.run(suggestions.suggest("ann", "t")) == ["Triage bugs"]
+    assert "bob" not in suggestions._indexes
@@ -0,0 +1,32 @@
+"""
+traceparent parsing: a malformed header from a client starts a new trace instead of failing the request.
+"""
+import pytest
+
+from tracing import _parse_traceparent
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+def test_parses_valid_header():
+    assert _parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (TRACE_ID, PARENT_ID, True)
+    assert _parse_traceparent(f" 00-{TRACE_ID}-{PARENT_ID}-00 ") == (TRACE_ID, PARENT_ID, False)
+
+
+@pytest.mark.parametrize("value", [
+    f"00-{TRACE_ID}-{PARENT_ID}-zz",
+    f"00-{TRACE_ID}-{PARENT_ID}-1",
+    f"00-{TRACE_ID}-{PARENT_ID}-",
+    f"00-{TRACE_ID[:-1]}g-{PARENT_ID}-01",
+    f"00-{TRACE_ID}-{PARENT_ID[:-1]}-01",
+    f"00-{TRACE_ID.upper()}-{PARENT_ID}-01",
+    f"00-{'0' * 32}-{PARENT_ID}-01",
+    f"00-{TRACE_ID}-{'0' * 16}-01",
+    f"ff-{TRACE_ID}-{PARENT_ID}-01",
+    f"00-{TRACE_ID}-{PARENT_ID}-01-extra",
+    "",
+    "garbage",
+])
+def test_rejects_malformed_header(value):
+    assert _parse_traceparent(value) is None
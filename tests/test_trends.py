@@ -0,0 +1,75 @@
+"""
+Trend analytics: rolling means see the days before the window, weekly deltas and the correlation do not.
+"""
+from datetime import date, timedelta
+
+import pytest
+
+from storage.base import day_number
+from trends import HISTORY_DAYS, compute_trends
+
+START = date(2026, 10, 5)  # a Monday
+
+
+def columns(logs):
+    """{ISO date: (hours, mood)} -> the parallel columns daily_columns returns."""
+    return {
+        "day": [day_number(day) for day in logs],
+        "total_time": [hours for hours, _ in logs.values()],
+        "mood": [mood for _, mood in logs.values()],
+    }
+
+
+def days(start, count):
+    return [(start + timedelta(days=i)).isoformat() for i in range(count)]
+
+
+def test_rolling_means_include_days_before_the_window():
+    # Seven days of 2h before the window, then 4h a day inside it
+    history = {day: (2.0, 5) for day in days(START - timedelta(days=7), 7)}
+    window = {day: (4.0, 3) for day in days(START, 7)}
+    trends = compute_trends(columns({**history, **window}), START, START + timedelta(days=6))
+
+    assert trends["logs"] == 7
+    assert trends["hours"][0] == 4.0
+    assert trends["hours_7d"][0] == round((6 * 2.0 + 4.0) / 7, 3)
+    assert trends["hours_28d"][0] == round((7 * 2.0 + 4.0) / 8, 3)
+    assert trends["hours_7d"][6] == 4.0
+    assert trends["mood_7d"][0] == round((6 * 5 + 3) / 7, 3)
+
+
+def test_logs_older_than_the_rolling_windows_are_ignored():
+    old = {(START - timedelta(days=HISTORY_DAYS + 1)).isoformat(): (10.0, 1)}
+    trends = compute_trends(columns({**old, START.isoformat(): (4.0, 3)}), START, START + timedelta(days=6))
+    assert trends["hours_28d"][0] == 4.0
+
+
+def test_days_without_logs_are_null():
+    trends = compute_trends(columns({START.isoformat(): (4.0, 3)}), START, START + timedelta(days=6))
+    assert trends["hours"][1] is None
+    assert trends["hours_7d"][1] == 4.0
+    assert compute_trends(columns({}), START, START + timedelta(days=6))["hours_28d"] == [None] * 7
+
+
+def test_week_over_week_deltas():
+    logs = {day: (4.0, 3) for day in days(START, 7)}
+    logs.update({day: (6.0, 4) for day in days(START + timedelta(days=7), 5)})
+    trends = compute_trends(columns(logs), START, START + timedelta(days=13))
+
+    assert [week["week"] for week in trends["weeks"]] == ["2026-10-05", "2026-10-12"]
+    assert [week["logs"] for week in trends["weeks"]] == [7, 5]
+    assert trends["weeks"][0]["hours_delta"] is None
+    assert (trends["weeks"][1]["hours_delta"], trends["weeks"][1]["mood_delta"]) == (2.0, 1.0)
+
+
+def test_hours_mood_correlation_uses_window_logs_only():
+    # Anti-correlated history must not leak into the window's correlation
+    history = {day: (float(i), 5 - i) for i, day in enumerate(days(START - timedelta(days=5), 5))}
+    window = {day: (float(i), i + 1) for i, day in enumerate(days(START, 5))}
+    trends = compute_trends(columns({**history, **window}), START, START + timedelta(days=6))
+    assert trends["hours_mood_correlation"] == pytest.approx(1.0)
+
+
+def test_correlation_needs_variation():
+    logs = {day: (4.0, 3) for day in days(START, 5)}
+    assert compute_trends(columns(logs), START, START + timedelta(days=6))["hours_mood_correlation"] is None